@@ -0,0 +1,194 @@
+#
+# Models, solvers and stage timings shared by the benchmarks
+#
+import pybamm
+import numpy as np
+
+
+MODELS = {
+    "SPM": lambda: pybamm.lithium_ion.SPM(),
+    "SPMe": lambda: pybamm.lithium_ion.SPMe(),
+    "DFN": lambda: pybamm.lithium_ion.DFN(),
+    "LOQS": lambda: pybamm.lead_acid.LOQS(),
+    "lead-acid Full": lambda: pybamm.lead_acid.Full(),
+    "SPM 1+1D": lambda: pybamm.lithium_ion.SPM(
+        {"current collector": "potential pair", "dimensionality": 1}
+    ),
+    "SPM 2+1D": lambda: pybamm.lithium_ion.SPM(
+        {"current collector": "potential pair", "dimensionality": 2}
+    ),
+}
+
+SOLVERS = {
+    "casadi fast": lambda: pybamm.CasadiSolver(mode="fast"),
+    "casadi safe": lambda: pybamm.CasadiSolver(mode="safe"),
+    "scipy": lambda: pybamm.ScipySolver(),
+    "idaklu": lambda: pybamm.IDAKLUSolver(),
+    "scikits dae": lambda: pybamm.ScikitsDaeSolver(),
+}
+
+# Variables processed in the post-processing stage. Variables that depend on the
+# electrode and on both current collector dimensions can't be processed, so the
+# 2+1D model uses the current collector potential instead.
+VARIABLES = [
+    "Terminal voltage [V]",
+    "Current [A]",
+    "Negative electrode potential [V]",
+]
+VARIABLES_2D = [
+    "Terminal voltage [V]",
+    "Current [A]",
+    "Negative current collector potential [V]",
+]
+
+# One hour of discharge, at 100 time points
+T_EVAL = np.linspace(0, 3600, 100)
+
+# Experiment used for cycling benchmarks, repeated n_cycles times
+EXPERIMENT_CYCLE = (
+    "Discharge at 1C until 3.3 V",
+    "Rest for 10 minutes",
+    "Charge at 1 A until 4.1 V",
+    "Hold at 4.1 V until 50 mA",
+    "Rest for 10 minutes",
+)
+
+
+def is_compatible(model_name, solver_name):
+    """
+    Check whether a solver can be used to solve a model, i.e. whether the solver is
+    installed and the model has the right kind of equations for it.
+
+    Parameters
+    ----------
+    model_name : str
+        The name of the model, a key of :data:`MODELS`
+    solver_name : str
+        The name of the solver, a key of :data:`SOLVERS`
+
+    Returns
+    -------
+    bool
+        Whether the combination can be benchmarked
+    """
+    if solver_name == "idaklu" and not pybamm.have_idaklu():
+        return False
+    if solver_name == "scikits dae" and not pybamm.have_scikits_odes():
+        return False
+    if solver_name == "scipy":
+        # The scipy solver can only solve ODE models
+        return model_name in ["SPM", "SPMe", "LOQS"]
+    return True
+
+
+def build(model_name, solver_name):
+    """
+    Create, parameterise and discretise a model.
+
+    Returns
+    -------
+    :class:`pybamm.Simulation`
+        The simulation, whose `built_model` is the discretised model
+    """
+    sim = pybamm.Simulation(MODELS[model_name](), solver=SOLVERS[solver_name]())
+    sim.build()
+    return sim
+
+
+def time_stages(model_name, solver_name, t_eval=None):
+    """
+    Time each stage of solving a model: building (creating, parameterising and
+    discretising the model), setting up the solver, solving and post-processing
+    :data:`VARIABLES`.
+
+    Parameters
+    ----------
+    model_name : str
+        The name of the model, a key of :data:`MODELS`
+    solver_name : str
+        The name of the solver, a key of :data:`SOLVERS`
+    t_eval : numeric type, optional
+        The times at which to compute the solution. Default is :data:`T_EVAL`.
+
+    Returns
+    -------
+    dict
+        The time (in seconds) taken by each stage
+    """
+    t_eval = T_EVAL if t_eval is None else t_eval
+    timer = pybamm.Timer()
+    sim = build(model_name, solver_name)
+    build_time = timer.time()
+
+    solution = sim.solver.solve(sim.built_model, t_eval)
+
+    timer.reset()
+    solution.update(VARIABLES_2D if model_name == "SPM 2+1D" else VARIABLES)
+    post_process_time = timer.time()
+
+    return {
+        "build": build_time,
+        "set-up": solution.set_up_time,
+        "solve": solution.solve_time,
+        "post-process": post_process_time,
+    }
+
+
+def build_experiment(n_cycles, solver_name="casadi safe"):
+    """
+    Create and build a simulation of the SPMe cycled with :data:`EXPERIMENT_CYCLE`.
+
+    Returns
+    -------
+    :class:`pybamm.Simulation`
+        The simulation, whose `built_model` is the discretised model
+    """
+    experiment = pybamm.Experiment([EXPERIMENT_CYCLE] * n_cycles)
+    sim = pybamm.Simulation(
+        pybamm.lithium_ion.SPMe(),
+        experiment=experiment,
+        solver=SOLVERS[solver_name](),
+    )
+    sim.build()
+    return sim
+
+
+def time_experiment_stages(n_cycles, solver_name="casadi safe"):
+    """
+    Time each stage of cycling the SPMe with an experiment, as in
+    :func:`time_stages`. The solver is set up during the first step of the
+    experiment, so the set-up time is taken from the solution and removed from the
+    solve time. The time taken by each cycle is also given.
+
+    Parameters
+    ----------
+    n_cycles : int
+        The number of cycles of the experiment
+    solver_name : str, optional
+        The name of the solver, a key of :data:`SOLVERS`
+
+    Returns
+    -------
+    dict
+        The time (in seconds) taken by each stage, and the list of times taken by
+        each cycle under "cycles"
+    """
+    timer = pybamm.Timer()
+    sim = build_experiment(n_cycles, solver_name)
+    build_time = timer.time()
+
+    timer.reset()
+    solution = sim.solve()
+    solve_time = timer.time()
+
+    timer.reset()
+    solution.update(VARIABLES)
+    post_process_time = timer.time()
+
+    return {
+        "build": build_time,
+        "set-up": solution.set_up_time,
+        "solve": solve_time - solution.set_up_time,
+        "post-process": post_process_time,
+        "cycles": list(sim.experiment_cycle_times),
+    }
@@ -0,0 +1,167 @@
+#
+# Runs the benchmarks offline, without asv, and writes the results to a JSON file
+# that can be compared with the results from another commit.
+#
+# Usage (from the root of the repository):
+#
+#   python -m benchmarks.run_benchmarks --output new.json --compare old.json
+#
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+
+import numpy as np
+import pybamm
+
+from .cases import MODELS, SOLVERS, is_compatible, time_experiment_stages, time_stages
+
+STAGES = ["build", "set-up", "solve", "post-process"]
+
+
+def git_commit():
+    """Return the hash of the current git commit, or None if it can't be found."""
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_case(name, function, repeat):
+    """
+    Run a case several times, and return the median time of each stage along with
+    all the samples.
+    """
+    samples = []
+    for _ in range(repeat):
+        try:
+            samples.append(function())
+        except Exception as e:
+            print("{:<40} failed: {}".format(name, e))
+            return {"error": str(e)}
+    result = {
+        stage: float(np.median([sample[stage] for sample in samples]))
+        for stage in STAGES
+    }
+    result["samples"] = samples
+    print(
+        "{:<40} ".format(name)
+        + "  ".join("{} {:.4f}".format(stage, result[stage]) for stage in STAGES)
+    )
+    return result
+
+
+def run(models, solvers, cycles, repeat):
+    """Run all the cases and return the results, with information about the run."""
+    results = {}
+    for model_name in models:
+        for solver_name in solvers:
+            if is_compatible(model_name, solver_name):
+                name = "{} / {}".format(model_name, solver_name)
+                results[name] = run_case(
+                    name, lambda: time_stages(model_name, solver_name), repeat
+                )
+    for n_cycles in cycles:
+        name = "experiment {} cycles / casadi safe".format(n_cycles)
+        results[name] = run_case(name, lambda: time_experiment_stages(n_cycles), repeat)
+    return {
+        "pybamm version": pybamm.__version__,
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "machine": platform.platform(),
+        "date": datetime.datetime.now().isoformat(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(new, old, threshold):
+    """
+    Print the ratio of the new and old time of each stage of the cases in both sets
+    of results, and return the number of stages that are slower by more than the
+    threshold (relative).
+    """
+    print("\nComparing with commit {} (ratio new / old)".format(old.get("commit")))
+    n_slower = 0
+    for name, result in new["results"].items():
+        old_result = old["results"].get(name)
+        if old_result is None or "error" in old_result or "error" in result:
+            continue
+        ratios = []
+        for stage in STAGES:
+            ratio = result[stage] / max(old_result[stage], 1e-9)
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = " (slower)"
+                n_slower += 1
+            elif ratio < 1 / (1 + threshold):
+                flag = " (faster)"
+            ratios.append("{} {:.2f}{}".format(stage, ratio, flag))
+        print("{:<40} ".format(name) + "  ".join(ratios))
+    return n_slower
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(
+        description="Time the stages of solving PyBaMM models and write the results"
+        " to a JSON file."
+    )
+    parser.add_argument(
+        "--models", nargs="+", default=list(MODELS), choices=list(MODELS)
+    )
+    parser.add_argument(
+        "--solvers", nargs="+", default=list(SOLVERS), choices=list(SOLVERS)
+    )
+    parser.add_argument(
+        "--cycles",
+        nargs="*",
+        type=int,
+        default=[1, 5],
+        help="Numbers of cycles of the experiment to run",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Number of times to run each case"
+    )
+    parser.add_argument(
+        "--output", default="benchmark_results.json", help="File to write results to"
+    )
+    parser.add_argument(
+        "--compare", help="Results file (e.g. from another commit) to compare with"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative change above which a stage is reported as slower or faster",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with an error if any stage is slower than in the compared results",
+    )
+    args = parser.parse_args(arguments)
+
+    pybamm.set_logging_level("ERROR")
+    new = run(args.models, args.solvers, args.cycles, args.repeat)
+    with open(args.output, "w") as f:
+        json.dump(new, f, indent=2)
+    print("\nResults written to {}".format(args.output))
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        n_slower = compare(new, old, args.threshold)
+        if n_slower and args.fail_on_regression:
+            sys.exit("{} stages are slower".format(n_slower))
+
+
+if __name__ == "__main__":
+    main()
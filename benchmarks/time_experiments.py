@@ -0,0 +1,38 @@
+#
+# Benchmarks of cycling a model with an experiment
+#
+from .cases import VARIABLES, build_experiment
+
+
+class TimeExperiments:
+    """
+    Time building, solving and post-processing the SPMe cycled with an experiment,
+    for an increasing number of cycles.
+    """
+
+    params = [1, 5]
+    param_names = ["cycles"]
+    timeout = 300
+
+    def setup(self, n_cycles):
+        self.sim = build_experiment(n_cycles)
+        self.solution = self.sim.solve()
+
+    def time_build(self, n_cycles):
+        build_experiment(n_cycles)
+
+    def time_solve(self, n_cycles):
+        self.sim.solve()
+
+    def time_post_process(self, n_cycles):
+        self.solution.update(VARIABLES)
+
+    def track_set_up(self, n_cycles):
+        return self.solution.set_up_time
+
+    track_set_up.unit = "seconds"
+
+    def track_mean_cycle_time(self, n_cycles):
+        return sum(self.sim.experiment_cycle_times) / n_cycles
+
+    track_mean_cycle_time.unit = "seconds"
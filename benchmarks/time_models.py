@@ -0,0 +1,49 @@
+#
+# Benchmarks of the stages of solving each model with each solver
+#
+from .cases import (
+    MODELS,
+    SOLVERS,
+    T_EVAL,
+    VARIABLES,
+    VARIABLES_2D,
+    build,
+    is_compatible,
+)
+
+
+class TimeModels:
+    """
+    Time building, setting up, solving and post-processing each model with each
+    solver. Combinations that can't be run are skipped.
+    """
+
+    params = [list(MODELS), list(SOLVERS)]
+    param_names = ["model", "solver"]
+    timeout = 300
+
+    def setup(self, model_name, solver_name):
+        if not is_compatible(model_name, solver_name):
+            # asv skips benchmarks whose setup raises NotImplementedError
+            raise NotImplementedError
+        self.sim = build(model_name, solver_name)
+        self.model = self.sim.built_model
+        self.solver = self.sim.solver
+        # Solve once, so that the solver is set up for the solve benchmark
+        self.solution = self.solver.solve(self.model, T_EVAL)
+        if model_name == "SPM 2+1D":
+            self.variables = VARIABLES_2D
+        else:
+            self.variables = VARIABLES
+
+    def time_build(self, model_name, solver_name):
+        build(model_name, solver_name)
+
+    def time_set_up(self, model_name, solver_name):
+        self.solver.set_up(self.model, {}, T_EVAL)
+
+    def time_solve(self, model_name, solver_name):
+        self.solver.solve(self.model, T_EVAL)
+
+    def time_post_process(self, model_name, solver_name):
+        self.solution.update(self.variables)
@@ -76,7 +76,7 @@ from .citations import Citations, citations, print_citations
 from .expression_tree.symbol import *
 from .expression_tree.binary_operators import *
 from .expression_tree.concatenations import *
-from .expression_tree.array import Array, linspace, meshgrid
+from .expression_tree.array import Array, entries_digest, linspace, meshgrid
 from .expression_tree.matrix import Matrix
 from .expression_tree.unary_operators import *
 from .expression_tree.functions import *
@@ -95,6 +95,7 @@ from .expression_tree.state_vector import StateVectorBase, StateVector, StateVec
 from .expression_tree.exceptions import *
 
 # Operations
+from .expression_tree.operations.traverse import traverse, tree_is_constant
 from .expression_tree.operations.simplify import (
     Simplification,
     simplify_if_constant,
@@ -107,6 +108,8 @@ from .expression_tree.operations.evaluate import (
     id_to_python_variable,
     to_python,
     EvaluatorPython,
+    EvaluatorNumba,
+    have_numba,
 )
 
 if system() != "Windows":
@@ -114,8 +117,18 @@ if system() != "Windows":
     from .expression_tree.operations.evaluate import JaxCooMatrix
 
 from .expression_tree.operations.jacobian import Jacobian
+from .expression_tree.operations.coloured_jacobian import (
+    jacobian_sparsity,
+    colour_columns,
+    ColouredJacobian,
+)
 from .expression_tree.operations.convert_to_casadi import CasadiConverter
 from .expression_tree.operations.unpack_symbols import SymbolUnpacker
+from .expression_tree.operations.common_subexpressions import (
+    CommonSubexpressionElimination,
+    count_nodes,
+)
+from .expression_tree.operations.dependencies import find_dependencies, merge_slices
 
 #
 # Model classes
@@ -212,6 +225,7 @@ from .spatial_methods.scikit_finite_element import ScikitFiniteElement
 # Solver classes
 #
 from .solvers.solution import Solution, _BaseSolution
+from .solvers.solution_store import SolutionStore
 from .solvers.processed_variable import ProcessedVariable
 from .solvers.processed_symbolic_variable import ProcessedSymbolicVariable
 from .solvers.base_solver import BaseSolver
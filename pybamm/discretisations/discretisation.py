@@ -135,6 +135,9 @@ class Discretisation(object):
             )
 
         pybamm.logger.info("Start discretising {}".format(model.name))
+        # Record the time taken by each stage
+        timer = pybamm.Timer()
+        profile = {}
 
         # Make sure model isn't empty
         if (
@@ -171,6 +174,8 @@ class Discretisation(object):
         self.bcs = self.process_boundary_conditions(model)
         pybamm.logger.info("Set internal boundary conditions for {}".format(model.name))
         self.set_internal_boundary_conditions(model)
+        profile["discretisation: set-up"] = timer.time()
+        timer.reset()
 
         # set up inplace vs not inplace
         if inplace:
@@ -192,18 +197,24 @@ class Discretisation(object):
         ics, concat_ics = self.process_initial_conditions(model)
         model_disc.initial_conditions = ics
         model_disc.concatenated_initial_conditions = concat_ics
+        profile["discretisation: initial conditions"] = timer.time()
+        timer.reset()
 
         # Discretise variables (applying boundary conditions)
         # Note that we **do not** discretise the keys of model.rhs,
         # model.initial_conditions and model.boundary_conditions
         pybamm.logger.info("Discretise variables for {}".format(model.name))
         model_disc.variables = self.process_dict(model.variables)
+        profile["discretisation: variables"] = timer.time()
+        timer.reset()
 
         # Process parabolic and elliptic equations
         pybamm.logger.info("Discretise model equations for {}".format(model.name))
         rhs, concat_rhs, alg, concat_alg = self.process_rhs_and_algebraic(model)
         model_disc.rhs, model_disc.concatenated_rhs = rhs, concat_rhs
         model_disc.algebraic, model_disc.concatenated_algebraic = alg, concat_alg
+        profile["discretisation: equations"] = timer.time()
+        timer.reset()
 
         # Process events
         processed_events = []
@@ -215,22 +226,28 @@ class Discretisation(object):
             )
             processed_events.append(processed_event)
         model_disc.events = processed_events
+        profile["discretisation: events"] = timer.time()
+        timer.reset()
 
         # Create mass matrix
         pybamm.logger.info("Create mass matrix for {}".format(model.name))
         model_disc.mass_matrix, model_disc.mass_matrix_inv = self.create_mass_matrix(
             model_disc
         )
+        profile["discretisation: mass matrix"] = timer.time()
+        timer.reset()
 
         # Check that resulting model makes sense
         if check_model:
             pybamm.logger.info("Performing model checks for {}".format(model.name))
             self.check_model(model_disc)
+            profile["discretisation: checks"] = timer.time()
 
         pybamm.logger.info("Finish discretising {}".format(model.name))
 
         # Record that the model has been discretised
         model_disc.is_discretised = True
+        model_disc.profile = {**model.profile, **profile}
 
         return model_disc
 
@@ -801,6 +818,7 @@ class Discretisation(object):
     def process_symbol(self, symbol):
         """Discretise operators in model equations.
         If a symbol has already been discretised, the stored value is returned.
+        The tree is traversed iteratively (see :func:`pybamm.traverse`).
 
         Parameters
         ----------
@@ -813,44 +831,66 @@ class Discretisation(object):
             Discretised symbol
 
         """
-        try:
-            return self._discretised_symbols[symbol.id]
-        except KeyError:
-            discretised_symbol = self._process_symbol(symbol)
-            self._discretised_symbols[symbol.id] = discretised_symbol
-            discretised_symbol.test_shape()
-            # Assign mesh as an attribute to the processed variable
-            if symbol.domain != []:
-                discretised_symbol.mesh = self.mesh.combine_submeshes(*symbol.domain)
-            else:
-                discretised_symbol.mesh = None
-            # Assign secondary mesh
-            if "secondary" in symbol.auxiliary_domains:
-                discretised_symbol.secondary_mesh = self.mesh.combine_submeshes(
-                    *symbol.auxiliary_domains["secondary"]
-                )
-            else:
-                discretised_symbol.secondary_mesh = None
-            return discretised_symbol
+        return pybamm.traverse(
+            symbol,
+            self._visit,
+            memo=self._discretised_symbols,
+            children=self._children,
+            enter=self._enter,
+        )
+
+    def _children(self, symbol):
+        "Children that must be discretised before a symbol"
+        if isinstance(
+            symbol,
+            (
+                pybamm.BinaryOperator,
+                pybamm.UnaryOperator,
+                pybamm.Function,
+                pybamm.Concatenation,
+            ),
+        ):
+            return symbol.children
+        else:
+            return []
+
+    def _enter(self, symbol):
+        "Check for boundary conditions on tabs, before discretising the children"
+        if symbol.domain != [] and self.bcs:
+            key_id = list(self.bcs.keys())[0]
+            if any("tab" in side for side in list(self.bcs[key_id].keys())):
+                self.bcs[key_id] = self.check_tab_conditions(symbol, self.bcs[key_id])
+
+    def _visit(self, symbol, disc_children):
+        "Discretise a symbol given its discretised children, and assign its meshes"
+        discretised_symbol = self._process_symbol(symbol, disc_children)
+        discretised_symbol.test_shape()
+        # Assign mesh as an attribute to the processed variable
+        if symbol.domain != []:
+            discretised_symbol.mesh = self.mesh.combine_submeshes(*symbol.domain)
+        else:
+            discretised_symbol.mesh = None
+        # Assign secondary mesh
+        if "secondary" in symbol.auxiliary_domains:
+            discretised_symbol.secondary_mesh = self.mesh.combine_submeshes(
+                *symbol.auxiliary_domains["secondary"]
+            )
+        else:
+            discretised_symbol.secondary_mesh = None
+        return discretised_symbol
 
-    def _process_symbol(self, symbol):
-        """ See :meth:`Discretisation.process_symbol()`. """
+    def _process_symbol(self, symbol, disc_children):
+        """
+        See :meth:`Discretisation.process_symbol()`. Discretises a symbol given its
+        discretised children.
+        """
 
         if symbol.domain != []:
             spatial_method = self.spatial_methods[symbol.domain[0]]
-            # If boundary conditions are provided, need to check for BCs on tabs
-            if self.bcs:
-                key_id = list(self.bcs.keys())[0]
-                if any("tab" in side for side in list(self.bcs[key_id].keys())):
-                    self.bcs[key_id] = self.check_tab_conditions(
-                        symbol, self.bcs[key_id]
-                    )
 
         if isinstance(symbol, pybamm.BinaryOperator):
-            # Pre-process children
             left, right = symbol.children
-            disc_left = self.process_symbol(left)
-            disc_right = self.process_symbol(right)
+            disc_left, disc_right = disc_children
             if symbol.domain == []:
                 return symbol._binary_new_copy(disc_left, disc_right)
             else:
@@ -859,7 +899,7 @@ class Discretisation(object):
                 )
         elif isinstance(symbol, pybamm.UnaryOperator):
             child = symbol.child
-            disc_child = self.process_symbol(child)
+            disc_child = disc_children[0]
             if child.domain != []:
                 child_spatial_method = self.spatial_methods[child.domain[0]]
 
@@ -949,7 +989,6 @@ class Discretisation(object):
                 return symbol._unary_new_copy(disc_child)
 
         elif isinstance(symbol, pybamm.Function):
-            disc_children = [self.process_symbol(child) for child in symbol.children]
             return symbol._function_new_copy(disc_children)
 
         elif isinstance(symbol, pybamm.VariableDot):
@@ -1014,8 +1053,7 @@ class Discretisation(object):
             return spatial_method.spatial_variable(symbol)
 
         elif isinstance(symbol, pybamm.Concatenation):
-            new_children = [self.process_symbol(child) for child in symbol.children]
-            new_symbol = spatial_method.concatenation(new_children)
+            new_symbol = spatial_method.concatenation(disc_children)
 
             return new_symbol
 
@@ -28,12 +28,15 @@ class Experiment:
     hour or until 4.2 V". The instructions can be of the form "(Dis)charge at x A/C/W",
     "Rest", or "Hold at x V". The running time should be a time in seconds, minutes or
     hours, e.g. "10 seconds", "3 minutes" or "1 hour". The stopping conditions should be
-    a circuit state, e.g. "1 A", "C/50" or "3 V".
+    a circuit state, e.g. "1 A", "C/50" or "3 V". Operating conditions can be grouped
+    into cycles by passing them as a tuple, e.g.
+    ``[("Discharge at 1 C for 1 hour", "Rest for 1 hour")] * 10``.
 
     Parameters
     ----------
     operating_conditions : list
-        List of operating conditions
+        List of operating conditions, or of tuples of operating conditions (cycles).
+        An operating condition that is not in a tuple is a cycle on its own.
     parameters : dict
         Dictionary of parameters to use for this experiment, replacing default
         parameters as appropriate
@@ -45,9 +48,19 @@ class Experiment:
 
     def __init__(self, operating_conditions, parameters=None, period="1 minute"):
         self.period = self.convert_time_to_seconds(period.split())
-        self.operating_conditions_strings = operating_conditions
+        self.operating_conditions_cycles = operating_conditions
+        # Flatten the cycles into a single list of operating conditions
+        self.cycle_lengths = []
+        self.operating_conditions_strings = []
+        for cycle in operating_conditions:
+            if isinstance(cycle, tuple):
+                self.cycle_lengths.append(len(cycle))
+                self.operating_conditions_strings.extend(cycle)
+            else:
+                self.cycle_lengths.append(1)
+                self.operating_conditions_strings.append(cycle)
         self.operating_conditions, self.events = self.read_operating_conditions(
-            operating_conditions
+            self.operating_conditions_strings
         )
         parameters = parameters or {}
         if isinstance(parameters, dict):
@@ -56,7 +69,7 @@ class Experiment:
             raise TypeError("experimental parameters should be a dictionary")
 
     def __str__(self):
-        return str(self.operating_conditions_strings)
+        return str(self.operating_conditions_cycles)
 
     def __repr__(self):
         return "pybamm.Experiment({!s})".format(self)
@@ -1,9 +1,10 @@
 #
 # NumpyArray class
 #
+import hashlib
 import numpy as np
 import pybamm
-from scipy.sparse import issparse, csr_matrix
+from scipy.sparse import issparse, csr_matrix, csc_matrix
 
 
 class Array(pybamm.Symbol):
@@ -22,12 +23,15 @@ class Array(pybamm.Symbol):
         list of domains the parameter is valid over, defaults to empty list
     auxiliary_domainds : dict, optional
         dictionary of auxiliary domains, defaults to empty dict
-    entries_string : str
-        String representing the entries (slow to recalculate when copying)
+    entries_string : bytes
+        Digest of the entries, as returned by :func:`entries_digest` (slow to
+        recalculate when copying)
 
     *Extends:* :class:`Symbol`
     """
 
+    __slots__ = ("_entries", "_entries_string")
+
     def __init__(
         self,
         entries,
@@ -69,15 +73,10 @@ class Array(pybamm.Symbol):
     def entries_string(self, value):
         # We must include the entries in the hash, since different arrays can be
         # indistinguishable by class, name and domain alone
-        # Slightly different syntax for sparse and non-sparse matrices
         if value is not None:
             self._entries_string = value
         else:
-            entries = self._entries
-            if issparse(entries):
-                self._entries_string = str(entries.__dict__)
-            else:
-                self._entries_string = entries.tobytes()
+            self._entries_string = entries_digest(self._entries)
 
     def set_id(self):
         """ See :meth:`pybamm.Symbol.set_id()`. """
@@ -110,6 +109,44 @@ class Array(pybamm.Symbol):
         return True
 
 
+def entries_digest(entries):
+    """
+    Fixed-size digest of the contents of a dense or sparse array, used in the id of
+    nodes holding (possibly large) constant data. Unlike the raw bytes of the array,
+    the digest is cheap to hash and to carry through copies of the node, and does
+    not keep a second copy of the data alive.
+
+    Parameters
+    ----------
+    entries : :class:`numpy.ndarray` or :class:`scipy.sparse.spmatrix`
+        The array to digest
+
+    Returns
+    -------
+    bytes
+        16-byte digest of the type, shape and values of the array
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    if issparse(entries):
+        # Hash the compressed arrays directly, converting other sparse formats
+        if not isinstance(entries, (csr_matrix, csc_matrix)):
+            entries = entries.tocsr()
+        hasher.update(
+            "{} {} {}".format(entries.format, entries.shape, entries.dtype).encode()
+        )
+        arrays = [entries.data, entries.indices, entries.indptr]
+    else:
+        hasher.update("dense {} {}".format(entries.shape, entries.dtype).encode())
+        arrays = [entries]
+    for array in arrays:
+        if array.dtype == object:
+            hasher.update(array.tobytes())
+        else:
+            # Hash the buffer without copying it, unless it isn't contiguous
+            hasher.update(np.ascontiguousarray(array))
+    return hasher.digest()
+
+
 def linspace(start, stop, num=50, **kwargs):
     """
     Creates a linearly spaced array by calling `numpy.linspace` with keyword
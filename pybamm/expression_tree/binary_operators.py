@@ -89,6 +89,8 @@ class BinaryOperator(pybamm.Symbol):
 
     """
 
+    __slots__ = ("left", "right")
+
     def __init__(self, name, left, right):
         left, right = self.format(left, right)
 
@@ -177,12 +179,8 @@ class BinaryOperator(pybamm.Symbol):
     def new_copy(self):
         """ See :meth:`pybamm.Symbol.new_copy()`. """
 
-        # process children
-        new_left = self.left.new_copy()
-        new_right = self.right.new_copy()
-
-        # make new symbol, ensure domain(s) remain the same
-        out = self._binary_new_copy(new_left, new_right)
+        # make new symbol with the same children, ensure domain(s) remain the same
+        out = self._binary_new_copy(self.left, self.right)
         out.copy_domains(self)
 
         return out
@@ -236,7 +234,8 @@ class BinaryOperator(pybamm.Symbol):
 
     def is_constant(self):
         """ See :meth:`pybamm.Symbol.is_constant()`. """
-        return self.left.is_constant() and self.right.is_constant()
+        # Checked without recursion, as the tree can be deep
+        return pybamm.tree_is_constant(self)
 
 
 class Power(BinaryOperator):
@@ -32,6 +32,8 @@ class Broadcast(pybamm.SpatialOperator):
     **Extends:** :class:`SpatialOperator`
     """
 
+    __slots__ = ("broadcast_type", "broadcast_domain")
+
     def __init__(
         self,
         child,
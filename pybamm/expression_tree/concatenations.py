@@ -20,6 +20,8 @@ class Concatenation(pybamm.Symbol):
 
     """
 
+    __slots__ = ("concatenation_function",)
+
     def __init__(self, *children, name=None, check_domain=True, concat_fun=None):
         if name is None:
             name = "concatenation"
@@ -82,8 +84,7 @@ class Concatenation(pybamm.Symbol):
 
     def new_copy(self):
         """ See :meth:`pybamm.Symbol.new_copy()`. """
-        new_children = [child.new_copy() for child in self.children]
-        return self._concatenation_new_copy(new_children)
+        return self._concatenation_new_copy(list(self.children))
 
     def _concatenation_new_copy(self, children):
         """ See :meth:`pybamm.Symbol.new_copy()`. """
@@ -113,7 +114,8 @@ class Concatenation(pybamm.Symbol):
 
     def is_constant(self):
         """ See :meth:`pybamm.Symbol.is_constant()`. """
-        return all(child.is_constant() for child in self.children)
+        # Checked without recursion, as the tree can be deep
+        return pybamm.tree_is_constant(self)
 
 
 class NumpyConcatenation(Concatenation):
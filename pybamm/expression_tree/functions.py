@@ -27,6 +27,8 @@ class Function(pybamm.Symbol):
     **Extends:** :class:`pybamm.Symbol`
     """
 
+    __slots__ = ("function", "derivative", "differentiated_function")
+
     def __init__(
         self,
         function,
@@ -184,7 +186,8 @@ class Function(pybamm.Symbol):
 
     def is_constant(self):
         """ See :meth:`pybamm.Symbol.is_constant()`. """
-        return all(child.is_constant() for child in self.children)
+        # Checked without recursion, as the tree can be deep
+        return pybamm.tree_is_constant(self)
 
     def _evaluate_for_shape(self):
         """
@@ -199,8 +202,7 @@ class Function(pybamm.Symbol):
 
     def new_copy(self):
         """ See :meth:`pybamm.Symbol.new_copy()`. """
-        children_copy = [child.new_copy() for child in self.children]
-        return self._function_new_copy(children_copy)
+        return self._function_new_copy(list(self.children))
 
     def _function_new_copy(self, children):
         """Returns a new copy of the function.
@@ -81,17 +81,17 @@ class Interpolant(pybamm.Function):
     def entries_string(self, value):
         # We must include the entries in the hash, since different arrays can be
         # indistinguishable by class, name and domain alone
-        # Slightly different syntax for sparse and non-sparse matrices
         if value is not None:
             self._entries_string = value
         else:
-            entries = self.data
-            self._entries_string = entries.tobytes()
+            self._entries_string = pybamm.entries_digest(self.data)
 
     def set_id(self):
         """ See :meth:`pybamm.Symbol.set_id()`. """
         self._id = hash(
-            (self.__class__, self.name, self.entries_string) + tuple(self.domain)
+            (self.__class__, self.name, self.entries_string)
+            + tuple([child.id for child in self.children])
+            + tuple(self.domain)
         )
 
     def _function_new_copy(self, children):
@@ -0,0 +1,279 @@
+#
+# Calculate the Jacobian of a symbol numerically, from its sparsity pattern
+#
+import pybamm
+import numpy as np
+from scipy.sparse import csr_matrix, csc_matrix, issparse, vstack
+
+
+def jacobian_sparsity(symbol, variable, memo=None):
+    """
+    Find the sparsity pattern of the Jacobian of a (discretised) expression tree with
+    respect to a StateVector, without calculating the Jacobian. The pattern is built
+    block by block from the slices of the StateVectors and the nonzero entries of the
+    matrices in the tree, and may contain structural nonzeros whose value is always
+    zero.
+
+    Parameters
+    ----------
+    symbol : :class:`pybamm.Symbol`
+        The expression tree
+    variable : :class:`pybamm.StateVector`
+        The variable with respect to which to differentiate
+    memo : dict, optional
+        Sparsity patterns of the nodes already processed, keyed by node id. Updated in
+        place.
+
+    Returns
+    -------
+    :class:`scipy.sparse.csr_matrix`
+        Boolean matrix, with the size of `symbol` rows and the size of `variable`
+        columns, which is True where the Jacobian may be nonzero
+
+    Raises
+    ------
+    NotImplementedError
+        If the tree contains a node whose sparsity pattern can't be found (for
+        example a matrix multiplication by a matrix that depends on the variable)
+    """
+    if memo is None:
+        memo = {}
+    # Whether each node is constant, shared between the nodes of the tree
+    constant_symbols = {}
+    pattern = pybamm.traverse(
+        symbol,
+        lambda node, children: _sparsity(node, children, variable, constant_symbols),
+        memo=memo,
+        children=lambda node: []
+        if pybamm.tree_is_constant(node, memo=constant_symbols)
+        else node.children,
+    )
+    if pattern is None:
+        return csr_matrix((int(symbol.size), int(variable.size)), dtype=bool)
+    return pattern
+
+
+def _sparsity(symbol, children_patterns, variable, constant_symbols):
+    """
+    See :func:`jacobian_sparsity`. Finds the sparsity pattern of the Jacobian of a
+    symbol, given those of its children. Patterns that are all zero are None.
+    """
+    if pybamm.tree_is_constant(symbol, memo=constant_symbols):
+        return None
+
+    elif isinstance(symbol, pybamm.StateVectorBase):
+        pattern = csr_matrix(symbol._jac(variable).entries, dtype=bool)
+        return pattern if pattern.nnz > 0 else None
+
+    elif isinstance(
+        symbol, (pybamm.Heaviside, pybamm.Sign, pybamm.Floor, pybamm.Ceiling)
+    ):
+        # Piecewise constant: the Jacobian is zero
+        return None
+
+    elif all(pattern is None for pattern in children_patterns):
+        # Nodes that don't depend on a StateVector (e.g. time, external variables)
+        return None
+
+    elif isinstance(symbol, pybamm.MatrixMultiplication):
+        left, right = symbol.children
+        if not pybamm.tree_is_constant(left, memo=constant_symbols):
+            raise NotImplementedError(
+                "Sparsity pattern of a product by a matrix that isn't constant"
+            )
+        matrix = left.evaluate()
+        if issparse(matrix):
+            matrix = csr_matrix(matrix != 0)
+        else:
+            matrix = csr_matrix(np.asarray(matrix) != 0)
+        return matrix @ children_patterns[1]
+
+    elif isinstance(symbol, pybamm.Index):
+        return children_patterns[0][symbol.slice]
+
+    elif isinstance(symbol, (pybamm.Negate, pybamm.AbsoluteValue)):
+        return children_patterns[0]
+
+    elif isinstance(
+        symbol,
+        (
+            pybamm.Addition,
+            pybamm.Subtraction,
+            pybamm.Multiplication,
+            pybamm.Division,
+            pybamm.Power,
+            pybamm.Minimum,
+            pybamm.Maximum,
+            pybamm.Modulo,
+            pybamm.Function,
+        ),
+    ):
+        # Elementwise: each entry depends on the same entry of each child, or on the
+        # single entry of a child that is broadcast
+        size = int(symbol.size)
+        patterns = []
+        for child_pattern in children_patterns:
+            if child_pattern is None or any(
+                child_pattern is pattern for pattern in patterns
+            ):
+                continue
+            if child_pattern.shape[0] == 1 and size > 1:
+                child_pattern = child_pattern[np.zeros(size, dtype=int)]
+            elif child_pattern.shape[0] != size:
+                raise NotImplementedError(
+                    "Sparsity pattern of {!s} with children of different "
+                    "sizes".format(type(symbol))
+                )
+            patterns.append(child_pattern)
+        pattern = patterns[0]
+        for other in patterns[1:]:
+            pattern = pattern + other
+        return pattern
+
+    elif isinstance(symbol, (pybamm.NumpyConcatenation, pybamm.DomainConcatenation)):
+        n = int(variable.size)
+        children_patterns = [
+            csr_matrix((int(child.size), n), dtype=bool) if pattern is None else pattern
+            for child, pattern in zip(symbol.children, children_patterns)
+        ]
+        # Find where each entry of the children is placed by concatenating their
+        # (global) row numbers
+        offsets = np.cumsum([0] + [pattern.shape[0] for pattern in children_patterns])
+        rows = symbol._concatenation_evaluate(
+            [
+                np.arange(start, stop, dtype=float)[:, np.newaxis]
+                for start, stop in zip(offsets[:-1], offsets[1:])
+            ]
+        )
+        stacked = vstack(children_patterns, format="csr")
+        return stacked[np.ravel(rows).astype(int)]
+
+    else:
+        raise NotImplementedError(
+            "Sparsity pattern of {!s} not implemented".format(type(symbol))
+        )
+
+
+def colour_columns(pattern):
+    """
+    Group the columns of a sparsity pattern so that no two columns in a group have a
+    nonzero in the same row (greedy colouring of the column intersection graph). The
+    Jacobian can then be found from one directional derivative per group.
+
+    Parameters
+    ----------
+    pattern : :class:`scipy.sparse.spmatrix`
+        The sparsity pattern
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The group (colour) of each column, numbered from 0
+    """
+    pattern = csc_matrix(pattern, dtype=bool)
+    n_rows, n_columns = pattern.shape
+    colours = np.zeros(n_columns, dtype=int)
+    # used[i, c] is True if a column with colour c has a nonzero in row i
+    used = np.zeros((n_rows, 1), dtype=bool)
+    for j in range(n_columns):
+        rows = pattern.indices[pattern.indptr[j] : pattern.indptr[j + 1]]
+        free = ~np.any(used[rows], axis=0)
+        if free.any():
+            colour = np.argmax(free)
+        else:
+            colour = used.shape[1]
+            used = np.hstack([used, np.zeros_like(used)])
+        colours[j] = colour
+        used[rows, colour] = True
+    return colours
+
+
+class ColouredJacobian(object):
+    """
+    Evaluates the Jacobian of a converted expression tree from its sparsity pattern
+    (see :func:`jacobian_sparsity`), with one directional derivative per group of
+    columns (see :func:`colour_columns`) instead of building and converting a
+    symbolic Jacobian. The directional derivatives are exact (forward mode) for an
+    :class:`EvaluatorJax`, and calculated by finite differences otherwise.
+
+    Parameters
+    ----------
+    evaluator : :class:`EvaluatorPython` or :class:`EvaluatorJax`
+        The converted expression tree
+    pattern : :class:`scipy.sparse.spmatrix`
+        The sparsity pattern of the Jacobian of the expression tree
+    variable : :class:`pybamm.StateVector`
+        The variable with respect to which to differentiate
+    """
+
+    def __init__(self, evaluator, pattern, variable):
+        pattern = csr_matrix(pattern, dtype=bool)
+        pattern.sort_indices()
+        self._evaluator = evaluator
+        self._shape = pattern.shape
+        self._indices = pattern.indices
+        self._indptr = pattern.indptr
+        # Rows and columns of the nonzeros, in csr order
+        self._rows = np.repeat(np.arange(pattern.shape[0]), np.diff(pattern.indptr))
+        self._columns = pattern.indices
+        # Entries of y corresponding to the columns
+        self._y_indices = np.flatnonzero(variable.evaluation_array)
+
+        colours = colour_columns(pattern)
+        self.n_colours = colours.max() + 1 if colours.size else 0
+        self._entry_colours = colours[self._columns]
+        self._colour_columns = [
+            np.flatnonzero(colours == colour) for colour in range(self.n_colours)
+        ]
+
+        if hasattr(evaluator, "get_jacobian_vector_product"):
+            self._jvp = evaluator.get_jacobian_vector_product()
+            seeds = np.zeros((pattern.shape[1], self.n_colours))
+            seeds[np.arange(pattern.shape[1]), colours] = 1
+            self._seeds = seeds
+        else:
+            self._jvp = None
+
+    def evaluate(self, t=None, y=None, y_dot=None, inputs=None, known_evals=None):
+        """
+        Acts as a drop-in replacement for :func:`pybamm.Symbol.evaluate`
+        """
+        # generated code assumes y is a column vector
+        if y is not None and y.ndim == 1:
+            y = y.reshape(-1, 1)
+
+        if self._jvp is not None:
+            # Exact directional derivatives, one for each colour
+            seeds = np.zeros((y.shape[0], self.n_colours))
+            seeds[self._y_indices] = self._seeds
+            derivatives = np.asarray(self._jvp(t, y, y_dot, inputs, seeds))
+            derivatives = derivatives.reshape(self._shape[0], -1)
+            data = derivatives[self._rows, self._entry_colours]
+        else:
+            # Forward differences, perturbing all the columns of a colour at once
+            y_columns = y[self._y_indices, 0]
+            steps = np.sqrt(np.finfo(float).eps) * np.maximum(1, np.abs(y_columns))
+            value = self._evaluate(t, y, y_dot, inputs)
+            derivatives = np.empty((self._shape[0], self.n_colours))
+            for colour, columns in enumerate(self._colour_columns):
+                y_perturbed = y.astype(float)
+                y_perturbed[self._y_indices[columns], 0] += steps[columns]
+                derivatives[:, colour] = (
+                    self._evaluate(t, y_perturbed, y_dot, inputs) - value
+                )
+            data = derivatives[self._rows, self._entry_colours] / steps[self._columns]
+
+        result = csr_matrix((data, self._indices, self._indptr), shape=self._shape)
+
+        # don't need known_evals, but need to reproduce Symbol.evaluate signature
+        if known_evals is not None:
+            return result, known_evals
+        else:
+            return result
+
+    def _evaluate(self, t, y, y_dot, inputs):
+        "Value of the expression tree as a flat array"
+        value = self._evaluator.evaluate(t, y, y_dot, inputs)
+        if issparse(value):
+            value = value.toarray()
+        return np.broadcast_to(np.ravel(value), (self._shape[0],))
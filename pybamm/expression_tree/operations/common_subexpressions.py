@@ -0,0 +1,187 @@
+#
+# Eliminate common subexpressions from an expression tree
+#
+import pybamm
+
+from scipy.sparse import issparse
+from pybamm.expression_tree.operations.simplify import _without_domains
+
+
+def count_nodes(symbol):
+    """
+    Count the distinct nodes (by id) of an expression tree, without recursion.
+
+    Parameters
+    ----------
+    symbol : :class:`pybamm.Symbol`
+        The expression tree
+
+    Returns
+    -------
+    int
+        The number of distinct nodes in the tree
+    """
+    memo = {}
+    pybamm.traverse(symbol, lambda node, children: None, memo=memo)
+    return len(memo)
+
+
+class CommonSubexpressionElimination(object):
+    """
+    Helper class to eliminate common subexpressions from (discretised) expression
+    trees, before they are converted for the solver. The trees are put in a canonical
+    form:
+
+    - the operands of additions and multiplications are sorted by id, so that `a + b`
+      and `b + a` become the same node
+    - sparse matrices are stored in csr format with sorted indices, so that equal
+      matrices have the same id whatever their original format
+    - sums and differences of products of matrices with the same expression,
+      `A @ x + B @ x`, are folded into a single product `(A + B) @ x`
+
+    and every node is then replaced by the first node found with the same id, so that
+    each distinct subexpression is evaluated once by the solver.
+
+    Parameters
+    ----------
+    eliminated_symbols : dict, optional
+        Cached results of the elimination, keyed by the ids of the original nodes.
+        Shared between calls so that expressions processed together (e.g. the rhs and
+        algebraic equations) share their common subexpressions.
+    """
+
+    def __init__(self, eliminated_symbols=None):
+        self._eliminated_symbols = eliminated_symbols or {}
+        # Canonical node for each id
+        self._canonical_symbols = {}
+        # Number of nodes removed by all the calls to eliminate
+        self.nodes_removed = 0
+
+    def eliminate(self, symbol):
+        """
+        Return an expression tree equal to `symbol` in which common subexpressions
+        are shared. The number of nodes removed from the tree is added to
+        `nodes_removed`.
+
+        Parameters
+        ----------
+        symbol : :class:`pybamm.Symbol`
+            The symbol to process
+
+        Returns
+        -------
+        :class:`pybamm.Symbol`
+            Symbol in which each distinct subexpression appears once
+        """
+        new_symbol = pybamm.traverse(
+            symbol, self._eliminate, memo=self._eliminated_symbols
+        )
+        self.nodes_removed += count_nodes(symbol) - count_nodes(new_symbol)
+        return new_symbol
+
+    def _canonical(self, symbol):
+        "The first node found with the same id as symbol"
+        return self._canonical_symbols.setdefault(symbol.id, symbol)
+
+    def _eliminate(self, symbol, new_children):
+        """
+        See :meth:`CommonSubexpressionElimination.eliminate()`. Puts a symbol in
+        canonical form, given its canonical children. Domains are cleared, as they
+        are not needed once the model has been discretised (and nodes that only differ
+        by their domains can then be shared).
+        """
+        # Operators are rebuilt if their children have changed or if they have domains
+        unchanged = not symbol.domain and all(
+            new is old for new, old in zip(new_children, symbol.children)
+        )
+        if isinstance(symbol, pybamm.BinaryOperator):
+            left, right = new_children
+            if isinstance(symbol, (pybamm.Addition, pybamm.Multiplication)) and not (
+                _is_sparse_matrix(left) or _is_sparse_matrix(right)
+            ):
+                # Sort the operands of commutative operators
+                if left.id > right.id:
+                    left, right = right, left
+                    unchanged = False
+            if isinstance(symbol, (pybamm.Addition, pybamm.Subtraction)):
+                folded = self._fold_matrix_products(symbol, left, right)
+                if folded is not None:
+                    return folded
+            if unchanged:
+                new_symbol = symbol
+            else:
+                new_symbol = symbol._binary_new_copy(left, right)
+
+        elif isinstance(symbol, pybamm.UnaryOperator):
+            if unchanged:
+                new_symbol = symbol
+            else:
+                new_symbol = symbol._unary_new_copy(new_children[0])
+
+        elif isinstance(symbol, pybamm.Function):
+            if unchanged:
+                new_symbol = symbol
+            else:
+                new_symbol = symbol._function_new_copy(new_children)
+
+        elif isinstance(symbol, pybamm.Concatenation):
+            if unchanged:
+                new_symbol = symbol
+            else:
+                new_symbol = symbol._concatenation_new_copy(new_children)
+
+        elif isinstance(symbol, pybamm.Matrix) and issparse(symbol.entries):
+            new_symbol = _canonical_matrix(symbol)
+
+        else:
+            new_symbol = _without_domains(symbol)
+
+        return self._canonical(new_symbol)
+
+    def _fold_matrix_products(self, symbol, left, right):
+        """
+        Fold `A @ x + B @ x` into `(A + B) @ x` (and likewise for subtraction), if
+        `A` and `B` are matrices of the same shape and type. Returns None otherwise.
+        """
+        if not (
+            isinstance(left, pybamm.MatrixMultiplication)
+            and isinstance(right, pybamm.MatrixMultiplication)
+            and isinstance(left.left, pybamm.Matrix)
+            and isinstance(right.left, pybamm.Matrix)
+            and left.right.id == right.right.id
+            and left.left.shape == right.left.shape
+            and issparse(left.left.entries) == issparse(right.left.entries)
+        ):
+            return None
+        if isinstance(symbol, pybamm.Addition):
+            entries = left.left.entries + right.left.entries
+        else:
+            entries = left.left.entries - right.left.entries
+        matrix = pybamm.Matrix(entries)
+        if issparse(entries):
+            matrix = _canonical_matrix(matrix)
+        new_symbol = pybamm.MatrixMultiplication(self._canonical(matrix), left.right)
+        return self._canonical(new_symbol)
+
+
+def _is_sparse_matrix(symbol):
+    return isinstance(symbol, pybamm.Array) and issparse(symbol.entries)
+
+
+def _canonical_matrix(symbol):
+    """
+    Sparse matrix in csr format with sorted indices and no duplicate entries, with
+    the default name and no domains
+    """
+    entries = symbol.entries
+    if (
+        entries.format == "csr"
+        and entries.has_canonical_format
+        and symbol.name == "Sparse Matrix {!s}".format(entries.shape)
+        and not symbol.domain
+    ):
+        return symbol
+    entries = entries.tocsr(copy=True)
+    entries.sum_duplicates()
+    entries.sort_indices()
+    return pybamm.Matrix(entries)
@@ -16,8 +16,9 @@ class CasadiConverter(object):
 
     def convert(self, symbol, t, y, y_dot, inputs):
         """
-        This function recurses down the tree, converting the PyBaMM expression tree to
-        a CasADi expression tree
+        This function walks down the tree, converting the PyBaMM expression tree to
+        a CasADi expression tree. The tree is traversed iteratively (see
+        :func:`pybamm.traverse`).
 
         Parameters
         ----------
@@ -37,18 +38,37 @@ class CasadiConverter(object):
         :class:`casadi.MX`
             The converted symbol
         """
-        try:
-            return self._casadi_symbols[symbol.id]
-        except KeyError:
-            # Change inputs to empty dictionary if it's None
-            inputs = inputs or {}
-            casadi_symbol = self._convert(symbol, t, y, y_dot, inputs)
-            self._casadi_symbols[symbol.id] = casadi_symbol
-
-            return casadi_symbol
-
-    def _convert(self, symbol, t, y, y_dot, inputs):
-        """ See :meth:`CasadiConverter.convert()`. """
+        # Change inputs to empty dictionary if it's None
+        inputs = inputs or {}
+        return pybamm.traverse(
+            symbol,
+            lambda node, converted_children: self._convert(
+                node, t, y, y_dot, inputs, converted_children
+            ),
+            memo=self._casadi_symbols,
+            children=self._children,
+        )
+
+    def _children(self, symbol):
+        "Children that must be converted before a symbol"
+        if isinstance(
+            symbol,
+            (
+                pybamm.BinaryOperator,
+                pybamm.UnaryOperator,
+                pybamm.Function,
+                pybamm.Concatenation,
+            ),
+        ):
+            return symbol.children
+        else:
+            return []
+
+    def _convert(self, symbol, t, y, y_dot, inputs, converted_children):
+        """
+        See :meth:`CasadiConverter.convert()`. Converts a symbol given its converted
+        children.
+        """
         if isinstance(
             symbol,
             (
@@ -72,10 +92,7 @@ class CasadiConverter(object):
             return casadi.vertcat(*[y_dot[y_slice] for y_slice in symbol.y_slices])
 
         elif isinstance(symbol, pybamm.BinaryOperator):
-            left, right = symbol.children
-            # process children
-            converted_left = self.convert(left, t, y, y_dot, inputs)
-            converted_right = self.convert(right, t, y, y_dot, inputs)
+            converted_left, converted_right = converted_children
 
             if isinstance(symbol, pybamm.Modulo):
                 return casadi.fmod(converted_left, converted_right)
@@ -88,7 +105,7 @@ class CasadiConverter(object):
             return symbol._binary_evaluate(converted_left, converted_right)
 
         elif isinstance(symbol, pybamm.UnaryOperator):
-            converted_child = self.convert(symbol.child, t, y, y_dot, inputs)
+            converted_child = converted_children[0]
             if isinstance(symbol, pybamm.AbsoluteValue):
                 return casadi.fabs(converted_child)
             if isinstance(symbol, pybamm.Floor):
@@ -98,9 +115,6 @@ class CasadiConverter(object):
             return symbol._unary_evaluate(converted_child)
 
         elif isinstance(symbol, pybamm.Function):
-            converted_children = [
-                self.convert(child, t, y, y_dot, inputs) for child in symbol.children
-            ]
             # Special functions
             if symbol.function == np.min:
                 return casadi.mmin(*converted_children)
@@ -153,9 +167,6 @@ class CasadiConverter(object):
             else:
                 return symbol._function_evaluate(converted_children)
         elif isinstance(symbol, pybamm.Concatenation):
-            converted_children = [
-                self.convert(child, t, y, y_dot, inputs) for child in symbol.children
-            ]
             if isinstance(symbol, (pybamm.NumpyConcatenation, pybamm.SparseStack)):
                 return casadi.vertcat(*converted_children)
             # DomainConcatenation specifies a particular ordering for the concatenation,
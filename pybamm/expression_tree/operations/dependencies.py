@@ -0,0 +1,82 @@
+#
+# Find the parts of the state vector and the inputs that an expression tree reads
+#
+import pybamm
+
+_NO_DEPENDENCIES = (frozenset(), frozenset())
+
+
+def find_dependencies(symbol, memo=None):
+    """
+    Find the parts of the state vector and the input parameters that a (discretised)
+    expression tree depends on, without recursion. Time derivatives of the state
+    vector (:class:`pybamm.StateVectorDot`) are not included.
+
+    Parameters
+    ----------
+    symbol : :class:`pybamm.Symbol`
+        The expression tree
+    memo : dict, optional
+        Dependencies of the nodes already processed, keyed by node id. Updated in
+        place, so that trees sharing subtrees (e.g. the variables of a model) are
+        searched once.
+
+    Returns
+    -------
+    y_slices : tuple of slice
+        Sorted, disjoint slices of the state vector that the tree reads
+    inputs : tuple of str
+        Sorted names of the input parameters that the tree reads
+    """
+    y_ranges, inputs = pybamm.traverse(symbol, _dependencies, memo=memo)
+    return merge_slices(slice(*y_range) for y_range in y_ranges), tuple(sorted(inputs))
+
+
+def _dependencies(symbol, children_dependencies):
+    """
+    See :func:`find_dependencies`. Finds the (start, stop) ranges of the state vector
+    and the names of the inputs that a node reads, given those of its children.
+    """
+    if isinstance(symbol, pybamm.StateVector):
+        return (
+            frozenset((y_slice.start, y_slice.stop) for y_slice in symbol.y_slices),
+            frozenset(),
+        )
+    elif isinstance(symbol, pybamm.InputParameter):
+        return frozenset(), frozenset([symbol.name])
+
+    children_dependencies = [
+        dependencies
+        for dependencies in children_dependencies
+        if dependencies is not _NO_DEPENDENCIES
+    ]
+    if not children_dependencies:
+        return _NO_DEPENDENCIES
+    elif len(children_dependencies) == 1:
+        return children_dependencies[0]
+    y_ranges, inputs = zip(*children_dependencies)
+    return frozenset().union(*y_ranges), frozenset().union(*inputs)
+
+
+def merge_slices(slices):
+    """
+    Merge overlapping or adjacent slices (with unit steps) into sorted, disjoint
+    slices.
+
+    Parameters
+    ----------
+    slices : iterable of slice
+        The slices to merge
+
+    Returns
+    -------
+    tuple of slice
+        The merged slices, sorted by start
+    """
+    merged = []
+    for start, stop in sorted((s.start, s.stop) for s in slices):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], stop)
+        else:
+            merged.append([start, stop])
+    return tuple(slice(start, stop) for start, stop in merged)
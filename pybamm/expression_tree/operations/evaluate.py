@@ -8,6 +8,8 @@ import scipy.sparse
 from collections import OrderedDict
 
 import numbers
+import importlib
+import re
 from platform import system
 
 if system() != "Windows":
@@ -110,6 +112,29 @@ else:
         raise NotImplementedError('Jax is not available on Windows')
 
 
+numba_spec = importlib.util.find_spec("numba")
+if numba_spec is not None:
+    import numba
+
+    @numba.njit
+    def csr_matvec(matrix, x, out):
+        """
+        Product of a sparse matrix, given as the tuple (data, indices, indptr) of its
+        CSR format, by a vector, written into the vector `out`
+        """
+        data, indices, indptr = matrix
+        for i in range(out.shape[0]):
+            total = 0.0
+            for k in range(indptr[i], indptr[i + 1]):
+                total += data[k] * x[indices[k]]
+            out[i] = total
+        return out
+
+
+def have_numba():
+    return numba_spec is not None
+
+
 def id_to_python_variable(symbol_id, constant=False):
     """
     This function defines the format for the python variable names used in find_symbols
@@ -133,7 +158,9 @@ def is_scalar(arg):
         return np.all(np.array(arg.shape) == 1)
 
 
-def find_symbols(symbol, constant_symbols, variable_symbols, output_jax=False):
+def find_symbols(
+    symbol, constant_symbols, variable_symbols, output_jax=False, output_numba=False
+):
     """
     This function converts an expression tree to a dictionary of node id's and strings
     specifying valid python code to calculate that nodes value, given y and t.
@@ -164,11 +191,47 @@ def find_symbols(symbol, constant_symbols, variable_symbols, output_jax=False):
         raises NotImplNotImplementedError if any SparseStack or Mat-Mat multiply
         operations are used
 
+    output_numba: bool
+        If True, the generated code can be compiled by Numba, and the values of the
+        variable nodes must be vectors (which are flattened by
+        :class:`EvaluatorNumba`). Products of sparse matrices by vectors call
+        :func:`csr_matvec` with a work buffer (stored in `constant_symbols` under the
+        id of the product). Raises NotImplementedError for any other operation with
+        sparse matrices, for matrix-valued nodes, and for functions that aren't numpy
+        ufuncs
+
+    """
+    # Whether each node is constant, found in a single pass over the tree
+    constant = {}
+    pybamm.tree_is_constant(symbol, memo=constant)
+
+    # Write the code for each node once its children have been written. Each node,
+    # including shared subtrees, is visited only once. The children of constant
+    # nodes are not visited, as constant nodes are evaluated directly
+    def visit(node, _):
+        _find_symbol(
+            node, constant, constant_symbols, variable_symbols, output_jax, output_numba
+        )
+
+    pybamm.traverse(
+        symbol,
+        visit,
+        children=lambda node: [] if constant[node.id] else node.children,
+    )
+
+
+def _find_symbol(
+    symbol, constant, constant_symbols, variable_symbols, output_jax, output_numba
+):
+    """
+    Add the code calculating the value of a single node to `constant_symbols` or
+    `variable_symbols`, assuming that the code for its children has already been
+    written. See :func:`find_symbols`.
     """
     # constant symbols that are not numbers are stored in a list of constants, which are
     # passed into the generated function constant symbols that are numbers are written
     # directly into the code
-    if symbol.is_constant():
+    if constant[symbol.id]:
         value = symbol.evaluate()
         if not isinstance(value, numbers.Number):
             if output_jax and scipy.sparse.issparse(value):
@@ -179,15 +242,11 @@ def find_symbols(symbol, constant_symbols, variable_symbols, output_jax=False):
                 constant_symbols[symbol.id] = value
         return
 
-    # process children recursively
-    for child in symbol.children:
-        find_symbols(child, constant_symbols, variable_symbols, output_jax)
-
     # calculate the variable names that will hold the result of calculating the
     # children variables
     children_vars = []
     for child in symbol.children:
-        if child.is_constant():
+        if constant[child.id]:
             child_eval = child.evaluate()
             if isinstance(child_eval, numbers.Number):
                 children_vars.append(str(child_eval))
@@ -196,6 +255,24 @@ def find_symbols(symbol, constant_symbols, variable_symbols, output_jax=False):
         else:
             children_vars.append(id_to_python_variable(child.id, False))
 
+    if output_numba:
+        # the generated code uses flat arrays, and sparse matrices only in products
+        # by vectors
+        if not isinstance(symbol, pybamm.MatrixMultiplication) and any(
+            scipy.sparse.issparse(child.evaluate_for_shape())
+            for child in symbol.children
+        ):
+            raise NotImplementedError(
+                "{!s} of sparse matrices not supported for output_numba == "
+                "True".format(type(symbol))
+            )
+        if np.ndim(symbol.evaluate_for_shape()) == 2 and symbol.shape[1] != 1:
+            raise NotImplementedError(
+                "matrix-valued {!s} not supported for output_numba == True".format(
+                    type(symbol)
+                )
+            )
+
     if isinstance(symbol, pybamm.BinaryOperator):
         # Multiplication and Division need special handling for scipy sparse matrices
         # TODO: we can pass through a dummy y and t to get the type and then hardcode
@@ -266,6 +343,21 @@ def find_symbols(symbol, constant_symbols, variable_symbols, output_jax=False):
             ):
                 raise NotImplementedError('sparse mat-mat multiplication not supported '
                                           'for output_jax == True')
+            elif output_numba and scipy.sparse.issparse(dummy_eval_left):
+                if scipy.sparse.issparse(dummy_eval_right) or np.shape(
+                    dummy_eval_right
+                ) != (dummy_eval_left.shape[1], 1):
+                    raise NotImplementedError(
+                        "sparse products other than matrix-vector not supported for "
+                        "output_numba == True"
+                    )
+                # the product is written into a buffer, allocated once
+                constant_symbols[symbol.id] = np.empty(dummy_eval_left.shape[0])
+                symbol_str = "csr_matvec({}, {}, {})".format(
+                    children_vars[0],
+                    children_vars[1],
+                    id_to_python_variable(symbol.id, True),
+                )
             else:
                 symbol_str = children_vars[0] + " " + symbol.name + " " \
                     + children_vars[1]
@@ -292,6 +384,11 @@ def find_symbols(symbol, constant_symbols, variable_symbols, output_jax=False):
             # write any numpy functions directly
             symbol_str = "np.{}({})".format(symbol.function.__name__, children_str)
         else:
+            if output_numba:
+                raise NotImplementedError(
+                    "functions that aren't numpy ufuncs not supported for "
+                    "output_numba == True"
+                )
             # unknown function, store it as a constant and call this in the
             # generated code
             constant_symbols[symbol.id] = symbol.function
@@ -368,7 +465,7 @@ def find_symbols(symbol, constant_symbols, variable_symbols, output_jax=False):
     variable_symbols[symbol.id] = symbol_str
 
 
-def to_python(symbol, debug=False, output_jax=False):
+def to_python(symbol, debug=False, output_jax=False, output_numba=False):
     """
     This function converts an expression tree into a dict of constant input values, and
     valid python code that acts like the tree's :func:`pybamm.Symbol.evaluate` function
@@ -392,11 +489,14 @@ def to_python(symbol, debug=False, output_jax=False):
         If True, only numpy and jax operations will be used in the generated code.
         Raises NotImplNotImplementedError if any SparseStack or Mat-Mat multiply
         operations are used
+    output_numba: bool
+        If True, the generated code can be compiled by Numba (see
+        :func:`find_symbols`)
 
     """
     constant_values = OrderedDict()
     variable_symbols = OrderedDict()
-    find_symbols(symbol, constant_values, variable_symbols, output_jax)
+    find_symbols(symbol, constant_values, variable_symbols, output_jax, output_numba)
 
     line_format = "{} = {}"
 
@@ -494,6 +594,124 @@ class EvaluatorPython:
             return result
 
 
+class EvaluatorNumba:
+    """
+    Converts a pybamm expression tree into python code that will calculate the result
+    of calling `evaluate(t, y)` on the given expression tree, and compiles it with
+    Numba (in nopython mode, on the first call). Products of sparse matrices by
+    vectors are calculated by a CSR kernel (:func:`csr_matvec`), which writes into
+    work buffers allocated once, when the tree is converted. The work buffers are
+    shared between calls, so an evaluator must not be called from several threads at
+    once.
+
+    Limitations: Numba does not support scipy sparse matrices, so trees with any
+    operation involving sparse matrices other than a product by a vector (for
+    example most Jacobians), or with functions that aren't numpy ufuncs (for example
+    interpolants), raise a NotImplementedError
+
+    Parameters
+    ----------
+
+    symbol : :class:`pybamm.Symbol`
+        The symbol to convert to python code
+    """
+
+    def __init__(self, symbol):
+        if not have_numba():
+            raise ImportError("numba is not installed")
+
+        constants, python_str = pybamm.to_python(
+            symbol, debug=False, output_numba=True
+        )
+
+        # sparse matrices are passed in as the tuple of their CSR arrays, and
+        # vectors as flat arrays, which give much simpler (and faster to compile)
+        # code than column vectors
+        for symbol_id, value in constants.items():
+            if scipy.sparse.issparse(value):
+                value = scipy.sparse.csr_matrix(value)
+                constants[symbol_id] = (value.data, value.indices, value.indptr)
+            elif isinstance(value, np.ndarray) and value.shape[1:] == (1,):
+                constants[symbol_id] = value.reshape(-1)
+
+        # input parameters are passed in as separate arguments, as numba can't take
+        # a dict
+        self._input_names = list(
+            OrderedDict.fromkeys(re.findall(r"inputs\['(.*?)'\]", python_str))
+        )
+        input_args = []
+        for i, name in enumerate(self._input_names):
+            input_args.append("input_{:d}".format(i))
+            python_str = python_str.replace("inputs['{}']".format(name), input_args[-1])
+
+        # get a list of constant arguments to input to the function
+        arg_list = [
+            id_to_python_variable(symbol_id, True) for symbol_id in constants.keys()
+        ]
+
+        # store constants
+        self._constants = tuple(constants.values())
+
+        # indent code
+        python_str = "   " + python_str
+        python_str = python_str.replace("\n", "\n   ")
+
+        # add function def to first line
+        args = ", ".join(["t", "y"] + input_args + arg_list)
+        python_str = "def evaluate_numba({}):\n".format(args) + python_str
+
+        # calculate the final variable that will output the result of calling `evaluate`
+        # on `symbol`
+        result_var = id_to_python_variable(symbol.id, symbol.is_constant())
+        if symbol.is_constant():
+            result_value = symbol.evaluate()
+
+        # add return line, copying the result if it is (a view of) a work buffer
+        result = symbol
+        while isinstance(result, pybamm.Index):
+            result = result.child
+        if symbol.is_constant() and isinstance(result_value, numbers.Number):
+            python_str = python_str + "\n   return " + str(result_value)
+        elif result.id in constants and not result.is_constant():
+            python_str = python_str + "\n   return " + result_var + ".copy()"
+        else:
+            python_str = python_str + "\n   return " + result_var
+
+        # store the final generated code
+        self._python_str = python_str
+        self._symbol = symbol
+
+        # compile and run the generated python code, and compile the result with numba
+        namespace = {"np": np, "csr_matvec": csr_matvec}
+        compiled_function = compile(python_str, result_var, "exec")
+        exec(compiled_function, namespace)
+        self._evaluate = numba.njit(namespace["evaluate_numba"])
+
+    def evaluate(self, t=None, y=None, y_dot=None, inputs=None, known_evals=None):
+        """
+        Acts as a drop-in replacement for :func:`pybamm.Symbol.evaluate`
+        """
+        # generated code assumes y is a flat vector
+        if y is not None:
+            y = y.reshape(-1)
+        input_values = [
+            inputs[name].reshape(-1)
+            if isinstance(inputs[name], np.ndarray)
+            else inputs[name]
+            for name in self._input_names
+        ]
+
+        result = self._evaluate(t, y, *input_values, *self._constants)
+        if isinstance(result, np.ndarray):
+            result = result.reshape(-1, 1)
+
+        # don't need known_evals, but need to reproduce Symbol.evaluate signature
+        if known_evals is not None:
+            return result, known_evals
+        else:
+            return result
+
+
 class EvaluatorJax:
     """
     Converts a pybamm expression tree into pure python code that will calculate the
@@ -578,6 +796,7 @@ class EvaluatorJax:
 
         n = len(arg_list)
         static_argnums = tuple(static_argnums)
+        self._static_argnums = static_argnums
         self._jit_evaluate = jax.jit(self._evaluate_jax,
                                      static_argnums=static_argnums)
 
@@ -589,6 +808,32 @@ class EvaluatorJax:
     def get_jacobian(self):
         return EvaluatorJaxJacobian(self._jac_evaluate, self._constants)
 
+    def get_jacobian_vector_product(self):
+        """
+        Returns a function `jvp(t, y, y_dot, inputs, seeds)` calculating the product
+        of the Jacobian (with respect to y) by each column of `seeds`, in forward mode
+        """
+        n = len(self._constants)
+
+        def jvp_evaluate(*args):
+            constants = args[:n]
+            t, y, y_dot, inputs, seeds = args[n:]
+
+            def evaluate(y):
+                return self._evaluate_jax(*constants, t, y, y_dot, inputs)
+
+            def directional_derivative(seed):
+                return jax.jvp(evaluate, (y,), (seed.reshape(y.shape),))[1]
+
+            return jax.vmap(directional_derivative, in_axes=1, out_axes=1)(seeds)
+
+        jit_jvp_evaluate = jax.jit(jvp_evaluate, static_argnums=self._static_argnums)
+
+        def jvp(t, y, y_dot, inputs, seeds):
+            return jit_jvp_evaluate(*self._constants, t, y, y_dot, inputs, seeds)
+
+        return jvp
+
     def debug(self, t=None, y=None, y_dot=None, inputs=None, known_evals=None):
         # generated code assumes y is a column vector
         if y is not None and y.ndim == 1:
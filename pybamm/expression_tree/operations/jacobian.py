@@ -24,11 +24,11 @@ class Jacobian(object):
 
     def jac(self, symbol, variable):
         """
-        This function recurses down the tree, computing the Jacobian using
+        This function walks down the tree, computing the Jacobian using
         the Jacobians defined in classes derived from pybamm.Symbol. E.g. the
         Jacobian of a 'pybamm.Multiplication' is computed via the product rule.
         If the Jacobian of a symbol has already been calculated, the stored value
-        is returned.
+        is returned. The tree is traversed iteratively (see :func:`pybamm.traverse`).
         Note: The Jacobian is the derivative of a symbol with respect to a (slice of)
         a State Vector.
 
@@ -44,41 +44,44 @@ class Jacobian(object):
         :class:`pybamm.Symbol`
             Symbol representing the Jacobian
         """
+        return pybamm.traverse(
+            symbol,
+            lambda node, children_jacs: self._jac(node, variable, children_jacs),
+            memo=self._known_jacs,
+            children=self._children,
+        )
+
+    def _children(self, symbol):
+        "Children whose Jacobians are needed to calculate the Jacobian of a symbol"
+        if isinstance(
+            symbol, (pybamm.BinaryOperator, pybamm.UnaryOperator, pybamm.Function)
+        ):
+            return symbol.children
+        elif isinstance(symbol, pybamm.Concatenation):
+            return symbol.cached_children
+        else:
+            return []
 
-        try:
-            return self._known_jacs[symbol.id]
-        except KeyError:
-            jac = self._jac(symbol, variable)
-            self._known_jacs[symbol.id] = jac
-            return jac
-
-    def _jac(self, symbol, variable):
-        """ See :meth:`Jacobian.jac()`. """
+    def _jac(self, symbol, variable, children_jacs):
+        """
+        See :meth:`Jacobian.jac()`. Calculates the Jacobian of a symbol given the
+        Jacobians of its children.
+        """
 
         if isinstance(symbol, pybamm.BinaryOperator):
-            left, right = symbol.children
-            # process children
-            left_jac = self.jac(left, variable)
-            right_jac = self.jac(right, variable)
+            left_jac, right_jac = children_jacs
             # _binary_jac defined in derived classes for specific rules
             jac = symbol._binary_jac(left_jac, right_jac)
 
         elif isinstance(symbol, pybamm.UnaryOperator):
-            child_jac = self.jac(symbol.child, variable)
             # _unary_jac defined in derived classes for specific rules
-            jac = symbol._unary_jac(child_jac)
+            jac = symbol._unary_jac(children_jacs[0])
 
         elif isinstance(symbol, pybamm.Function):
-            children_jacs = [None] * len(symbol.children)
-            for i, child in enumerate(symbol.children):
-                children_jacs[i] = self.jac(child, variable)
             # _function_jac defined in function class
             jac = symbol._function_jac(children_jacs)
 
         elif isinstance(symbol, pybamm.Concatenation):
-            children_jacs = [
-                self.jac(child, variable) for child in symbol.cached_children
-            ]
             jac = symbol._concatenation_jac(children_jacs)
 
         else:
@@ -3,6 +3,7 @@
 #
 import pybamm
 
+import copy
 import numpy as np
 import numbers
 from scipy.sparse import issparse, csr_matrix
@@ -44,6 +45,18 @@ def simplify_if_constant(symbol, keep_domains=False):
     return symbol
 
 
+def _without_domains(symbol):
+    """
+    Return a symbol with its domains cleared. The symbol is copied (sharing its
+    children) if it has domains, as it can be part of other expression trees.
+    """
+    if symbol.domain == [] and symbol.auxiliary_domains == {}:
+        return symbol
+    new_symbol = copy.copy(symbol)
+    new_symbol.clear_domains()
+    return new_symbol
+
+
 def simplify_addition_subtraction(myclass, left, right):
     """
     if children are associative (addition, subtraction, etc) then try to find groups of
@@ -98,8 +111,8 @@ def simplify_addition_subtraction(myclass, left, right):
         (1 + 2) - (2 + 3) -> [1, 2, 2, 3] and [None, Addition, Subtraction, Subtraction]
         """
 
-        left_child.clear_domains()
-        right_child.clear_domains()
+        left_child = _without_domains(left_child)
+        right_child = _without_domains(right_child)
         for side, child in [("left", left_child), ("right", right_child)]:
             if isinstance(child, (pybamm.Addition, pybamm.Subtraction)):
                 left, right = child.orphans
@@ -299,8 +312,8 @@ def simplify_multiplication_division(myclass, left, right):
         1 / (c / 2) ->  [1, 2]       [c]       [None, Multiplication]
         """
 
-        left_child.clear_domains()
-        right_child.clear_domains()
+        left_child = _without_domains(left_child)
+        right_child = _without_domains(right_child)
         for side, child in [("left", left_child), ("right", right_child)]:
 
             if side == "left":
@@ -566,13 +579,16 @@ def simplify_multiplication_division(myclass, left, right):
 class Simplification(object):
     def __init__(self, simplified_symbols=None):
         self._simplified_symbols = simplified_symbols or {}
+        # Whether each simplified node is constant
+        self._constant_symbols = {}
 
     def simplify(self, symbol, clear_domains=True):
         """
-        This function recurses down the tree, applying any simplifications defined in
+        This function walks down the tree, applying any simplifications defined in
         classes derived from pybamm.Symbol. E.g. any expression multiplied by a
         pybamm.Scalar(0) will be simplified to a pybamm.Scalar(0).
         If a symbol has already been simplified, the stored value is returned.
+        The tree is traversed iteratively (see :func:`pybamm.traverse`).
 
         Parameters
         ----------
@@ -586,50 +602,63 @@ class Simplification(object):
         :class:`pybamm.Symbol`
         Simplified symbol
         """
+        # Nodes whose domains must be kept (the children of gradients, divergences and
+        # integrals), identified by object rather than id
+        keep_domains = set() if clear_domains else {id(symbol)}
 
-        try:
-            return self._simplified_symbols[symbol.id]
-        except KeyError:
-            simplified_symbol = self._simplify(symbol, clear_domains)
-
-            self._simplified_symbols[symbol.id] = simplified_symbol
-
-            return simplified_symbol
-
-    def _simplify(self, symbol, clear_domains=True):
-        """ See :meth:`Simplification.simplify()`. """
-        if clear_domains:
-            symbol.clear_domains()
+        def enter(node):
+            # Reassign domain for gradient and divergence
+            if isinstance(node, (pybamm.Gradient, pybamm.Divergence, pybamm.Integral)):
+                keep_domains.add(id(node.child))
+
+        def visit(node, simplified_children):
+            if id(node) not in keep_domains:
+                node = _without_domains(node)
+            return self._simplify(node, simplified_children)
+
+        return pybamm.traverse(
+            symbol,
+            visit,
+            memo=self._simplified_symbols,
+            children=self._children,
+            enter=enter,
+        )
+
+    def _children(self, symbol):
+        "Children that must be simplified before a symbol"
+        if isinstance(
+            symbol,
+            (
+                pybamm.BinaryOperator,
+                pybamm.UnaryOperator,
+                pybamm.Function,
+                pybamm.Concatenation,
+            ),
+        ):
+            return symbol.children
+        else:
+            return []
 
+    def _simplify(self, symbol, simplified_children):
+        """
+        See :meth:`Simplification.simplify()`. Simplifies a symbol given its simplified
+        children.
+        """
         if isinstance(symbol, pybamm.BinaryOperator):
-            left, right = symbol.children
-            # process children
-            new_left = self.simplify(left)
-            new_right = self.simplify(right)
+            new_left, new_right = simplified_children
             # _binary_simplify defined in derived classes for specific rules
             new_symbol = symbol._binary_simplify(new_left, new_right)
 
         elif isinstance(symbol, pybamm.UnaryOperator):
-            # Reassign domain for gradient and divergence
-            if isinstance(
-                symbol, (pybamm.Gradient, pybamm.Divergence, pybamm.Integral)
-            ):
-                new_child = self.simplify(symbol.child, clear_domains=False)
-            else:
-                new_child = self.simplify(symbol.child)
             # _unary_simplify defined in derived classes for specific rules
-            new_symbol = symbol._unary_simplify(new_child)
+            new_symbol = symbol._unary_simplify(simplified_children[0])
 
         elif isinstance(symbol, pybamm.Function):
-            simplified_children = [None] * len(symbol.children)
-            for i, child in enumerate(symbol.children):
-                simplified_children[i] = self.simplify(child)
             # _function_simplify defined in function class
             new_symbol = symbol._function_simplify(simplified_children)
 
         elif isinstance(symbol, pybamm.Concatenation):
-            new_children = [self.simplify(child) for child in symbol.children]
-            new_symbol = symbol._concatenation_simplify(new_children)
+            new_symbol = symbol._concatenation_simplify(simplified_children)
 
         else:
             # Backup option: return new copy of the object
@@ -641,4 +670,7 @@ class Simplification(object):
                     "Cannot simplify symbol of type '{}'".format(type(symbol))
                 )
 
-        return simplify_if_constant(new_symbol)
+        # Only try to evaluate constant symbols, checking iteratively whether they are
+        if pybamm.tree_is_constant(new_symbol, memo=self._constant_symbols):
+            return simplify_if_constant(new_symbol)
+        return new_symbol
@@ -0,0 +1,118 @@
+#
+# Iterative post-order traversal of an expression tree
+#
+import pybamm
+
+from collections import deque
+
+
+def traverse(symbol, visit, memo=None, children=None, enter=None):
+    """
+    Apply a function to every node of an expression tree, children before parents,
+    without recursion, so that the depth of the tree is not limited by Python's
+    recursion limit. Results are memoised by node id: a subtree that appears several
+    times in the tree (or that has been processed by a previous call sharing the same
+    `memo`) is only processed once.
+
+    Parameters
+    ----------
+    symbol : :class:`pybamm.Symbol`
+        The root of the expression tree
+    visit : callable
+        Function called as `visit(node, processed_children)` once the children of
+        `node` have been processed, where `processed_children` is the list of the
+        results for the children returned by `children(node)`. Returns the result
+        for `node`
+    memo : dict, optional
+        Results of the nodes already processed, keyed by node id. Updated in place.
+        The children of a node found in `memo` are not visited.
+    children : callable, optional
+        Function returning the children of a node that must be processed before
+        the node itself. Default is `node.children`
+    enter : callable, optional
+        Function called on each node before its children are processed
+
+    Returns
+    -------
+    object
+        The result for `symbol`
+    """
+    if memo is None:
+        memo = {}
+    try:
+        return memo[symbol.id]
+    except KeyError:
+        pass
+
+    # Each entry of the stack is a node, with None if its children haven't been
+    # pushed yet, or with the children to collect the results of once they have
+    stack = [(symbol, None)]
+    while stack:
+        node, node_children = stack.pop()
+        if node_children is None:
+            # A node can be pushed by several parents before being processed
+            if node.id in memo:
+                continue
+            if enter is not None:
+                enter(node)
+            node_children = node.children if children is None else children(node)
+            stack.append((node, node_children))
+            for child in reversed(node_children):
+                if child.id not in memo:
+                    stack.append((child, None))
+        elif node.id not in memo:
+            memo[node.id] = visit(node, [memo[child.id] for child in node_children])
+
+    return memo[symbol.id]
+
+
+def tree_is_constant(symbol, memo=None):
+    """
+    Check whether an expression tree is constant, as :meth:`pybamm.Symbol.is_constant`
+    does, but without recursion. If `memo` is given, the result is remembered for
+    every node of the tree; otherwise the tree is searched breadth-first, stopping at
+    the shallowest node found not to be constant.
+
+    Parameters
+    ----------
+    symbol : :class:`pybamm.Symbol`
+        The expression tree to check
+    memo : dict, optional
+        Whether each node already checked is constant, keyed by node id. Updated in
+        place.
+
+    Returns
+    -------
+    bool
+        Whether the expression tree is constant
+    """
+    if memo is not None:
+        return traverse(symbol, _is_constant, memo=memo)
+
+    operations = _operations()
+    queue = deque([symbol])
+    while queue:
+        node = queue.popleft()
+        if isinstance(node, operations):
+            queue.extend(node.children)
+        elif not node.is_constant():
+            return False
+    return True
+
+
+def _operations():
+    "Operators, functions and concatenations are constant if all their children are"
+    return (
+        pybamm.BinaryOperator,
+        pybamm.UnaryOperator,
+        pybamm.Function,
+        pybamm.Concatenation,
+    )
+
+
+def _is_constant(symbol, children_constant):
+    "Whether a symbol is constant, given whether each of its children is"
+    if isinstance(symbol, _operations()):
+        return all(children_constant)
+    else:
+        return symbol.is_constant()
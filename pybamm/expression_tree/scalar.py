@@ -23,6 +23,8 @@ class Scalar(pybamm.Symbol):
 
     """
 
+    __slots__ = ("_value",)
+
     def __init__(self, value, name=None, domain=[]):
         # set default name if not provided
         self.value = value
@@ -29,6 +29,8 @@ class StateVectorBase(pybamm.Symbol):
     *Extends:* :class:`pybamm.Symbol`
     """
 
+    __slots__ = ("_y_slices", "_first_point", "_last_point", "_evaluation_array")
+
     def __init__(
         self,
         *y_slices,
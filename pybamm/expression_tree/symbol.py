@@ -5,7 +5,6 @@ import pybamm
 
 import anytree
 import numbers
-import copy
 import numpy as np
 from anytree.exporter import DotExporter
 
@@ -65,8 +64,13 @@ def is_constant(symbol):
     return isinstance(symbol, numbers.Number) or symbol.is_constant()
 
 
-class Symbol(anytree.NodeMixin):
-    """Base node class for the expression tree
+class Symbol(object):
+    """Base node class for the expression tree.
+
+    Nodes hold their children in a tuple, and don't keep track of their parents, so
+    that a node can be shared by several expression trees without being copied. A node
+    must therefore not be modified once it has been used to create another node (use
+    :meth:`new_copy` to get a node that can be modified instead).
 
     Parameters
     ----------
@@ -89,20 +93,32 @@ class Symbol(anytree.NodeMixin):
 
     """
 
+    # Attributes common to all nodes are stored in slots rather than in a dictionary,
+    # to reduce the memory taken by large expression trees. Other attributes are
+    # stored in a dictionary, which is only created when one is first set
+    __slots__ = (
+        "_name",
+        "_children",
+        "_domains",
+        "_auxiliary_domains",
+        "_id",
+        "_saved_shape",
+        "_saved_size",
+        "_saved_evaluate_for_shape",
+        "mesh",
+        "secondary_mesh",
+        "__dict__",
+        "__weakref__",
+    )
+
     def __init__(self, name, children=None, domain=None, auxiliary_domains=None):
-        super(Symbol, self).__init__()
         self.name = name
 
+        # Children are shared, not copied
         if children is None:
-            children = []
-
-        for child in children:
-            # copy child before adding
-            # this also adds copy.copy(child) to self.children
-            copy.copy(child).parent = self
-
-        # cache children
-        self.cached_children = super(Symbol, self).children
+            self._children = ()
+        else:
+            self._children = tuple(children)
 
         # Set auxiliary domains
         self._domains = {"primary": None}
@@ -123,13 +139,18 @@ class Symbol(anytree.NodeMixin):
     @property
     def children(self):
         """
-        returns the cached children of this node.
+        returns the children of this node, as a tuple.
 
         Note: it is assumed that children of a node are not modified after initial
         creation
 
         """
-        return self.cached_children
+        return self._children
+
+    @property
+    def cached_children(self):
+        "Alias of :attr:`children`"
+        return self._children
 
     @property
     def name(self):
@@ -207,8 +228,7 @@ class Symbol(anytree.NodeMixin):
 
     def copy_domains(self, symbol):
         "Copy the domains from a given symbol, bypassing checks"
-        self._domains = symbol.domains
-        self._domain = self._domains["primary"]
+        self._domains = symbol.domains.copy()
         self._auxiliary_domains = {
             k: v for k, v in self._domains.items() if k != "primary"
         }
@@ -216,7 +236,6 @@ class Symbol(anytree.NodeMixin):
     def clear_domains(self):
         "Clear domains, bypassing checks"
         self._domains = {"primary": []}
-        self._domain = []
         self._auxiliary_domains = {}
 
     def get_children_auxiliary_domains(self, children):
@@ -249,8 +268,8 @@ class Symbol(anytree.NodeMixin):
         Set the immutable "identity" of a variable (e.g. for identifying y_slices).
 
         This is identical to what we'd put in a __hash__ function
-        However, implementing __hash__ requires also implementing __eq__,
-        which would then mess with loop-checking in the anytree module.
+        However, implementing __hash__ requires also implementing __eq__, whereas
+        symbols are compared by identity.
 
         Hashing can be slow, so we set the id when we create the node, and hence only
         need to hash once.
@@ -265,8 +284,8 @@ class Symbol(anytree.NodeMixin):
     @property
     def orphans(self):
         """
-        Returning new copies of the children, with parents removed to avoid corrupting
-        the expression tree internal data
+        Returning new copies of the children, which can be modified without corrupting
+        this expression tree
         """
         return tuple([child.new_copy() for child in self.children])
 
@@ -274,11 +293,20 @@ class Symbol(anytree.NodeMixin):
         """print out a visual representation of the tree (this node and its
         children)
         """
-        for pre, _, node in anytree.RenderTree(self):
+        # Each node is printed with a prefix, and passes another prefix on to its
+        # children
+        stack = [(self, "", "")]
+        while stack:
+            node, pre, children_pre = stack.pop()
             if isinstance(node, pybamm.Scalar) and node.name != str(node.value):
                 print("{}{} = {}".format(pre, node.name, node.value))
             else:
                 print("{}{}".format(pre, node.name))
+            for i, child in reversed(list(enumerate(node.children))):
+                if i == len(node.children) - 1:
+                    stack.append((child, children_pre + "└── ", children_pre + "    "))
+                else:
+                    stack.append((child, children_pre + "├── ", children_pre + "│   "))
 
     def visualise(self, filename):
         """
@@ -357,7 +385,13 @@ class Symbol(anytree.NodeMixin):
         b
 
         """
-        return anytree.PreOrderIter(self)
+        # Iterate with a stack rather than recursively, so that deep trees don't reach
+        # the recursion limit
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
 
     def __str__(self):
         """return a string representation of the node and its children"""
@@ -748,8 +782,9 @@ class Symbol(anytree.NodeMixin):
 
     def new_copy(self):
         """
-        Make a new copy of a symbol, to avoid Tree corruption errors while bypassing
-        copy.deepcopy(), which is slow.
+        Make a new copy of a symbol, which shares its children with the original, so
+        that the copy can be modified without corrupting the expression trees the
+        original is part of.
         """
         raise NotImplementedError(
             """method self.new_copy() not implemented
@@ -24,6 +24,8 @@ class UnaryOperator(pybamm.Symbol):
 
     """
 
+    __slots__ = ("child",)
+
     def __init__(self, name, child, domain=None, auxiliary_domains=None):
         if isinstance(child, numbers.Number):
             child = pybamm.Scalar(child)
@@ -42,8 +44,7 @@ class UnaryOperator(pybamm.Symbol):
 
     def new_copy(self):
         """ See :meth:`pybamm.Symbol.new_copy()`. """
-        new_child = self.child.new_copy()
-        return self._unary_new_copy(new_child)
+        return self._unary_new_copy(self.child)
 
     def _unary_new_copy(self, child):
         """Make a new copy of the unary operator, with child `child`"""
@@ -92,7 +93,8 @@ class UnaryOperator(pybamm.Symbol):
 
     def is_constant(self):
         """ See :meth:`pybamm.Symbol.is_constant()`. """
-        return self.child.is_constant()
+        # Checked without recursion, as the tree can be deep
+        return pybamm.tree_is_constant(self)
 
 
 class Negate(UnaryOperator):
@@ -238,6 +240,8 @@ class Index(UnaryOperator):
         unnecessarily repeating the check.
     """
 
+    __slots__ = ("index", "slice")
+
     def __init__(self, child, index, name=None, check_size=True):
         self.index = index
         if index == -1:
@@ -1140,9 +1144,7 @@ def x_average(symbol):
         raise ValueError("Can't take the x-average of a symbol that evaluates on edges")
     # If symbol doesn't have a domain, its average value is itself
     if symbol.domain in [[], ["current collector"]]:
-        new_symbol = symbol.new_copy()
-        new_symbol.parent = None
-        return new_symbol
+        return symbol.new_copy()
     # If symbol is a Broadcast, its average value is its child
     elif isinstance(symbol, pybamm.Broadcast):
         return symbol.orphans[0]
@@ -1215,9 +1217,7 @@ def z_average(symbol):
         )
     # If symbol doesn't have a domain, its average value is itself
     if symbol.domain == []:
-        new_symbol = symbol.new_copy()
-        new_symbol.parent = None
-        return new_symbol
+        return symbol.new_copy()
     # If symbol is a Broadcast, its average value is its child
     elif isinstance(symbol, pybamm.Broadcast):
         return symbol.orphans[0]
@@ -1252,9 +1252,7 @@ def yz_average(symbol):
         )
     # If symbol doesn't have a domain, its average value is itself
     if symbol.domain == []:
-        new_symbol = symbol.new_copy()
-        new_symbol.parent = None
-        return new_symbol
+        return symbol.new_copy()
     # If symbol is a Broadcast, its average value is its child
     elif isinstance(symbol, pybamm.Broadcast):
         return symbol.orphans[0]
@@ -1287,9 +1285,7 @@ def r_average(symbol):
     # Otherwise, if symbol doesn't have a particle domain,
     # its r-averaged value is itself
     elif symbol.domain not in [["positive particle"], ["negative particle"]]:
-        new_symbol = symbol.new_copy()
-        new_symbol.parent = None
-        return new_symbol
+        return symbol.new_copy()
     # If symbol is a secondary broadcast onto "negative electrode" or
     # "positive electrode", take the r-average of the child then broadcast back
     elif isinstance(symbol, pybamm.SecondaryBroadcast) and symbol.domains[
@@ -1329,9 +1325,7 @@ def boundary_value(symbol, side):
     """
     # If symbol doesn't have a domain, its boundary value is itself
     if symbol.domain == []:
-        new_symbol = symbol.new_copy()
-        new_symbol.parent = None
-        return new_symbol
+        return symbol.new_copy()
     # If symbol is a primary or full broadcast, its boundary value is its child
     if isinstance(symbol, (pybamm.PrimaryBroadcast, pybamm.FullBroadcast)):
         return symbol.orphans[0]
@@ -32,6 +32,8 @@ class VariableBase(pybamm.Symbol):
     *Extends:* :class:`Symbol`
     """
 
+    __slots__ = ("bounds",)
+
     def __init__(self, name, domain=None, auxiliary_domains=None, bounds=None):
         if domain is None:
             domain = []
@@ -69,10 +69,24 @@ class BaseModel(object):
         solver set up
     use_jacobian : bool
         Whether to use the Jacobian when solving the model (default is True)
+    jacobian_method : str
+        How to calculate the Jacobian, if using it, for the "python", "numba" and
+        "jax" formats:
+
+        - "symbolic": build the expression tree of the Jacobian, and simplify and \
+        convert it like the rhs and algebraic equations.
+        - "colouring": find the sparsity pattern of the Jacobian from the expression \
+        tree, and evaluate it with one directional derivative per group of \
+        independent columns (see :class:`pybamm.ColouredJacobian`). Faster to set \
+        up for large models. Falls back to "symbolic" if the sparsity pattern can't \
+        be found.
+
+        Default is "symbolic".
     use_simplify : bool
         Whether to simplify the expression tress representing the rhs and
-        algebraic equations, Jacobain (if using) and events, before solving the
-        model (default is True)
+        algebraic equations, Jacobain (if using) and events, and to eliminate their
+        common subexpressions (see :class:`pybamm.CommonSubexpressionElimination`),
+        before solving the model (default is True)
     convert_to_format : str
         Whether to convert the expression trees representing the rhs and
         algebraic equations, Jacobain (if using) and events into a different format:
@@ -80,6 +94,11 @@ class BaseModel(object):
         - None: keep PyBaMM expression tree structure.
         - "python": convert into pure python code that will calculate the result of \
         calling `evaluate(t, y)` on the given expression treeself.
+        - "numba": convert into python code like "python", and compile it with \
+        Numba (see :class:`pybamm.EvaluatorNumba`). Expression trees that can't be \
+        compiled are converted to "python". Symbolic Jacobians are always \
+        converted to "python": use `jacobian_method = "colouring"` to calculate \
+        the Jacobian from the compiled functions.
         - "casadi": convert into CasADi expression tree, which then uses CasADi's \
         algorithm to calculate the Jacobian.
 
@@ -109,8 +128,20 @@ class BaseModel(object):
         self._parameters = None
         self._input_parameters = None
 
+        # Compiled CasADi functions of the variables, used for post-processing
+        self.variables_casadi = {}
+        # Dependencies of the nodes of the variables, keyed by node id
+        self._dependencies_memo = {}
+        # Time (in seconds) taken by each stage of processing the model
+        self.profile = {}
+        # Inputs with respect to which the solver calculates the sensitivities
+        self.calculate_sensitivities = []
+        # Variables that the solver stores in the solution instead of the states
+        self.output_variables = []
+
         # Default behaviour is to use the jacobian and simplify
         self.use_jacobian = True
+        self.jacobian_method = "symbolic"
         self.use_simplify = True
         self.convert_to_format = "casadi"
 
@@ -310,6 +341,40 @@ class BaseModel(object):
         )
         return list(all_input_parameters.values())
 
+    def get_variable_dependencies(self, variables):
+        """
+        Find the parts of the state vector and the input parameters that (discretised)
+        variables depend on, so that only these need to be passed to evaluate them or
+        stored to post-process them. The dependencies of the nodes of the variables are
+        cached, so that the variables, which share many subtrees, are each searched
+        once.
+
+        Parameters
+        ----------
+        variables : str, :class:`pybamm.Symbol` or list
+            Names of variables in :attr:`variables`, or expression trees
+
+        Returns
+        -------
+        y_slices : tuple of slice
+            Sorted, disjoint slices of the state vector that the variables read
+        inputs : tuple of str
+            Sorted names of the input parameters that the variables read
+        """
+        if isinstance(variables, (str, pybamm.Symbol)):
+            variables = [variables]
+        all_slices = []
+        all_inputs = set()
+        for variable in variables:
+            if isinstance(variable, str):
+                variable = self.variables[variable]
+            y_slices, inputs = pybamm.find_dependencies(
+                variable, memo=self._dependencies_memo
+            )
+            all_slices.extend(y_slices)
+            all_inputs.update(inputs)
+        return pybamm.merge_slices(all_slices), tuple(sorted(all_inputs))
+
     def __getitem__(self, key):
         return self.rhs[key]
 
@@ -320,6 +385,7 @@ class BaseModel(object):
         """
         new_model = self.__class__(name=self.name)
         new_model.use_jacobian = self.use_jacobian
+        new_model.jacobian_method = self.jacobian_method
         new_model.use_simplify = self.use_simplify
         new_model.convert_to_format = self.convert_to_format
         new_model.timescale = self.timescale
@@ -636,6 +636,7 @@ class BaseBatteryModel(pybamm.BaseModel):
         if build:
             new_model.build_model()
         new_model.use_jacobian = self.use_jacobian
+        new_model.jacobian_method = self.jacobian_method
         new_model.use_simplify = self.use_simplify
         new_model.convert_to_format = self.convert_to_format
         new_model.timescale = self.timescale
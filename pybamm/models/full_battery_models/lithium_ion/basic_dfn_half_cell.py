@@ -468,6 +468,7 @@ class BasicDFNHalfCell(BaseModel):
     def new_copy(self, build=False):
         new_model = self.__class__(name=self.name, options=self.options)
         new_model.use_jacobian = self.use_jacobian
+        new_model.jacobian_method = self.jacobian_method
         new_model.use_simplify = self.use_simplify
         new_model.convert_to_format = self.convert_to_format
         new_model.timescale = self.timescale
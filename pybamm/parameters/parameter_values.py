@@ -56,6 +56,8 @@ class ParameterValues:
 
     def __init__(self, values=None, chemistry=None):
         self._dict_items = pybamm.FuzzyDict()
+        # Names of the parameters that are processed as input parameters
+        self._input_names = set()
         # Must provide either values or chemistry, not both (nor neither)
         if values is not None and chemistry is not None:
             raise ValueError(
@@ -119,7 +121,54 @@ class ParameterValues:
     def copy(self):
         """Returns a copy of the parameter values. Makes sure to copy the internal
         dictionary."""
-        return ParameterValues(values=self._dict_items.copy())
+        new_parameter_values = ParameterValues(values=self._dict_items.copy())
+        new_parameter_values._input_names = self._input_names.copy()
+        return new_parameter_values
+
+    def as_inputs(self, names):
+        """
+        Return a copy of the parameter values in which the given parameters are
+        processed as input parameters, so that a model processed with them can be
+        solved for any value of these parameters without being processed again.
+        The values currently stored for the parameters are kept, and given by
+        :meth:`ParameterValues.input_values`.
+
+        Parameters
+        ----------
+        names : iterable of str
+            The names of the parameters to process as input parameters. Each must
+            have a numerical value, i.e. be a scalar parameter or a function parameter
+            given by a constant
+
+        Returns
+        -------
+        :class:`pybamm.ParameterValues`
+            The new parameter values
+
+        Raises
+        ------
+        ValueError
+            If one of the parameters doesn't have a numerical value
+        """
+        new_parameter_values = self.copy()
+        for name in names:
+            value = self[name]
+            if not isinstance(value, numbers.Number):
+                raise ValueError(
+                    "Cannot process parameter '{}' as an input parameter, as its "
+                    "value ({}) is not a number".format(name, value)
+                )
+            new_parameter_values._input_names.add(name)
+        return new_parameter_values
+
+    @property
+    def input_values(self):
+        """
+        The parameters that are processed as input parameters (see
+        :meth:`ParameterValues.as_inputs`), and their current values, which can be
+        passed as `inputs` to a solver.
+        """
+        return {name: self[name] for name in self._input_names}
 
     def search(self, key, print_values=True):
         """
@@ -286,6 +335,9 @@ class ParameterValues:
                     values[name] = float(value)
             else:
                 self._dict_items[name] = value
+            # parameters processed as inputs must keep a numerical value
+            if not isinstance(self._dict_items[name], numbers.Number):
+                self._input_names.discard(name)
         # reset processed symbols
         self._processed_symbols = {}
 
@@ -351,6 +403,7 @@ class ParameterValues:
         pybamm.logger.info(
             "Start setting parameters for {}".format(unprocessed_model.name)
         )
+        timer = pybamm.Timer()
 
         # set up inplace vs not inplace
         if inplace:
@@ -405,6 +458,10 @@ class ParameterValues:
         for domain, scale in model.length_scales.items():
             model.length_scales[domain] = self.process_symbol(scale)
 
+        model.profile = {
+            **unprocessed_model.profile,
+            "parameter processing": timer.time(),
+        }
         pybamm.logger.info("Finish setting parameters for {}".format(model.name))
 
         return model
@@ -477,6 +534,7 @@ class ParameterValues:
     def process_symbol(self, symbol):
         """Walk through the symbol and replace any Parameter with a Value.
         If a symbol has already been processed, the stored value is returned.
+        The tree is traversed iteratively (see :func:`pybamm.traverse`).
 
         Parameters
         ----------
@@ -490,20 +548,40 @@ class ParameterValues:
 
         """
 
-        try:
-            return self._processed_symbols[symbol.id]
-        except KeyError:
-            processed_symbol = self._process_symbol(symbol)
+        return pybamm.traverse(
+            symbol,
+            self._process_symbol,
+            memo=self._processed_symbols,
+            children=self._children,
+        )
 
-            self._processed_symbols[symbol.id] = processed_symbol
-            return processed_symbol
+    def _children(self, symbol):
+        "Children that must be processed before a symbol"
+        if isinstance(
+            symbol,
+            (
+                pybamm.FunctionParameter,
+                pybamm.BinaryOperator,
+                pybamm.UnaryOperator,
+                pybamm.Function,
+                pybamm.Concatenation,
+            ),
+        ):
+            return symbol.children
+        else:
+            return []
 
-    def _process_symbol(self, symbol):
-        """ See :meth:`ParameterValues.process_symbol()`. """
+    def _process_symbol(self, symbol, new_children):
+        """
+        See :meth:`ParameterValues.process_symbol()`. Processes a symbol given its
+        processed children.
+        """
 
         if isinstance(symbol, pybamm.Parameter):
             value = self[symbol.name]
-            if isinstance(value, numbers.Number):
+            if symbol.name in self._input_names:
+                return pybamm.InputParameter(symbol.name, domain=symbol.domain)
+            elif isinstance(value, numbers.Number):
                 # Scalar inherits name (for updating parameters) and domain (for
                 # Broadcast)
                 return pybamm.Scalar(value, name=symbol.name, domain=symbol.domain)
@@ -515,8 +593,9 @@ class ParameterValues:
                 raise TypeError("Cannot process parameter '{}'".format(value))
 
         elif isinstance(symbol, pybamm.FunctionParameter):
-            new_children = [self.process_symbol(child) for child in symbol.children]
             function_name = self[symbol.name]
+            if symbol.name in self._input_names:
+                function_name = pybamm.InputParameter(symbol.name)
 
             # Create Function or Interpolant or Scalar object
             if isinstance(function_name, tuple):
@@ -561,9 +640,7 @@ class ParameterValues:
             return self.process_symbol(function_out)
 
         elif isinstance(symbol, pybamm.BinaryOperator):
-            # process children
-            new_left = self.process_symbol(symbol.left)
-            new_right = self.process_symbol(symbol.right)
+            new_left, new_right = new_children
             # make new symbol, ensure domain remains the same
             new_symbol = symbol._binary_new_copy(new_left, new_right)
             new_symbol.domain = symbol.domain
@@ -571,20 +648,17 @@ class ParameterValues:
 
         # Unary operators
         elif isinstance(symbol, pybamm.UnaryOperator):
-            new_child = self.process_symbol(symbol.child)
-            new_symbol = symbol._unary_new_copy(new_child)
+            new_symbol = symbol._unary_new_copy(new_children[0])
             # ensure domain remains the same
             new_symbol.domain = symbol.domain
             return new_symbol
 
         # Functions
         elif isinstance(symbol, pybamm.Function):
-            new_children = [self.process_symbol(child) for child in symbol.children]
             return symbol._function_new_copy(new_children)
 
         # Concatenations
         elif isinstance(symbol, pybamm.Concatenation):
-            new_children = [self.process_symbol(child) for child in symbol.children]
             return symbol._concatenation_new_copy(new_children)
 
         else:
@@ -7,6 +7,10 @@ import numpy as np
 import copy
 import warnings
 import sys
+import os
+import hashlib
+import inspect
+import numbers
 
 
 def is_notebook():
@@ -41,6 +45,68 @@ def constant_current_constant_voltage_constant_power(variables):
     )
 
 
+def _update_hash(hasher, obj, memo=None):
+    """
+    Update a hash object with a representation of `obj` that does not depend on the
+    running process (unlike symbol ids, which use Python's salted string hashes).
+    Digests of expression trees are memoised by node id in `memo`, so that subtrees
+    shared by several expressions (e.g. the variables of a model) are hashed once.
+    """
+    if memo is None:
+        memo = {}
+    if isinstance(obj, dict):
+        hasher.update(b"{")
+        for key, value in sorted(obj.items(), key=lambda item: str(item[0])):
+            _update_hash(hasher, key, memo)
+            _update_hash(hasher, value, memo)
+        hasher.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        hasher.update(b"(")
+        for value in obj:
+            _update_hash(hasher, value, memo)
+        hasher.update(b")")
+    elif isinstance(obj, np.ndarray):
+        hasher.update(str(obj.shape).encode())
+        hasher.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, pybamm.Symbol):
+        hasher.update(pybamm.traverse(obj, _symbol_digest, memo=memo))
+    elif isinstance(obj, pybamm.MeshGenerator):
+        _update_hash(hasher, (obj.submesh_type, obj.submesh_params))
+    elif isinstance(obj, pybamm.SpatialMethod):
+        _update_hash(hasher, (type(obj), obj.options))
+    elif isinstance(obj, type):
+        hasher.update("{}.{}".format(obj.__module__, obj.__qualname__).encode())
+    elif callable(obj):
+        # Use the source code of functions, so that editing a function changes the
+        # hash, and fall back to its name if the source isn't available
+        try:
+            hasher.update(inspect.getsource(obj).encode())
+        except (TypeError, OSError):
+            hasher.update(
+                "{}.{}".format(
+                    getattr(obj, "__module__", ""), getattr(obj, "__qualname__", obj)
+                ).encode()
+            )
+    elif isinstance(obj, bytes):
+        hasher.update(obj)
+    else:
+        hasher.update(repr(obj).encode())
+
+
+def _symbol_digest(symbol, children_digests):
+    "Digest of a node of an expression tree, given the digests of its children"
+    hasher = hashlib.sha256()
+    _update_hash(
+        hasher,
+        (type(symbol).__name__, symbol.name, symbol.domain, symbol.auxiliary_domains),
+    )
+    if isinstance(symbol, (pybamm.Array, pybamm.Interpolant)):
+        _update_hash(hasher, symbol.entries_string)
+    for digest in children_digests:
+        hasher.update(digest)
+    return hasher.digest()
+
+
 class Simulation:
     """A Simulation class for easy building and running of PyBaMM simulations.
 
@@ -69,6 +135,28 @@ class Simulation:
     C_rate: float (optional)
         The C_rate at which you would like to run a constant current
         (dis)charge at.
+    cache_dir: str (optional)
+        Directory of a persistent cache of built models. If provided, the model
+        built (and set up by the solver) for this combination of model equations
+        and options, parameter values, geometry, mesh, spatial methods and solver is
+        saved in this directory after the first solve, and loaded from it instead of
+        being rebuilt by any later simulation with the same settings. Only models
+        converted to CasADi can be cached.
+    lift_parameters: bool (optional)
+        If True, every parameter with a numerical value that doesn't affect the
+        geometry, the timescale or the length scales of the model is replaced by an
+        input parameter when the model is built, and its current value is passed to
+        the solver as an input. Changing the value of such a parameter (e.g. with
+        `sim.parameter_values.update`) then only re-binds the new value into the
+        compiled model, instead of rebuilding it. Changing any other parameter
+        rebuilds the model. Default is False.
+    sweep_parameters: list of str (optional)
+        Names of parameters, with numerical values, to process as input parameters
+        (see :meth:`pybamm.ParameterValues.as_inputs`), so that the model can be
+        built once and solved for many values of these parameters, passed as
+        `inputs` to `solve` or `step`. When no value is given for a parameter, its
+        value in `parameter_values` is used. These parameters must not affect the
+        geometry, the timescale or the length scales of the model.
     """
 
     def __init__(
@@ -83,6 +171,9 @@ class Simulation:
         solver=None,
         output_variables=None,
         C_rate=None,
+        cache_dir=None,
+        lift_parameters=False,
+        sweep_parameters=None,
     ):
         self.parameter_values = parameter_values or model.default_parameter_values
 
@@ -117,12 +208,17 @@ class Simulation:
         else:
             self.set_up_experiment(model, experiment)
 
+        if sweep_parameters:
+            self._parameter_values = self._parameter_values.as_inputs(sweep_parameters)
+
         self.geometry = geometry or self.model.default_geometry
         self.submesh_types = submesh_types or self.model.default_submesh_types
         self.var_pts = var_pts or self.model.default_var_pts
         self.spatial_methods = spatial_methods or self.model.default_spatial_methods
         self.solver = solver or self.model.default_solver
         self.output_variables = output_variables
+        self.cache_dir = cache_dir
+        self.lift_parameters = lift_parameters
 
         # Initialize empty built states
         self._model_with_set_params = None
@@ -130,6 +226,14 @@ class Simulation:
         self._mesh = None
         self._disc = None
         self._solution = None
+        self._built_model_is_cached = False
+        self._cache_key = None
+        # Parameters that can be lifted to inputs, those that have been lifted in the
+        # built model, and the parameter values and geometry it was built with
+        self._liftable_parameters = set()
+        self._lifted_parameters = []
+        self._built_parameter_values = None
+        self._unprocessed_geometry = None
 
         # ignore runtime warnings in notebooks
         if is_notebook():  # pragma: no cover
@@ -250,19 +354,130 @@ class Simulation:
         A method to set the parameters in the model and the associated geometry.
         """
 
-        if self.model_with_set_params:
+        if self._model_with_set_params:
             return None
 
         if self._parameter_values._dict_items == {}:
             # Don't process if parameter values is empty
             self._model_with_set_params = self._unprocessed_model
         else:
-            self._model_with_set_params = self._parameter_values.process_model(
+            parameter_values = self._parameter_values
+            if self.lift_parameters or parameter_values.input_values:
+                structural_parameters = self._find_structural_parameters()
+                swept_structural_parameters = structural_parameters.intersection(
+                    parameter_values.input_values
+                )
+                if swept_structural_parameters:
+                    raise ValueError(
+                        "Cannot sweep parameters {}, as they affect the geometry, the "
+                        "timescale or the length scales of the model".format(
+                            sorted(swept_structural_parameters)
+                        )
+                    )
+            if self.lift_parameters:
+                # Keep the geometry, which is processed in place, in case the model
+                # needs to be rebuilt
+                self._unprocessed_geometry = copy.deepcopy(self._geometry)
+                self._liftable_parameters = self._find_liftable_parameters(
+                    structural_parameters
+                )
+                parameter_values = parameter_values.as_inputs(self._liftable_parameters)
+            self._model_with_set_params = parameter_values.process_model(
                 self._unprocessed_model, inplace=False
             )
             self._parameter_values.process_geometry(self._geometry)
         self.model = self._model_with_set_params
 
+    def _find_structural_parameters(self):
+        """
+        Find the parameters that appear in the geometry (which sets the mesh), the
+        timescale or the length scales of the model (which are evaluated once by the
+        solver), and so can't be processed as input parameters.
+        """
+        model = self._unprocessed_model
+        symbols = [model.timescale] + list(model.length_scales.values())
+        for spatial_limits in self._geometry.values():
+            for spatial_variable, limits in spatial_limits.items():
+                if spatial_variable == "tabs":
+                    limits = {
+                        key: value
+                        for tab in limits.values()
+                        for key, value in tab.items()
+                    }
+                symbols.extend(
+                    sym for sym in limits.values() if isinstance(sym, pybamm.Symbol)
+                )
+        # Find the parameters in these symbols, and in the values of any parameters
+        # that are themselves given by expressions
+        structural_parameters = set()
+        while symbols:
+            for node in symbols.pop().pre_order():
+                if (
+                    isinstance(node, (pybamm.Parameter, pybamm.FunctionParameter))
+                    and node.name not in structural_parameters
+                ):
+                    structural_parameters.add(node.name)
+                    value = self._parameter_values.get(node.name)
+                    if isinstance(value, pybamm.Symbol):
+                        symbols.append(value)
+        return structural_parameters
+
+    def _find_liftable_parameters(self, structural_parameters=None):
+        """
+        Find the parameters that can be lifted to inputs: those with a numerical
+        value that aren't structural (see :meth:`_find_structural_parameters`).
+        """
+        if structural_parameters is None:
+            structural_parameters = self._find_structural_parameters()
+        return {
+            name
+            for name, value in self._parameter_values.items()
+            if isinstance(value, numbers.Number) and name not in structural_parameters
+        }
+
+    def _structure_changed(self):
+        """
+        Check whether any parameter that hasn't been lifted to an input has changed
+        since the model was built, in which case the model must be rebuilt.
+        """
+        old_values = self._built_parameter_values
+        new_values = dict(self._parameter_values.items())
+        input_names = self._liftable_parameters.union(
+            self._parameter_values.input_values
+        )
+        for name in set(old_values) | set(new_values):
+            # Lifted parameters can take any numerical value
+            if name in input_names and isinstance(new_values.get(name), numbers.Number):
+                continue
+            if name not in old_values or name not in new_values:
+                return True
+            old, new = old_values[name], new_values[name]
+            if isinstance(old, numbers.Number) and isinstance(new, numbers.Number):
+                changed = old != new
+            elif isinstance(old, tuple) and isinstance(new, tuple):
+                # Data for interpolants
+                changed = old[0] != new[0] or not np.array_equal(old[1], new[1])
+            elif isinstance(old, pybamm.Symbol) and isinstance(new, pybamm.Symbol):
+                changed = old.id != new.id
+            else:
+                changed = old is not new
+            if changed:
+                return True
+        return False
+
+    def _lifted_inputs(self, inputs):
+        """
+        Add the current values of the lifted and swept parameters to the inputs (or to
+        each set of inputs, if a list is given). Inputs given by the user take
+        precedence.
+        """
+        lifted_inputs = {
+            name: self._parameter_values[name] for name in self._lifted_parameters
+        }
+        if isinstance(inputs, list):
+            return [{**lifted_inputs, **inp} for inp in inputs]
+        return {**lifted_inputs, **(inputs or {})}
+
     def build(self, check_model=True):
         """
         A method to build the model into a system of matrices and vectors suitable for
@@ -279,7 +494,17 @@ class Simulation:
         """
 
         if self.built_model:
-            return None
+            if not (self.lift_parameters and self._structure_changed()):
+                return None
+            pybamm.logger.info(
+                "Rebuilding {}, as parameters that are not lifted to inputs have "
+                "changed".format(self._unprocessed_model.name)
+            )
+            self._reset_build()
+
+        if self._load_from_cache():
+            if self.lift_parameters:
+                self._liftable_parameters = self._find_liftable_parameters()
         elif self.model.is_discretised:
             self._model_with_set_params = self.model
             self._built_model = self.model
@@ -291,6 +516,156 @@ class Simulation:
                 self._model_with_set_params, inplace=False, check_model=check_model
             )
 
+        # Record the parameters that have been lifted to inputs (or are swept) in the
+        # built model, and the values that the model has been built with
+        input_names = self._liftable_parameters.union(
+            self._parameter_values.input_values
+        )
+        self._lifted_parameters = [
+            parameter.name
+            for parameter in self._built_model.input_parameters
+            if parameter.name in input_names
+        ]
+        if self.lift_parameters:
+            self._built_parameter_values = dict(self._parameter_values.items())
+
+    def _reset_build(self):
+        "Reset the model, geometry and built states, so that the model is rebuilt"
+        if self._unprocessed_geometry is not None:
+            self._geometry = self._unprocessed_geometry
+            self._unprocessed_geometry = None
+        self.model = self._unprocessed_model
+        self._model_with_set_params = None
+        self._built_model = None
+        self._mesh = None
+        self._disc = None
+        self._built_model_is_cached = False
+        self._cache_key = None
+
+    def cache_key(self):
+        """
+        Content hash identifying the built model, used as file name in the cache
+        directory. The key is computed before building the model (building updates
+        the geometry in place) and then stored. It depends on the PyBaMM version, the
+        model, its options and its equations (so that custom models with the same
+        name are told apart), the parameter values, the geometry, the mesh, the
+        spatial methods, the solver settings and the smoothing settings.
+        """
+        if self._cache_key is not None:
+            return self._cache_key
+        hasher = hashlib.sha256()
+        memo = {}
+        solver_settings = {
+            key: value
+            for key, value in vars(self._solver).items()
+            if isinstance(value, (numbers.Number, str, type(None)))
+        }
+        model = self._unprocessed_model
+        for obj in [
+            pybamm.__version__,
+            self._model_class,
+            model.name,
+            getattr(model, "options", None),
+            model.convert_to_format,
+            model.rhs,
+            model.algebraic,
+            model.initial_conditions,
+            model.boundary_conditions,
+            [
+                (event.name, event.expression, event.event_type)
+                for event in model.events
+            ],
+            model.variables,
+            self.operating_mode,
+            dict(self._parameter_values.items()),
+            sorted(self._parameter_values.input_values),
+            self._geometry,
+            self._submesh_types,
+            self._var_pts,
+            self._spatial_methods,
+            type(self._solver),
+            type(self._solver.root_method),
+            solver_settings,
+            self.lift_parameters,
+            (
+                pybamm.settings.min_smoothing,
+                pybamm.settings.max_smoothing,
+                pybamm.settings.heaviside_smoothing,
+                pybamm.settings.abs_smoothing,
+            ),
+        ]:
+            _update_hash(hasher, obj, memo)
+        self._cache_key = hasher.hexdigest()
+        return self._cache_key
+
+    @property
+    def _cache_file(self):
+        return os.path.join(self.cache_dir, "{}.pkl".format(self.cache_key()))
+
+    def _load_from_cache(self):
+        """
+        Load the built model from the cache directory, if it exists. Returns True if
+        the model was loaded.
+        """
+        if self.cache_dir is None:
+            return False
+        # Compute the key before the geometry is processed
+        self.cache_key()
+        if not os.path.exists(self._cache_file):
+            return False
+        pybamm.logger.info("Loading built model from {}".format(self._cache_file))
+        self._built_model = pybamm.load(self._cache_file)
+        self._built_model_is_cached = True
+        # The cached model has already been set up by the solver
+        self._solver.models_set_up[self._built_model] = {
+            "initial conditions": self._built_model.concatenated_initial_conditions
+        }
+        return True
+
+    def _restore_from_cache(self):
+        """
+        Set the parameters of the model and create the mesh and the discretisation
+        that a model loaded from the cache was built with, as these aren't cached.
+        Called the first time any of them is accessed, so that loading from the cache
+        stays cheap. The model isn't discretised again.
+        """
+        if not self._built_model_is_cached or self._model_with_set_params is not None:
+            return
+        self.set_parameters()
+        self._mesh = pybamm.Mesh(self._geometry, self._submesh_types, self._var_pts)
+        self._disc = pybamm.Discretisation(self._mesh, self._spatial_methods)
+        model = self._model_with_set_params
+        self._disc.set_variable_slices(
+            list(model.rhs.keys()) + list(model.algebraic.keys())
+        )
+        self._disc.bcs = self._built_model.bcs
+
+    def _save_to_cache(self):
+        """
+        Save the built (and set up) model to the cache directory, if caching is on and
+        the model isn't there yet.
+        """
+        if self.cache_dir is None or self._built_model_is_cached:
+            return
+        if self._built_model.convert_to_format != "casadi":
+            pybamm.logger.warning(
+                "Cannot cache model in '{}' format, "
+                "set model.convert_to_format = 'casadi' instead".format(
+                    self._built_model.convert_to_format
+                )
+            )
+            self._built_model_is_cached = True
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        pybamm.logger.info("Saving built model to {}".format(self._cache_file))
+        # Write to a temporary file first, so that other processes never read a
+        # partially written model
+        temp_file = "{}.{}.tmp".format(self._cache_file, os.getpid())
+        with open(temp_file, "wb") as f:
+            pickle.dump(self._built_model, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, self._cache_file)
+        self._built_model_is_cached = True
+
     def solve(
         self,
         t_eval=None,
@@ -298,11 +673,19 @@ class Simulation:
         external_variables=None,
         inputs=None,
         check_model=True,
+        nproc=None,
+        calculate_sensitivities=False,
+        output_variables=None,
+        store=None,
     ):
         """
         A method to solve the model. This method will automatically build
         and set the model parameters if not already done so.
 
+        When solving with an experiment, the time taken by each operating condition
+        and by each cycle of the experiment is stored in the attributes
+        `experiment_step_times` and `experiment_cycle_times` (in seconds).
+
         Parameters
         ----------
         t_eval : numeric type, optional
@@ -328,18 +711,59 @@ class Simulation:
             values at the current time. The variables must correspond to
             the variables that would normally be found by solving the
             submodels that have been made external.
-        inputs : dict, optional
-            Any input parameters to pass to the model when solving
+        inputs : dict or list, optional
+            Any input parameters to pass to the model when solving. If a list of
+            dictionaries is provided, the model is built once and solved for each set
+            of inputs, and the solution is a list of solutions (see
+            :meth:`pybamm.BaseSolver.solve`). Not available when solving with an
+            experiment.
         check_model : bool, optional
             If True, model checks are performed after discretisation (see
             :meth:`pybamm.Discretisation.process_model`). Default is True.
+        nproc : int, optional
+            Number of worker processes used to solve a list of inputs in parallel
+            (see :meth:`pybamm.BaseSolver.solve`). Default is None, in which case the
+            inputs are solved in the current process.
+        calculate_sensitivities : bool or list of str, optional
+            Input parameters with respect to which to calculate the sensitivities of
+            the solution (see :meth:`pybamm.BaseSolver.solve`). If True, the
+            sensitivities with respect to all the inputs are calculated. Default is
+            False. Not available when solving with an experiment.
+        output_variables : list of str, optional
+            Names of the variables to store in the solution, instead of the state at
+            each time (see :meth:`pybamm.BaseSolver.solve`). Default is None, in
+            which case the whole state is stored. Not available when solving with an
+            experiment.
+        store : :class:`pybamm.SolutionStore` or str, optional
+            Store (or directory of the store) to which to write the solution of each
+            step of the experiment (see :meth:`pybamm.BaseSolver.step`), replacing
+            any solution already there. Only the solution of the latest step is then
+            kept in memory while solving, and the solution returned is loaded from
+            the store, memory-mapped, once the experiment is finished (see
+            :meth:`pybamm.SolutionStore.load`). Default is None. Only available when
+            solving with an experiment.
         """
         # Setup
         self.build(check_model=check_model)
         if solver is None:
             solver = self.solver
+        if calculate_sensitivities is True and not isinstance(inputs, list):
+            # Only the inputs given by the user (not any lifted parameters)
+            sensitivity_names = list(inputs or {})
+        else:
+            sensitivity_names = calculate_sensitivities
+        if self._lifted_parameters:
+            inputs = self._lifted_inputs(inputs)
+
+        if isinstance(store, str):
+            store = pybamm.SolutionStore(store)
 
         if self.operating_mode in ["without experiment", "drive cycle"]:
+            if store is not None:
+                raise NotImplementedError(
+                    "Writing the solution to a store is only supported with an "
+                    "experiment"
+                )
 
             if self.operating_mode == "without experiment":
                 if t_eval is None:
@@ -404,10 +828,36 @@ class Simulation:
                 t_eval,
                 external_variables=external_variables,
                 inputs=inputs,
+                nproc=nproc,
+                calculate_sensitivities=sensitivity_names,
+                output_variables=output_variables,
             )
-            self.t_eval = self._solution.t * self._solution.timescale_eval
+            if isinstance(self._solution, list):
+                # Take the times from the first scenario that was solved successfully
+                solution = next(
+                    (sol for sol in self._solution if isinstance(sol, pybamm.Solution)),
+                    None,
+                )
+            else:
+                solution = self._solution
+            if solution is not None:
+                self.t_eval = solution.t * solution.timescale_eval
+            if solver is self.solver:
+                self._save_to_cache()
 
         elif self.operating_mode == "with experiment":
+            if isinstance(inputs, list):
+                raise NotImplementedError(
+                    "Solving for a list of inputs is not supported with an experiment"
+                )
+            if calculate_sensitivities:
+                raise NotImplementedError(
+                    "Calculating sensitivities is not supported with an experiment"
+                )
+            if output_variables is not None:
+                raise NotImplementedError(
+                    "Only storing output variables is not supported with an experiment"
+                )
             if t_eval is not None:
                 pybamm.logger.warning(
                     "Ignoring t_eval as solution times are specified by the experiment"
@@ -415,10 +865,16 @@ class Simulation:
             # Re-initialize solution, e.g. for solving multiple times with different
             # inputs without having to build the simulation again
             self._solution = None
-            # Step through all experimental conditions
+            # Step through all experimental conditions, calling the solver directly.
+            # Steps with the same operating mode signature (time and period) share
+            # the same relative grid, so the solver can reuse its integrators
             inputs = inputs or {}
             pybamm.logger.info("Start running experiment")
             timer = pybamm.Timer()
+            self.experiment_step_times = []
+            self.experiment_cycle_times = []
+            cycle_ends = np.cumsum(self.experiment.cycle_lengths)
+            step_timer = pybamm.Timer()
             for idx, (exp_inputs, dt) in enumerate(
                 zip(self._experiment_inputs, self._experiment_times)
             ):
@@ -426,13 +882,30 @@ class Simulation:
                 inputs.update(exp_inputs)
                 # Make sure we take at least 2 timesteps
                 npts = max(int(round(dt / exp_inputs["period"])) + 1, 2)
-                self.step(
+                step_timer.reset()
+                self._solution = solver.step(
+                    self._solution,
+                    self.built_model,
                     dt,
-                    solver=solver,
                     npts=npts,
                     external_variables=external_variables,
                     inputs=inputs,
+                    store=store,
                 )
+                self.experiment_step_times.append(step_timer.time())
+                # Record the time taken by each completed cycle
+                if idx + 1 in cycle_ends:
+                    n_cycles = len(self.experiment_cycle_times)
+                    cycle_start = cycle_ends[n_cycles - 1] if n_cycles > 0 else 0
+                    self.experiment_cycle_times.append(
+                        sum(self.experiment_step_times[cycle_start:])
+                    )
+                    pybamm.logger.info(
+                        "Cycle {} took {}".format(
+                            len(self.experiment_cycle_times),
+                            timer.format(self.experiment_cycle_times[-1]),
+                        )
+                    )
                 # Only allow events specified by experiment
                 if not (
                     self._solution.termination == "final time"
@@ -449,16 +922,27 @@ class Simulation:
                         "or reducing the period.\n\n"
                     )
                     break
+            if store is not None:
+                self._solution = store.load(model=self.built_model)
             pybamm.logger.info(
                 "Finish experiment simulation, took {}".format(
                     timer.format(timer.time())
                 )
             )
+            if solver is self.solver:
+                self._save_to_cache()
 
         return self.solution
 
     def step(
-        self, dt, solver=None, npts=2, external_variables=None, inputs=None, save=True
+        self,
+        dt,
+        solver=None,
+        npts=2,
+        external_variables=None,
+        inputs=None,
+        save=True,
+        store=None,
     ):
         """
         A method to step the model forward one timestep. This method will
@@ -482,11 +966,16 @@ class Simulation:
             Any input parameters to pass to the model when solving
         save : bool
             Turn on to store the solution of all previous timesteps
+        store : :class:`pybamm.SolutionStore`, optional
+            Store to which to write the solution of the timestep (see
+            :meth:`pybamm.BaseSolver.step`)
         """
         self.build()
 
         if solver is None:
             solver = self.solver
+        if self._lifted_parameters:
+            inputs = self._lifted_inputs(inputs)
 
         self._solution = solver.step(
             self._solution,
@@ -496,6 +985,7 @@ class Simulation:
             external_variables=external_variables,
             inputs=inputs,
             save=save,
+            store=store,
         )
 
         return self.solution
@@ -519,7 +1009,7 @@ class Simulation:
 
         variable_arrays = [
             self.built_model.variables[var].evaluate(
-                self.solution.t[-1], self.solution.y[:, -1]
+                self.solution.last_t, self.solution.last_y
             )
             for var in variables
         ]
@@ -575,6 +1065,7 @@ class Simulation:
 
     @property
     def model_with_set_params(self):
+        self._restore_from_cache()
         return self._model_with_set_params
 
     @property
@@ -607,6 +1098,7 @@ class Simulation:
 
     @property
     def mesh(self):
+        self._restore_from_cache()
         return self._mesh
 
     @property
@@ -664,8 +1156,8 @@ class Simulation:
 
     def save(self, filename):
         """Save simulation using pickle"""
-        if self.model.convert_to_format == "python":
-            # We currently cannot save models in the 'python' format
+        if self.model.convert_to_format in ["python", "numba"]:
+            # We currently cannot save models in the 'python' or 'numba' formats
             raise NotImplementedError(
                 """
                 Cannot save simulation if model format is python.
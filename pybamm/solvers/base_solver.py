@@ -6,8 +6,10 @@ import copy
 import pybamm
 import numbers
 import numpy as np
+from scipy.sparse import csr_matrix, issparse
 import sys
 import itertools
+import multiprocessing as mp
 
 
 class BaseSolver(object):
@@ -57,6 +59,11 @@ class BaseSolver(object):
         self.name = "Base solver"
         self.ode_solver = False
         self.algebraic_solver = False
+        # Whether the solver can calculate sensitivities with respect to inputs
+        self.supports_sensitivities = False
+        # Maximum number of times integrated at once when only storing the output
+        # variables (see `solve`)
+        self.output_window_size = 1000
 
     @property
     def method(self):
@@ -191,12 +198,38 @@ class BaseSolver(object):
             )
             model.convert_to_format = "casadi"
 
+        # Record the time taken by each stage of the set-up
+        timer = pybamm.Timer()
+        profile = {}
+
+        def record(stage):
+            key = "set-up: " + stage
+            profile[key] = profile.get(key, 0) + timer.time()
+            timer.reset()
+
+        # Share common subexpressions between all the processed expressions
+        cse = pybamm.CommonSubexpressionElimination()
+
+        def eliminate_common_subexpressions(func, name, report):
+            report(f"Eliminating common subexpressions from {name}")
+            nodes_removed = cse.nodes_removed
+            func = cse.eliminate(func)
+            record("common subexpression elimination")
+            report(
+                "Removed {} nodes from {}".format(
+                    cse.nodes_removed - nodes_removed, name
+                )
+            )
+            return func
+
         if model.convert_to_format != "casadi":
             simp = pybamm.Simplification()
             # Create Jacobian from concatenated rhs and algebraic
             y = pybamm.StateVector(slice(0, model.concatenated_initial_conditions.size))
             # set up Jacobian object, for re-use of dict
             jacobian = pybamm.Jacobian()
+            # Sparsity patterns of the nodes, if the jacobian is found by colouring
+            sparsity_patterns = {}
         else:
             # Convert model attributes to casadi
             t_casadi = casadi.MX.sym("t")
@@ -217,58 +250,113 @@ class BaseSolver(object):
                 if "event" not in string:
                     pybamm.logger.info(string)
 
+            def to_python(func):
+                # Initial conditions and events are evaluated much less often than
+                # the equations, so aren't worth compiling with numba
+                if model.convert_to_format == "numba" and name in [
+                    "RHS",
+                    "algebraic",
+                    "residuals",
+                ]:
+                    try:
+                        return pybamm.EvaluatorNumba(func)
+                    except NotImplementedError as error:
+                        pybamm.logger.warning(
+                            "Converting {} to python, as it can't be compiled with "
+                            "numba: {}".format(name, error)
+                        )
+                return pybamm.EvaluatorPython(func)
+
             if use_jacobian is None:
                 use_jacobian = model.use_jacobian
+            timer.reset()
             if model.convert_to_format != "casadi":
                 # Process with pybamm functions
                 if model.use_simplify:
                     report(f"Simplifying {name}")
                     func = simp.simplify(func)
+                    record("simplification")
+                    func = eliminate_common_subexpressions(func, name, report)
 
                 if model.convert_to_format == "jax":
                     report(f"Converting {name} to jax")
                     jax_func = pybamm.EvaluatorJax(func)
-
-                if use_jacobian:
+                    record("conversion")
+
+                jac = None
+                if use_jacobian and model.jacobian_method == "colouring":
+                    report(f"Finding sparsity pattern of jacobian for {name}")
+                    try:
+                        pattern = pybamm.jacobian_sparsity(
+                            func, y, memo=sparsity_patterns
+                        )
+                    except NotImplementedError as error:
+                        pybamm.logger.warning(
+                            "Calculating the jacobian for {} symbolically, as its "
+                            "sparsity pattern could not be found: {}".format(
+                                name, error
+                            )
+                        )
+                    else:
+                        if model.convert_to_format in ["python", "numba"]:
+                            report(f"Converting {name} to {model.convert_to_format}")
+                            func = to_python(func)
+                        elif model.convert_to_format == "jax":
+                            func = jax_func
+                        record("conversion")
+                        jac = pybamm.ColouredJacobian(func, pattern, y).evaluate
+                        record("jacobian")
+
+                if use_jacobian and jac is None:
                     report(f"Calculating jacobian for {name}")
                     jac = jacobian.jac(func, y)
+                    record("jacobian")
                     if model.use_simplify:
                         report(f"Simplifying jacobian for {name}")
                         jac = simp.simplify(jac)
-                    if model.convert_to_format == "python":
+                        record("simplification")
+                    # symbolic jacobians are sparse matrices, which numba doesn't
+                    # support
+                    if model.convert_to_format in ["python", "numba"]:
                         report(f"Converting jacobian for {name} to python")
                         jac = pybamm.EvaluatorPython(jac)
                     elif model.convert_to_format == "jax":
                         report(f"Converting jacobian for {name} to jax")
                         jac = jax_func.get_jacobian()
                     jac = jac.evaluate
-                else:
-                    jac = None
+                    record("conversion")
 
-                if model.convert_to_format == "python":
-                    report(f"Converting {name} to python")
-                    func = pybamm.EvaluatorPython(func)
-                if model.convert_to_format == "jax":
-                    report(f"Converting {name} to jax")
-                    func = jax_func
+                if isinstance(func, pybamm.Symbol):
+                    if model.convert_to_format in ["python", "numba"]:
+                        report(f"Converting {name} to {model.convert_to_format}")
+                        func = to_python(func)
+                    if model.convert_to_format == "jax":
+                        report(f"Converting {name} to jax")
+                        func = jax_func
 
                 func = func.evaluate
+                record("conversion")
 
             else:
                 # Process with CasADi
+                if model.use_simplify:
+                    func = eliminate_common_subexpressions(func, name, report)
                 report(f"Converting {name} to CasADi")
                 func = func.to_casadi(t_casadi, y_casadi, inputs=p_casadi)
+                record("conversion")
                 if use_jacobian:
                     report(f"Calculating jacobian for {name} using CasADi")
                     jac_casadi = casadi.jacobian(func, y_casadi)
                     jac = casadi.Function(
                         name, [t_casadi, y_casadi, p_casadi_stacked], [jac_casadi]
                     )
+                    record("jacobian")
                 else:
                     jac = None
                 func = casadi.Function(
                     name, [t_casadi, y_casadi, p_casadi_stacked], [func]
                 )
+                record("conversion")
             if name == "residuals":
                 func_call = Residuals(func, name, model)
             else:
@@ -361,6 +449,12 @@ class BaseSolver(object):
             if event.event_type == pybamm.EventType.TERMINATION
         ]
 
+        # Residuals are processed from the same rhs and algebraic equations below, so
+        # are not counted
+        profile[
+            "set-up: nodes removed by common subexpression elimination"
+        ] = cse.nodes_removed
+
         # discontinuity events are evaluated before the solver is called, so don't need
         # to process them
         discontinuity_events_eval = [
@@ -378,7 +472,9 @@ class BaseSolver(object):
         model.discontinuity_events_eval = discontinuity_events_eval
 
         # Calculate initial conditions
+        timer.reset()
         model.y0 = init_eval(inputs)
+        record("initial conditions")
 
         # Save CasADi functions for the CasADi solver
         # Note: when we pass to casadi the ode part of the problem must be in explicit
@@ -387,6 +483,7 @@ class BaseSolver(object):
             self, (pybamm.CasadiSolver, pybamm.CasadiAlgebraicSolver)
         ):
             # can use DAE solver to solve model with algebraic equations only
+            timer.reset()
             if len(model.rhs) > 0:
                 mass_matrix_inv = casadi.MX(model.mass_matrix_inv.entries)
                 explicit_rhs = mass_matrix_inv @ rhs(
@@ -396,6 +493,7 @@ class BaseSolver(object):
                     "rhs", [t_casadi, y_casadi, p_casadi_stacked], [explicit_rhs]
                 )
             model.casadi_algebraic = algebraic
+            record("conversion")
         if len(model.rhs) == 0:
             # No rhs equations: residuals is algebraic only
             model.residuals_eval = Residuals(algebraic, "residuals", model)
@@ -413,7 +511,20 @@ class BaseSolver(object):
             residuals_eval, jacobian_eval = process(all_states, "residuals")[1:]
             model.residuals_eval = residuals_eval
             model.jacobian_eval = jacobian_eval
-
+        if model.jacobian_eval is not None and model.mass_matrix is not None:
+            model.jac_residuals_eval = ResidualsJacobian(model.jacobian_eval, model)
+        else:
+            model.jac_residuals_eval = None
+
+        # Replace the stages of any previous set-up
+        model.profile = {
+            **{
+                key: value
+                for key, value in model.profile.items()
+                if not key.startswith("set-up: ")
+            },
+            **profile,
+        }
         pybamm.logger.info("Finish solver set-up")
 
     def _set_initial_conditions(self, model, inputs, update_rhs):
@@ -495,7 +606,16 @@ class BaseSolver(object):
             y0 = y0.flatten()
         return y0
 
-    def solve(self, model, t_eval=None, external_variables=None, inputs=None):
+    def solve(
+        self,
+        model,
+        t_eval=None,
+        external_variables=None,
+        inputs=None,
+        nproc=None,
+        calculate_sensitivities=False,
+        output_variables=None,
+    ):
         """
         Execute the solver setup and calculate the solution of the model at
         specified times.
@@ -510,8 +630,39 @@ class BaseSolver(object):
         external_variables : dict
             A dictionary of external variables and their corresponding
             values at the current time
-        inputs : dict, optional
-            Any input parameters to pass to the model when solving
+        inputs : dict or list, optional
+            Any input parameters to pass to the model when solving. If a list of
+            dictionaries is provided, the model is set up once and solved for each
+            set of inputs, and a list of solutions is returned
+        nproc : int, optional
+            Number of worker processes used to solve a list of inputs in parallel.
+            If None (default), the list of inputs is solved in the current process.
+            When solving in parallel, a scenario that fails does not stop the others:
+            the exception is returned in place of its solution.
+        calculate_sensitivities : bool or list of str, optional
+            Input parameters with respect to which to calculate the (forward)
+            sensitivities of the solution, along with the solution, if the solver
+            supports it. If True, the sensitivities with respect to all the inputs
+            are calculated. Default is False. The sensitivities are available in
+            :attr:`pybamm.Solution.sensitivities` and
+            :attr:`pybamm.ProcessedVariable.sensitivities`.
+        output_variables : list of str, optional
+            Names of the variables of the model to store in the solution. If given,
+            these variables are compiled to CasADi and evaluated at the output times
+            as the model is integrated, and the solution only keeps their values and
+            the final state (see :attr:`pybamm.Solution.output_data`), rather than
+            the state at each time. The model is then integrated in windows of at
+            most `solver.output_window_size` (default 1000) output times, and the
+            variables are evaluated after each window (and after each global step
+            for the CasADi solver in "safe" mode), so that the states are only kept
+            for one window at a time. Default is None, in which case the whole state
+            is stored.
+
+        Returns
+        -------
+        :class:`pybamm.Solution` or list of :class:`pybamm.Solution` objects.
+            If type of `inputs` is `list`, return a list of corresponding
+            :class:`pybamm.Solution` objects.
 
         Raises
         ------
@@ -555,7 +706,16 @@ class BaseSolver(object):
             raise pybamm.SolverError("t_eval must increase monotonically")
 
         # Set up external variables and inputs
-        ext_and_inputs = self._set_up_ext_and_inputs(model, external_variables, inputs)
+        # A list of inputs is solved as a batch, sharing the same set up
+        batch = isinstance(inputs, list)
+        inputs_list = inputs if batch else [inputs]
+        if len(inputs_list) == 0:
+            raise pybamm.SolverError("'inputs' cannot be an empty list")
+        ext_and_inputs_list = [
+            self._set_up_ext_and_inputs(model, external_variables, inputs)
+            for inputs in inputs_list
+        ]
+        ext_and_inputs = ext_and_inputs_list[0]
 
         # Set up
         timer = pybamm.Timer()
@@ -580,15 +740,170 @@ class BaseSolver(object):
         set_up_time = timer.time()
         timer.reset()
 
-        # (Re-)calculate consistent initial conditions
-        self._set_initial_conditions(model, ext_and_inputs, update_rhs=True)
+        # Input parameters with respect to which to calculate the sensitivities
+        model.calculate_sensitivities = self._get_sensitivity_names(
+            model, calculate_sensitivities, inputs_list[0], ext_and_inputs
+        )
+
+        # Variables to store in the solution, instead of the states
+        self._set_up_output_variables(model, output_variables, ext_and_inputs)
+
+        # All the inputs in a batch share the set up, so they must give the same
+        # timescale and length scales
+        if batch:
+            for ext_and_inputs in ext_and_inputs_list[1:]:
+                if model.timescale.evaluate(inputs=ext_and_inputs) != (
+                    model.timescale_eval
+                ):
+                    raise pybamm.SolverError(
+                        "The model timescale is a function of an input parameter "
+                        "and the value is not the same for all the inputs in the "
+                        "list. Please solve for each set of inputs separately."
+                    )
+                for domain, scale in model.length_scales.items():
+                    if scale.evaluate(inputs=ext_and_inputs) != (
+                        model.length_scales_eval[domain]
+                    ):
+                        raise pybamm.SolverError(
+                            "The {} domain lengthscale is a function of an input "
+                            "parameter and the value is not the same for all the "
+                            "inputs in the list. Please solve for each set of "
+                            "inputs separately.".format(domain)
+                        )
 
         # Non-dimensionalise time
         t_eval_dimensionless = t_eval / model.timescale_eval
 
+        if batch and nproc is not None:
+            solutions = self._solve_in_parallel(
+                model, t_eval_dimensionless, ext_and_inputs_list, nproc
+            )
+        elif (
+            batch
+            and len(model.discontinuity_events_eval) == 0
+            and not model.calculate_sensitivities
+            and not model.output_variables
+        ):
+            # Calculate consistent initial conditions for each set of inputs and
+            # integrate the whole batch at once
+            old_y0 = model.y0
+            y0_list = []
+            for ext_and_inputs in ext_and_inputs_list:
+                self._set_initial_conditions(model, ext_and_inputs, update_rhs=True)
+                y0_list.append(model.y0)
+                model.y0 = old_y0
+            solutions = self._integrate_batch(
+                model, t_eval_dimensionless, y0_list, ext_and_inputs_list
+            )
+            for solution, ext_and_inputs in zip(solutions, ext_and_inputs_list):
+                self._store_output_variables(model, solution, ext_and_inputs)
+            # The batch is integrated in a single call, so the time is shared
+            # equally between the solutions
+            solve_time = timer.time() / len(solutions)
+            for solution in solutions:
+                solution.solve_time = solve_time
+            model.y0 = y0_list[-1]
+        else:
+            solutions = []
+            for ext_and_inputs in ext_and_inputs_list:
+                solution = self._solve_with_discontinuities(
+                    model, t_eval_dimensionless, ext_and_inputs, timer
+                )
+                solution.solve_time = timer.time()
+                timer.reset()
+                solutions.append(solution)
+
+        for solution, ext_and_inputs in zip(solutions, ext_and_inputs_list):
+            # Failed scenarios from a parallel solve are returned as they are
+            if isinstance(solution, Exception):
+                pybamm.logger.warning(
+                    "Solving {} with inputs {} failed: {}".format(
+                        model.name, ext_and_inputs, solution
+                    )
+                )
+                continue
+
+            # Assign times
+            solution.set_up_time = set_up_time
+
+            # Add model and inputs to solution
+            solution.model = model
+            solution.inputs = ext_and_inputs
+
+            # Copy the timescale_eval and lengthscale_evals
+            solution.timescale_eval = model.timescale_eval
+            solution.length_scales_eval = model.length_scales_eval
+
+            # Split the sensitivities by input parameter
+            if model.calculate_sensitivities:
+                sensitivities = solution.sensitivities["all"]
+                start = 0
+                for name in model.calculate_sensitivities:
+                    size = np.size(ext_and_inputs[name])
+                    solution.sensitivities[name] = sensitivities[
+                        :, start : start + size
+                    ]
+                    start += size
+
+            # Identify the event that caused termination
+            termination = self.get_termination_reason(solution, model.events)
+
+            pybamm.logger.info("Finish solving {} ({})".format(model.name, termination))
+            pybamm.logger.info(
+                "Set-up time: {}, Solve time: {}, Total time: {}".format(
+                    timer.format(solution.set_up_time),
+                    timer.format(solution.solve_time),
+                    timer.format(solution.total_time),
+                )
+            )
+            pybamm.logger.debug("Profile: {}".format(solution.profile))
+
+            # Raise error if solution only contains one timestep (except for
+            # algebraic solvers, where we may only expect one time in the solution)
+            if self.algebraic_solver is False and len(solution.t) == 1:
+                raise pybamm.SolverError(
+                    "Solution time vector has length 1. "
+                    "Check whether simulation terminated too early."
+                )
+
+        if batch:
+            return solutions
+        else:
+            return solutions[0]
+
+    def _solve_with_discontinuities(
+        self, model, t_eval_dimensionless, ext_and_inputs, timer
+    ):
+        """
+        Calculate consistent initial conditions and integrate the model for one set
+        of inputs, restarting the solver at each discontinuity.
+
+        Parameters
+        ----------
+        model : :class:`pybamm.BaseModel`
+            The model whose solution to calculate.
+        t_eval_dimensionless : :class:`numpy.array`
+            The dimensionless times at which to compute the solution
+        ext_and_inputs : dict
+            Any external variables or input parameters to pass to the model
+        timer : :class:`pybamm.Timer`
+            Timer used to record the solve time of each subsection
+
+        Returns
+        -------
+        :class:`pybamm.Solution`
+            The solution, without model and inputs assigned
+        """
+        # (Re-)calculate consistent initial conditions
+        ics_timer = pybamm.Timer()
+        self._set_initial_conditions(model, ext_and_inputs, update_rhs=True)
+        if model.calculate_sensitivities:
+            model.y0S = self._get_initial_sensitivities(model, ext_and_inputs)
+        ics_time = ics_timer.time()
+
         # Calculate discontinuities
         discontinuities = [
-            event.expression.evaluate(inputs=inputs)
+            event.expression.evaluate(inputs=ext_and_inputs)
             for event in model.discontinuity_events_eval
         ]
 
@@ -648,7 +963,7 @@ class BaseSolver(object):
                     t_eval_dimensionless[end_index - 1] * model.timescale_eval,
                 )
             )
-            new_solution = self._integrate(
+            new_solution = self._integrate_in_windows(
                 model, t_eval_dimensionless[start_index:end_index], ext_and_inputs
             )
             new_solution.solve_time = timer.time()
@@ -662,51 +977,270 @@ class BaseSolver(object):
 
             if end_index != len(t_eval_dimensionless):
                 # setup for next integration subsection
-                last_state = solution.y[:, -1]
+                last_state = solution.last_y
                 # update y0 (for DAE solvers, this updates the initial guess for the
                 # rootfinder)
                 model.y0 = last_state
+                if model.calculate_sensitivities:
+                    model.y0S = solution.last_sensitivities
                 if len(model.algebraic) > 0:
+                    ics_timer.reset()
                     model.y0 = self.calculate_consistent_state(
                         model, t_eval_dimensionless[end_index], ext_and_inputs
                     )
-
-        # Assign times
-        solution.set_up_time = set_up_time
-        solution.solve_time = timer.time()
+                    ics_time += ics_timer.time()
 
         # restore old y0
         model.y0 = old_y0
+        solution.update_profile({"consistent initial conditions": ics_time})
 
-        # Add model and inputs to solution
-        solution.model = model
-        solution.inputs = ext_and_inputs
+        return solution
 
-        # Copy the timescale_eval and lengthscale_evals
-        solution.timescale_eval = model.timescale_eval
-        solution.length_scales_eval = model.length_scales_eval
+    def _get_sensitivity_names(
+        self, model, calculate_sensitivities, inputs, ext_and_inputs
+    ):
+        """
+        Names of the input parameters with respect to which to calculate the
+        sensitivities (see :meth:`solve`), checking that they can be calculated
+        """
+        if calculate_sensitivities is True:
+            names = list(inputs or {})
+        elif calculate_sensitivities is False or calculate_sensitivities is None:
+            names = []
+        else:
+            names = list(calculate_sensitivities)
+        if not names:
+            return []
+        if not self.supports_sensitivities:
+            raise pybamm.SolverError(
+                "{} can't calculate sensitivities".format(self.name)
+            )
+        if model.convert_to_format != "casadi":
+            raise pybamm.SolverError(
+                "Sensitivities can only be calculated for models converted to casadi"
+            )
+        for name in names:
+            if name not in ext_and_inputs:
+                raise pybamm.SolverError(
+                    "Cannot calculate sensitivities with respect to '{}', which "
+                    "isn't an input".format(name)
+                )
+            if isinstance(ext_and_inputs[name], casadi.MX):
+                raise pybamm.SolverError(
+                    "Cannot calculate sensitivities with respect to symbolic inputs"
+                )
+        return names
 
-        # Identify the event that caused termination
-        termination = self.get_termination_reason(solution, model.events)
+    def _set_up_output_variables(self, model, output_variables, inputs):
+        """
+        Compile the variables to store in the solution instead of the states (see
+        :meth:`solve`) into a CasADi function of (t, y, inputs), stored on the model
+        as `output_variables_eval` with the names of the variables in
+        `output_variables`
+        """
+        model.output_variables = list(output_variables or [])
+        if not model.output_variables:
+            return
+        for name in model.output_variables:
+            if name not in model.variables:
+                raise pybamm.SolverError(
+                    "Cannot store '{}', which isn't a variable of the model".format(
+                        name
+                    )
+                )
+        if any(isinstance(value, casadi.MX) for value in inputs.values()):
+            raise pybamm.SolverError(
+                "Cannot store output variables with symbolic inputs"
+            )
+        if model.calculate_sensitivities:
+            raise pybamm.SolverError(
+                "Cannot calculate sensitivities when only storing output variables"
+            )
 
-        pybamm.logger.info("Finish solving {} ({})".format(model.name, termination))
-        pybamm.logger.info(
-            "Set-up time: {}, Solve time: {}, Total time: {}".format(
-                timer.format(solution.set_up_time),
-                timer.format(solution.solve_time),
-                timer.format(solution.total_time),
+        # Compile the variables once per model, names and sizes of the inputs
+        input_sizes = tuple((name, np.size(value)) for name, value in inputs.items())
+        key = ("output variables", tuple(model.output_variables), input_sizes)
+        if key not in model.variables_casadi:
+            t_casadi = casadi.MX.sym("t")
+            y_casadi = casadi.MX.sym("y", model.concatenated_initial_conditions.size)
+            p_casadi = {name: casadi.MX.sym(name, size) for name, size in input_sizes}
+            variables = [
+                casadi.vec(
+                    model.variables[name].to_casadi(t_casadi, y_casadi, inputs=p_casadi)
+                )
+                for name in model.output_variables
+            ]
+            model.variables_casadi[key] = (
+                casadi.Function(
+                    "output_variables",
+                    [t_casadi, y_casadi, casadi.vertcat(*p_casadi.values())],
+                    [casadi.vertcat(*variables)],
+                ),
+                [variable.shape[0] for variable in variables],
             )
+        model.output_variables_eval = model.variables_casadi[key]
+
+    def _integrate_in_windows(self, model, t_eval, inputs):
+        """
+        Integrate the model over `t_eval` (see :meth:`_integrate`). If only the
+        output variables are stored (see :meth:`solve`), the model is integrated in
+        windows of at most :attr:`output_window_size` times, each from the final
+        state of the previous one, and the output variables are stored after each
+        window, so that the states are only kept for one window at a time.
+        """
+        if not model.output_variables:
+            return self._integrate(model, t_eval, inputs)
+        solution = None
+        start = 0
+        while True:
+            end = min(start + max(self.output_window_size, 2), len(t_eval))
+            window_solution = self._integrate(model, t_eval[start:end], inputs)
+            self._store_output_variables(model, window_solution, inputs)
+            # (the solve time is recorded by the caller)
+            window_solution.solve_time = 0
+            if solution is None:
+                solution = window_solution
+            else:
+                solution.append(window_solution)
+            if solution.termination != "final time" or end == len(t_eval):
+                return solution
+            # the next window starts from the final state of this one
+            model.y0 = solution.last_y
+            start = end - 1
+
+    def _store_output_variables(self, model, solution, inputs):
+        """
+        Evaluate the output variables (see :meth:`solve`) at each time of the
+        solution of an integration, and only keep their values and the final state
+        in the solution. Does nothing if there are no output variables, or if the
+        solution already only stores them.
+        """
+        if not model.output_variables or solution.output_data is not None:
+            return
+        function, sizes = model.output_variables_eval
+        n_t = len(solution.t)
+        p = casadi.vertcat(*[value for value in inputs.values()])
+        values = function.map(n_t)(
+            solution.t[np.newaxis, :], solution.y, casadi.repmat(p, 1, n_t)
+        ).full()
+        solution._set_output_data(
+            dict(zip(model.output_variables, np.split(values, np.cumsum(sizes)[:-1])))
+        )
+
+    def _get_sensitivity_parameters(self, model, inputs):
+        """
+        Symbolic inputs with respect to which to calculate the sensitivities.
+
+        Returns
+        -------
+        p : :class:`casadi.MX`
+            The stacked symbolic inputs in :attr:`model.calculate_sensitivities`
+        p_value : :class:`casadi.DM`
+            The values of these inputs
+        p_all : :class:`casadi.MX`
+            All the stacked inputs, as passed to the CasADi functions of the model,
+            with the values of the inputs that aren't in `p`
+        """
+        p_symbols = {
+            name: casadi.MX.sym(name, np.size(inputs[name]))
+            for name in model.calculate_sensitivities
+        }
+        p = casadi.vertcat(*p_symbols.values())
+        p_value = casadi.vertcat(
+            *[inputs[name] for name in model.calculate_sensitivities]
+        )
+        p_all = casadi.vertcat(
+            *[p_symbols.get(name, value) for name, value in inputs.items()]
         )
+        return p, p_value, p_all
 
-        # Raise error if solution only contains one timestep (except for algebraic
-        # solvers, where we may only expect one time in the solution)
-        if self.algebraic_solver is False and len(solution.t) == 1:
+    def _get_initial_sensitivities(self, model, inputs):
+        """
+        Sensitivities of the initial conditions with respect to the inputs in
+        :attr:`model.calculate_sensitivities`, as an array with one row per state
+        and one column per (entry of each) input. The sensitivities of the
+        algebraic states are only a guess, made consistent by the integrator.
+        """
+        p, p_value, p_all = self._get_sensitivity_parameters(model, inputs)
+        y0 = model.init_eval._function(0, model.init_eval.y_dummy, p_all)
+        y0S = casadi.Function("y0S", [p], [casadi.jacobian(y0, p)])
+        return y0S(p_value).full()
+
+    def _solve_in_parallel(self, model, t_eval_dimensionless, inputs_list, nproc):
+        """
+        Solve the model for each set of inputs in a pool of worker processes. The
+        solver and the set-up model are sent to each worker once, when the worker
+        starts, and the solutions are gathered back in the order of the inputs.
+
+        Parameters
+        ----------
+        model : :class:`pybamm.BaseModel`
+            The (set-up) model whose solution to calculate.
+        t_eval_dimensionless : :class:`numpy.array`
+            The dimensionless times at which to compute the solution
+        inputs_list : list of dict
+            Any external variables or input parameters to pass to the model, one
+            dictionary per solution
+        nproc : int
+            Number of worker processes
+
+        Returns
+        -------
+        list
+            One :class:`pybamm.Solution` per set of inputs, or the exception that was
+            raised if solving for that set of inputs failed
+        """
+        if any(
+            isinstance(v, casadi.MX) for inputs in inputs_list for v in inputs.values()
+        ):
             raise pybamm.SolverError(
-                "Solution time vector has length 1. "
-                "Check whether simulation terminated too early."
+                "Cannot solve with symbolic inputs in parallel, please provide "
+                "values for all the input parameters"
             )
+        pybamm.logger.info(
+            "Solving {} sets of inputs with {} processes".format(
+                len(inputs_list), nproc
+            )
+        )
+        with mp.Pool(
+            processes=nproc, initializer=_initialise_worker, initargs=(self, model)
+        ) as pool:
+            solutions = pool.starmap(
+                _solve_in_worker,
+                [(t_eval_dimensionless.copy(), inputs) for inputs in inputs_list],
+            )
+        return solutions
 
-        return solution
+    def _integrate_batch(self, model, t_eval, y0_list, inputs_list):
+        """
+        Integrate the model for several sets of inputs, sharing the same set up.
+        By default this calls `_integrate` for each set of inputs in turn, but
+        solvers can override it to integrate the whole batch at once.
+
+        Parameters
+        ----------
+        model : :class:`pybamm.BaseModel`
+            The model whose solution to calculate.
+        t_eval : :class:`numpy.array`
+            The dimensionless times at which to compute the solution
+        y0_list : list
+            The (consistent) initial conditions for each set of inputs
+        inputs_list : list of dict
+            Any external variables or input parameters to pass to the model, one
+            dictionary per solution
+
+        Returns
+        -------
+        list of :class:`pybamm.Solution`
+            One solution per set of inputs
+        """
+        old_y0 = model.y0
+        solutions = []
+        for y0, inputs in zip(y0_list, inputs_list):
+            model.y0 = y0
+            solutions.append(self._integrate(model, t_eval, inputs))
+        model.y0 = old_y0
+        return solutions
 
     def step(
         self,
@@ -717,6 +1251,7 @@ class BaseSolver(object):
         external_variables=None,
         inputs=None,
         save=True,
+        store=None,
     ):
         """
         Step the solution of the model forward by a given time increment. The
@@ -742,6 +1277,12 @@ class BaseSolver(object):
             Any input parameters to pass to the model when solving
         save : bool
             Turn on to store the solution of all previous timesteps
+        store : :class:`pybamm.SolutionStore`, optional
+            Store to which to write the solution of the step. The solution is written
+            to the store, replacing any solution already there, if `old_solution` is
+            None, and appended to it otherwise. Only the solution of the step is then
+            returned (as if `save` were False), so that the solution of all the steps
+            is only kept on disk (see :meth:`pybamm.SolutionStore.load`).
 
         Raises
         ------
@@ -774,6 +1315,11 @@ class BaseSolver(object):
         inputs = inputs or {}
         ext_and_inputs = {**external_variables, **inputs}
 
+        # Sensitivities are only calculated, and output variables only stored, by
+        # `solve`
+        model.calculate_sensitivities = []
+        model.output_variables = []
+
         # Check that any inputs that may affect the scaling have not changed
         # Set model timescale
         temp_timescale_eval = model.timescale.evaluate(inputs=inputs)
@@ -791,26 +1337,45 @@ class BaseSolver(object):
             for domain in temp_length_scales_eval.keys():
                 old_dom_eval = old_solution.length_scales_eval[domain]
                 if temp_length_scales_eval[domain] != old_dom_eval:
-                    pybamm.logger.error(
+                    raise pybamm.SolverError(
                         "The {} domain lengthscale is a function of an input "
                         "parameter and the value has changed between "
                         "steps!".format(domain)
                     )
-        # Run set up on first step
+        # Run set up on first step (if not done already)
         if old_solution is None:
             pybamm.logger.info(
                 "Start stepping {} with {}".format(model.name, self.name)
             )
-            self.set_up(model, ext_and_inputs)
+            if (
+                model not in self.models_set_up
+                or self.models_set_up[model]["initial conditions"].id
+                != model.concatenated_initial_conditions.id
+                or model.timescale_eval != temp_timescale_eval
+            ):
+                self.set_up(model, ext_and_inputs)
+                self.models_set_up.update(
+                    {
+                        model: {
+                            "initial conditions": model.concatenated_initial_conditions
+                        }
+                    }
+                )
+            else:
+                # Start from the initial conditions rather than from the end of the
+                # previous run
+                model.y0 = model.init_eval(ext_and_inputs)
             t = 0.0
         else:
             # initialize with old solution
-            t = old_solution.t[-1]
-            model.y0 = old_solution.y[:, -1]
+            t = old_solution.last_t
+            model.y0 = old_solution.last_y
         set_up_time = timer.time()
 
         # (Re-)calculate consistent initial conditions
+        timer.reset()
         self._set_initial_conditions(model, ext_and_inputs, update_rhs=False)
+        ics_time = timer.time()
 
         # Non-dimensionalise dt
         dt_dimensionless = dt / model.timescale_eval
@@ -824,6 +1389,7 @@ class BaseSolver(object):
         # Assign times
         solution.set_up_time = set_up_time
         solution.solve_time = timer.time()
+        solution.update_profile({"consistent initial conditions": ics_time})
 
         # Add model and inputs to solution
         solution.model = model
@@ -849,7 +1415,12 @@ class BaseSolver(object):
             pybamm.logger.debug(
                 "Step time: {}".format(timer.format(solution.solve_time))
             )
-        if save is False or old_solution is None:
+        if store is not None:
+            if old_solution is None:
+                store.write(solution)
+            else:
+                store.append(solution)
+        if save is False or old_solution is None or store is not None:
             return solution
         else:
             return old_solution + solution
@@ -914,6 +1485,30 @@ class BaseSolver(object):
         return ext_and_inputs
 
 
+# Solver and model used by each worker process in BaseSolver._solve_in_parallel
+_worker_solver_and_model = None
+
+
+def _initialise_worker(solver, model):
+    "Store the solver and the set-up model in a worker process"
+    global _worker_solver_and_model
+    _worker_solver_and_model = (solver, model)
+
+
+def _solve_in_worker(t_eval_dimensionless, ext_and_inputs):
+    "Solve the model for one set of inputs in a worker process"
+    solver, model = _worker_solver_and_model
+    timer = pybamm.Timer()
+    try:
+        solution = solver._solve_with_discontinuities(
+            model, t_eval_dimensionless, ext_and_inputs, timer
+        )
+    except Exception as e:
+        return e
+    solution.solve_time = timer.time()
+    return solution
+
+
 class SolverCallable:
     "A class that will be called by the solver when integrating"
 
@@ -926,8 +1521,28 @@ class SolverCallable:
         self.name = name
         self.model = model
         self.timescale = self.model.timescale_eval
-
-    def __call__(self, t, y, inputs):
+        # Buffers for evaluating the CasADi function in place, for each layout of the
+        # output, created on first use
+        self._buffers = {}
+        self._dm_arg = None
+
+    def __getstate__(self):
+        # CasADi buffers can't be pickled, and are recreated when needed
+        state = self.__dict__.copy()
+        state["_buffers"] = {}
+        state["_dm_arg"] = None
+        state.pop("_dm_array", None)
+        return state
+
+    def __call__(self, t, y, inputs, out=None):
+        """
+        Evaluate the function at time t and state y. If `out` is given, the result is
+        written into it and `out` is returned: a flat array for the rhs, algebraic
+        equations and residuals, or, for Jacobians, a dense array or a
+        :class:`scipy.sparse.csr_matrix` (see :meth:`empty_jacobian`) whose data
+        are overwritten. CasADi functions then write directly into `out`, without
+        allocating any arrays.
+        """
         y = y.reshape(-1, 1)
         if self.name in ["RHS", "algebraic", "residuals"]:
             pybamm.logger.debug(
@@ -935,12 +1550,16 @@ class SolverCallable:
                     self.name, self.model.name, t * self.timescale
                 )
             )
+            if out is not None:
+                return self.function(t, y, inputs, out=out)
             return self.function(t, y, inputs).flatten()
         else:
-            return self.function(t, y, inputs)
+            return self.function(t, y, inputs, out=out)
 
-    def function(self, t, y, inputs):
+    def function(self, t, y, inputs, out=None):
         if self.form == "casadi":
+            if out is not None:
+                return self._evaluate_in_place(out, t, y, inputs)
             states_eval = self._function(t, y, inputs)
             if self.name in ["RHS", "algebraic", "residuals", "event"]:
                 return states_eval.full()
@@ -948,20 +1567,165 @@ class SolverCallable:
                 # keep jacobians sparse
                 return states_eval
         else:
-            return self._function(t, y, inputs=inputs, known_evals={})[0]
+            result = self._function(t, y, inputs=inputs, known_evals={})[0]
+            if out is not None:
+                return self._copy_into(result, out)
+            return result
+
+    def empty_jacobian(self, t=None, y=None, inputs=None):
+        """
+        Returns a :class:`scipy.sparse.csr_matrix` with the sparsity pattern of the
+        Jacobian and zero entries, that can be passed as `out`. For CasADi functions
+        the pattern is the structural one; otherwise it is the pattern of the
+        Jacobian evaluated at time t and state y (which must then be given).
+        """
+        if self.form == "casadi":
+            # the CSR format of the Jacobian is the CSC format of its transpose
+            sparsity = self._function.sparsity_out(0).T
+            colind, row = sparsity.get_ccs()
+            return csr_matrix(
+                (np.zeros(len(row)), np.array(row), np.array(colind)),
+                shape=self._function.sparsity_out(0).shape,
+            )
+        jac = csr_matrix(self.function(t, y.reshape(-1, 1), inputs))
+        jac.sort_indices()
+        jac.data[:] = 0
+        return jac
+
+    def _copy_into(self, result, out):
+        "Copy the result of a python function into `out`"
+        if issparse(out):
+            # entries of the result in the sparsity pattern of out
+            rows = np.repeat(np.arange(out.shape[0]), np.diff(out.indptr))
+            out.data[:] = np.asarray(csr_matrix(result)[rows, out.indices]).ravel()
+        else:
+            if issparse(result):
+                result = result.toarray()
+            out[...] = np.reshape(result, out.shape)
+        return out
+
+    def _evaluate_in_place(self, out, *args):
+        """
+        Evaluate the CasADi function with arguments `args`, writing the result
+        directly into `out`
+        """
+        # CasADi stores the nonzeros of matrices by column: write the transpose of
+        # the function (or its nonzeros, for the CSR format) into C-ordered outputs
+        if issparse(out):
+            layout, result = "csr", out.data
+        elif out.flags["C_CONTIGUOUS"]:
+            layout, result = "C", out
+        else:
+            layout, result = "F", out.T
+        if layout not in self._buffers:
+            mx_in = self._function.mx_in()
+            output = self._function.call(mx_in)[0]
+            if layout == "csr":
+                output = output.T
+            elif layout == "C":
+                output = casadi.densify(output).T
+            else:
+                output = casadi.densify(output)
+            function = casadi.Function(self.name, mx_in, [output])
+            buffer, evaluate = function.buffer()
+            # numbers are passed in through arrays of size one
+            scalars = [np.zeros(1) for _ in args]
+            self._buffers[layout] = (buffer, evaluate, scalars)
+        buffer, evaluate, scalars = self._buffers[layout]
+
+        for i, arg in enumerate(args):
+            if isinstance(arg, numbers.Number):
+                scalars[i][0] = arg
+                arg = scalars[i]
+            elif isinstance(arg, casadi.DM):
+                # convert the (stacked) inputs once
+                if arg is not self._dm_arg:
+                    self._dm_arg = arg
+                    self._dm_array = np.array(arg.full(), dtype=float).ravel()
+                arg = self._dm_array
+            else:
+                arg = np.ascontiguousarray(arg, dtype=float)
+            buffer.set_arg(i, memoryview(arg))
+        buffer.set_res(0, memoryview(result))
+        evaluate()
+        return out
 
 
 class Residuals(SolverCallable):
     "Returns information about residuals at time t and state y"
 
     def __init__(self, function, name, model):
-        super().__init__(function, name, model)
         if model.mass_matrix is not None:
             self.mass_matrix = model.mass_matrix.entries
+            if isinstance(function, casadi.Function):
+                # include the mass matrix term in the CasADi function, so that the
+                # residuals can be evaluated in place
+                t, y, p = function.mx_in()
+                ydot = casadi.MX.sym("ydot", y.shape[0])
+                function = casadi.Function(
+                    name,
+                    [t, y, ydot, p],
+                    [function(t, y, p) - casadi.DM(self.mass_matrix) @ ydot],
+                )
+        super().__init__(function, name, model)
 
-    def __call__(self, t, y, ydot, inputs):
-        states_eval = super().__call__(t, y, inputs)
-        return states_eval - self.mass_matrix @ ydot
+    def __call__(self, t, y, ydot, inputs, out=None):
+        pybamm.logger.debug(
+            "Evaluating residuals for {} at t={}".format(
+                self.model.name, t * self.timescale
+            )
+        )
+        if self.form == "casadi":
+            if out is not None:
+                return self._evaluate_in_place(out, t, y, ydot, inputs)
+            return self._function(t, y, ydot, inputs).full().flatten()
+        states_eval = self.function(t, y.reshape(-1, 1), inputs, out=out)
+        if out is not None:
+            states_eval -= self.mass_matrix @ ydot
+            return states_eval
+        return states_eval.flatten() - self.mass_matrix @ ydot
+
+
+class ResidualsJacobian(SolverCallable):
+    """
+    Returns the Jacobian of the residuals at time t and state y, i.e.
+    d(residuals)/dy + cj * d(residuals)/dydot = jac - cj * mass_matrix
+    """
+
+    def __init__(self, jacobian, model):
+        function = jacobian._function
+        self.mass_matrix = model.mass_matrix.entries
+        if isinstance(function, casadi.Function):
+            # include the mass matrix term in the CasADi function, so that the
+            # Jacobian can be evaluated in place
+            t, y, p = function.mx_in()
+            cj = casadi.MX.sym("cj")
+            function = casadi.Function(
+                "residuals_jac",
+                [t, y, cj, p],
+                [function(t, y, p) - cj * casadi.DM(self.mass_matrix)],
+            )
+        super().__init__(function, "residuals_jac", model)
+
+    def __call__(self, t, y, cj, inputs, out=None):
+        if self.form == "casadi":
+            if out is not None:
+                return self._evaluate_in_place(out, t, y, cj, inputs)
+            return self._function(t, y, cj, inputs)
+        jac = self._function(t, y.reshape(-1, 1), inputs=inputs, known_evals={})[0]
+        jac = jac - cj * self.mass_matrix
+        if out is not None:
+            return self._copy_into(jac, out)
+        return jac
+
+    def empty_jacobian(self, t=None, y=None, inputs=None):
+        if self.form == "casadi":
+            return super().empty_jacobian()
+        # include the pattern of the mass matrix
+        jac = csr_matrix(self(t, y, 1, inputs))
+        jac.sort_indices()
+        jac.data[:] = 0
+        return jac
 
 
 class InitialConditions(SolverCallable):
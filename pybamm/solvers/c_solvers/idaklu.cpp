@@ -1,16 +1,23 @@
+#include <algorithm>
 #include <math.h>
+#include <memory>
 #include <stdio.h>
+#include <string>
+#include <vector>
 
-#include <ida/ida.h>                 /* prototypes for IDA fcts., consts.    */
+#include <idas/idas.h>               /* prototypes for IDAS fcts., consts.   */
 #include <nvector/nvector_serial.h>  /* access to serial N_Vector            */
 #include <sundials/sundials_math.h>  /* defs. of SUNRabs, SUNRexp, etc.      */
 #include <sundials/sundials_types.h> /* defs. of realtype, sunindextype      */
 #include <sunlinsol/sunlinsol_klu.h> /* access to KLU linear solver          */
 #include <sunmatrix/sunmatrix_sparse.h> /* access to sparse SUNMatrix           */
 
+#include <casadi/casadi.hpp>
+
 #include <pybind11/functional.h>
 #include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
 namespace py = pybind11;
 
 using residual_type = std::function<py::array_t<double>(
@@ -20,6 +27,7 @@ using jacobian_type =
 using event_type =
     std::function<py::array_t<double>(double, py::array_t<double>)>;
 using np_array = py::array_t<double>;
+using np_array_int = py::array_t<int64_t>;
 
 using jac_get_type = std::function<np_array()>;
 
@@ -196,25 +204,246 @@ int events(realtype t, N_Vector yy, N_Vector yp, realtype *events_ptr,
   return (0);
 }
 
+/* Wraps a CasADi function so that it can be evaluated from C++, with work
+ * vectors allocated once, so that no memory is allocated (and Python is not
+ * called) at each evaluation. The pointers to the arguments and results are set
+ * in m_arg and m_res before calling the function */
+class CasadiFunction
+{
+public:
+  explicit CasadiFunction(const casadi::Function &f) : m_func(f)
+  {
+    size_t sz_arg, sz_res, sz_iw, sz_w;
+    m_func.sz_work(sz_arg, sz_res, sz_iw, sz_w);
+    m_arg.resize(sz_arg, nullptr);
+    m_res.resize(sz_res, nullptr);
+    m_iw.resize(sz_iw);
+    m_w.resize(sz_w);
+    m_mem = m_func.checkout();
+  }
+
+  ~CasadiFunction() { m_func.release(m_mem); }
+
+  CasadiFunction(const CasadiFunction &) = delete;
+  CasadiFunction &operator=(const CasadiFunction &) = delete;
+
+  void operator()()
+  {
+    m_func(m_arg.data(), m_res.data(), m_iw.data(), m_w.data(), m_mem);
+  }
+
+  std::vector<const realtype *> m_arg;
+  std::vector<realtype *> m_res;
+
+private:
+  casadi::Function m_func;
+  std::vector<casadi_int> m_iw;
+  std::vector<realtype> m_w;
+  int m_mem;
+};
+
+class CasadiFunctions
+{
+public:
+  int number_of_states;
+  int number_of_events;
+  int number_of_parameters;
+  CasadiFunction res;
+  CasadiFunction jac;
+  CasadiFunction event;
+  // for the sensitivity equations (if number_of_parameters > 0): the product of
+  // the Jacobians (dr/dy, dr/dy') with the sensitivities (s, s') of one
+  // parameter, and the (dense) derivative of the residuals dr/dp
+  std::unique_ptr<CasadiFunction> sens_jvp;
+  std::unique_ptr<CasadiFunction> sens_res_p;
+  std::vector<realtype> res_p;
+  std::vector<sunindextype> jac_colptrs;
+  std::vector<sunindextype> jac_rowvals;
+  std::vector<realtype> inputs;
+
+  CasadiFunctions(const casadi::Function &res_in, const casadi::Function &jac_in,
+                  np_array_int jac_colptrs_np, np_array_int jac_rowvals_np,
+                  const casadi::Function &event_in, const int n_s, int n_e,
+                  np_array inputs_np,
+                  const std::vector<casadi::Function> &sensitivities_in,
+                  const int n_p)
+      : number_of_states(n_s), number_of_events(n_e), number_of_parameters(n_p),
+        res(res_in), jac(jac_in), event(event_in)
+  {
+    if (number_of_parameters > 0)
+    {
+      sens_jvp.reset(new CasadiFunction(sensitivities_in[0]));
+      sens_res_p.reset(new CasadiFunction(sensitivities_in[1]));
+      res_p.resize(number_of_states * number_of_parameters);
+    }
+    auto colptrs = jac_colptrs_np.unchecked<1>();
+    auto rowvals = jac_rowvals_np.unchecked<1>();
+    auto p = inputs_np.unchecked<1>();
+    jac_colptrs.resize(colptrs.shape(0));
+    jac_rowvals.resize(rowvals.shape(0));
+    inputs.resize(p.shape(0));
+    for (py::ssize_t i = 0; i < colptrs.shape(0); i++)
+    {
+      jac_colptrs[i] = colptrs(i);
+    }
+    for (py::ssize_t i = 0; i < rowvals.shape(0); i++)
+    {
+      jac_rowvals[i] = rowvals(i);
+    }
+    for (py::ssize_t i = 0; i < p.shape(0); i++)
+    {
+      inputs[i] = p(i);
+    }
+  }
+};
+
+int residual_casadi(realtype tres, N_Vector yy, N_Vector yp, N_Vector rr,
+                    void *user_data)
+{
+  CasadiFunctions *casadi_functions = static_cast<CasadiFunctions *>(user_data);
+  CasadiFunction &res = casadi_functions->res;
+
+  // residuals(t, y, y', inputs), written directly into rr
+  res.m_arg[0] = &tres;
+  res.m_arg[1] = N_VGetArrayPointer(yy);
+  res.m_arg[2] = N_VGetArrayPointer(yp);
+  res.m_arg[3] = casadi_functions->inputs.data();
+  res.m_res[0] = N_VGetArrayPointer(rr);
+  res();
+  return 0;
+}
+
+int jacobian_casadi(realtype tt, realtype cj, N_Vector yy, N_Vector yp,
+                    N_Vector resvec, SUNMatrix JJ, void *user_data,
+                    N_Vector tempv1, N_Vector tempv2, N_Vector tempv3)
+{
+  CasadiFunctions *casadi_functions = static_cast<CasadiFunctions *>(user_data);
+  CasadiFunction &jac = casadi_functions->jac;
+
+  // the CasADi function gives the nonzeros of the transpose of (dr/dy) - cj
+  // (dr/dy') in CSC order, i.e. the nonzeros of the Jacobian in CSR order, which
+  // are written directly into the KLU matrix
+  jac.m_arg[0] = &tt;
+  jac.m_arg[1] = N_VGetArrayPointer(yy);
+  jac.m_arg[2] = &cj;
+  jac.m_arg[3] = casadi_functions->inputs.data();
+  jac.m_res[0] = SUNSparseMatrix_Data(JJ);
+  jac();
+
+  // the sparsity pattern is constant, but IDA zeros the whole matrix before
+  // each call
+  std::copy(casadi_functions->jac_colptrs.begin(),
+            casadi_functions->jac_colptrs.end(),
+            SUNSparseMatrix_IndexPointers(JJ));
+  std::copy(casadi_functions->jac_rowvals.begin(),
+            casadi_functions->jac_rowvals.end(),
+            SUNSparseMatrix_IndexValues(JJ));
+
+  return (0);
+}
+
+int events_casadi(realtype t, N_Vector yy, N_Vector yp, realtype *events_ptr,
+                  void *user_data)
+{
+  CasadiFunctions *casadi_functions = static_cast<CasadiFunctions *>(user_data);
+  CasadiFunction &event = casadi_functions->event;
+
+  event.m_arg[0] = &t;
+  event.m_arg[1] = N_VGetArrayPointer(yy);
+  event.m_arg[2] = casadi_functions->inputs.data();
+  event.m_res[0] = events_ptr;
+  event();
+
+  return (0);
+}
+
+int sensitivities_casadi(int Ns, realtype t, N_Vector yy, N_Vector yp,
+                         N_Vector resval, N_Vector *yS, N_Vector *ypS,
+                         N_Vector *resvalS, void *user_data, N_Vector tmp1,
+                         N_Vector tmp2, N_Vector tmp3)
+{
+  CasadiFunctions *casadi_functions = static_cast<CasadiFunctions *>(user_data);
+  CasadiFunction &jvp = *casadi_functions->sens_jvp;
+  CasadiFunction &res_p = *casadi_functions->sens_res_p;
+  int n = casadi_functions->number_of_states;
+
+  // dr/dp(t, y, y', inputs), one column per parameter
+  res_p.m_arg[0] = &t;
+  res_p.m_arg[1] = N_VGetArrayPointer(yy);
+  res_p.m_arg[2] = N_VGetArrayPointer(yp);
+  res_p.m_arg[3] = casadi_functions->inputs.data();
+  res_p.m_res[0] = casadi_functions->res_p.data();
+  res_p();
+
+  // the residuals of the sensitivity equations for each parameter are
+  // (dr/dy) s_i + (dr/dy') s_i' + dr/dp_i
+  jvp.m_arg[0] = &t;
+  jvp.m_arg[1] = N_VGetArrayPointer(yy);
+  jvp.m_arg[2] = N_VGetArrayPointer(yp);
+  jvp.m_arg[3] = casadi_functions->inputs.data();
+  for (int i = 0; i < Ns; i++)
+  {
+    jvp.m_arg[4] = N_VGetArrayPointer(yS[i]);
+    jvp.m_arg[5] = N_VGetArrayPointer(ypS[i]);
+    realtype *resvalS_i = N_VGetArrayPointer(resvalS[i]);
+    jvp.m_res[0] = resvalS_i;
+    jvp();
+    for (int j = 0; j < n; j++)
+    {
+      resvalS_i[j] += casadi_functions->res_p[i * n + j];
+    }
+  }
+
+  return 0;
+}
+
+casadi::Function generate_function(const std::string &data)
+{
+  return casadi::Function::deserialize(data);
+}
+
 class Solution
 {
 public:
-  Solution(int retval, np_array t_np, np_array y_np)
-      : flag(retval), t(t_np), y(y_np)
+  Solution(int retval, np_array t_np, np_array y_np, np_array yS_np)
+      : flag(retval), t(t_np), y(y_np), yS(yS_np)
   {
   }
 
   int flag;
   np_array t;
   np_array y;
+  np_array yS;
+
+  // integrator statistics
+  long nsteps = 0;
+  long nrevals = 0;
+  long njevals = 0;
+  long nlinsetups = 0;
+  long nniters = 0;
+  long netfails = 0;
+  long nncfails = 0;
 };
 
-/* main program */
-Solution solve(np_array t_np, np_array y0_np, np_array yp0_np,
-               residual_type res, jacobian_type jac, jac_get_type gjd,
-               jac_get_type gjrv, jac_get_type gjcp, int nnz, event_type event,
-               int number_of_events, int use_jacobian, np_array rhs_alg_id,
-               np_array atol_np, double rel_tol)
+/* copy the sensitivities of each parameter, one after the other */
+void store_sensitivities(N_Vector *yS, realtype *out, int number_of_parameters,
+                         int number_of_states)
+{
+  for (int is = 0; is < number_of_parameters; is++)
+  {
+    realtype *ySval = N_VGetArrayPointer(yS[is]);
+    std::copy(ySval, ySval + number_of_states, out + is * number_of_states);
+  }
+}
+
+/* main program, shared by the solvers calling Python and CasADi functions */
+Solution solve_ida(np_array t_np, np_array y0_np, np_array yp0_np,
+                   IDAResFn res, IDALsJacFn jac, IDARootFn event,
+                   void *user_data, int nnz, int number_of_events,
+                   int use_jacobian, np_array rhs_alg_id, np_array atol_np,
+                   double rel_tol, bool interpolate, bool release_gil,
+                   IDASensResFn sens_res, int number_of_parameters,
+                   np_array yS0_np)
 {
   auto t = t_np.unchecked<1>();
   auto y0 = y0_np.unchecked<1>();
@@ -255,7 +484,7 @@ Solution solve(np_array t_np, np_array y0_np, np_array yp0_np,
 
   // initialise solver
   realtype t0 = RCONST(t(0));
-  IDAInit(ida_mem, residual, t0, yy, yp);
+  IDAInit(ida_mem, res, t0, yy, yp);
 
   // set tolerances
   rtol = RCONST(rel_tol);
@@ -263,12 +492,9 @@ Solution solve(np_array t_np, np_array y0_np, np_array yp0_np,
   IDASVtolerances(ida_mem, rtol, avtol);
 
   // set events
-  IDARootInit(ida_mem, number_of_events, events);
+  IDARootInit(ida_mem, number_of_events, event);
 
-  // set pybamm functions by passing pointer to it
-  PybammFunctions pybamm_functions(res, jac, gjd, gjrv, gjcp, event,
-                                   number_of_states, number_of_events);
-  void *user_data = &pybamm_functions;
+  // set the functions by passing pointer to them
   IDASetUserData(ida_mem, user_data);
 
   // set linear solver
@@ -279,7 +505,33 @@ Solution solve(np_array t_np, np_array y0_np, np_array yp0_np,
 
   if (use_jacobian == 1)
   {
-    IDASetJacFn(ida_mem, jacobian);
+    IDASetJacFn(ida_mem, jac);
+  }
+
+  // set up the forward sensitivities, from the initial sensitivities (stored
+  // parameter by parameter), with s' = 0 as a guess made consistent by IDACalcIC
+  N_Vector *yS = nullptr;
+  N_Vector *ypS = nullptr;
+  N_Vector yS_interp = nullptr;
+  if (number_of_parameters > 0)
+  {
+    auto yS0 = yS0_np.unchecked<1>();
+    yS = N_VCloneVectorArray(number_of_parameters, yy);
+    ypS = N_VCloneVectorArray(number_of_parameters, yy);
+    for (int is = 0; is < number_of_parameters; is++)
+    {
+      realtype *ySval = N_VGetArrayPointer(yS[is]);
+      for (i = 0; i < number_of_states; i++)
+      {
+        ySval[i] = yS0[is * number_of_states + i];
+      }
+      N_VConst(RCONST(0.0), ypS[is]);
+    }
+    IDASensInit(ida_mem, number_of_parameters, IDA_SIMULTANEOUS, sens_res, yS,
+                ypS);
+    IDASensEEtolerances(ida_mem);
+    IDASetSensErrCon(ida_mem, SUNTRUE);
+    yS_interp = N_VNew_Serial(number_of_states);
   }
 
   int t_i = 1;
@@ -290,6 +542,10 @@ Solution solve(np_array t_np, np_array y0_np, np_array yp0_np,
   // set return vectors
   std::vector<double> t_return(number_of_timesteps);
   std::vector<double> y_return(number_of_timesteps * number_of_states);
+  // sensitivities, stored time by time, then parameter by parameter
+  std::vector<double> yS_return(number_of_timesteps * number_of_parameters *
+                                number_of_states);
+  int n_yS = number_of_parameters * number_of_states;
 
   t_return[0] = t(0);
   int j;
@@ -312,51 +568,204 @@ Solution solve(np_array t_np, np_array y0_np, np_array yp0_np,
   }
 
   IDASetId(ida_mem, id);
-  IDACalcIC(ida_mem, IDA_YA_YDP_INIT, t(1));
 
-  while (true)
   {
-    t_next = t(t_i);
-    IDASetStopTime(ida_mem, t_next);
-    retval = IDASolve(ida_mem, t_final, &tret, yy, yp, IDA_NORMAL);
+    // CasADi functions don't need Python, so other threads can run during the
+    // integration
+    std::unique_ptr<py::gil_scoped_release> gil_release;
+    if (release_gil)
+    {
+      gil_release.reset(new py::gil_scoped_release());
+    }
 
-    if (retval == IDA_TSTOP_RETURN)
+    IDACalcIC(ida_mem, IDA_YA_YDP_INIT, t(1));
+
+    if (number_of_parameters > 0)
+    {
+      IDAGetSensConsistentIC(ida_mem, yS, ypS);
+      store_sensitivities(yS, yS_return.data(), number_of_parameters,
+                          number_of_states);
+    }
+
+    if (interpolate)
     {
-      t_return[t_i] = tret;
-      for (j = 0; j < number_of_states; j++)
+      // let IDA step freely up to the final time (the discontinuities are at
+      // the ends of the calls to solve), and interpolate the solution at the
+      // output times passed by each step
+      IDASetStopTime(ida_mem, t_final);
+      N_Vector yy_interp = N_VNew_Serial(number_of_states);
+      realtype *yval_interp = N_VGetArrayPointer(yy_interp);
+
+      while (true)
       {
-        y_return[t_i * number_of_states + j] = yval[j];
+        retval = IDASolve(ida_mem, t_final, &tret, yy, yp, IDA_ONE_STEP);
+        if (retval < 0)
+        {
+          break;
+        }
+
+        while (t_i < number_of_timesteps - 1 && t(t_i) < tret)
+        {
+          IDAGetDky(ida_mem, t(t_i), 0, yy_interp);
+          t_return[t_i] = t(t_i);
+          for (j = 0; j < number_of_states; j++)
+          {
+            y_return[t_i * number_of_states + j] = yval_interp[j];
+          }
+          for (int is = 0; is < number_of_parameters; is++)
+          {
+            IDAGetSensDky1(ida_mem, t(t_i), 0, is, yS_interp);
+            std::copy(N_VGetArrayPointer(yS_interp),
+                      N_VGetArrayPointer(yS_interp) + number_of_states,
+                      &yS_return[t_i * n_yS + is * number_of_states]);
+          }
+          t_i += 1;
+        }
+
+        if (retval == IDA_TSTOP_RETURN || retval == IDA_ROOT_RETURN)
+        {
+          t_return[t_i] = tret;
+          for (j = 0; j < number_of_states; j++)
+          {
+            y_return[t_i * number_of_states + j] = yval[j];
+          }
+          if (number_of_parameters > 0)
+          {
+            IDAGetSens(ida_mem, &tret, yS);
+            store_sensitivities(yS, &yS_return[t_i * n_yS],
+                                number_of_parameters, number_of_states);
+          }
+          // reaching the final time is a success
+          if (retval == IDA_TSTOP_RETURN)
+          {
+            retval = IDA_SUCCESS;
+          }
+          break;
+        }
       }
-      t_i += 1;
-    }
 
-    if (retval == IDA_SUCCESS || retval == IDA_ROOT_RETURN)
+      N_VDestroy(yy_interp);
+    }
+    else
     {
-      t_return[t_i] = tret;
-      for (j = 0; j < number_of_states; j++)
+      while (true)
       {
-        y_return[t_i * number_of_states + j] = yval[j];
+        t_next = t(t_i);
+        IDASetStopTime(ida_mem, t_next);
+        retval = IDASolve(ida_mem, t_final, &tret, yy, yp, IDA_NORMAL);
+
+        if (retval == IDA_TSTOP_RETURN)
+        {
+          t_return[t_i] = tret;
+          for (j = 0; j < number_of_states; j++)
+          {
+            y_return[t_i * number_of_states + j] = yval[j];
+          }
+          if (number_of_parameters > 0)
+          {
+            IDAGetSens(ida_mem, &tret, yS);
+            store_sensitivities(yS, &yS_return[t_i * n_yS],
+                                number_of_parameters, number_of_states);
+          }
+          t_i += 1;
+        }
+
+        if (retval == IDA_SUCCESS || retval == IDA_ROOT_RETURN)
+        {
+          t_return[t_i] = tret;
+          for (j = 0; j < number_of_states; j++)
+          {
+            y_return[t_i * number_of_states + j] = yval[j];
+          }
+          if (number_of_parameters > 0)
+          {
+            IDAGetSens(ida_mem, &tret, yS);
+            store_sensitivities(yS, &yS_return[t_i * n_yS],
+                                number_of_parameters, number_of_states);
+          }
+          break;
+        }
       }
-      break;
     }
   }
 
+  /* Get the integrator statistics before the memory is freed */
+  long nsteps, nrevals, njevals, nlinsetups, nniters, netfails, nncfails;
+  IDAGetNumSteps(ida_mem, &nsteps);
+  IDAGetNumResEvals(ida_mem, &nrevals);
+  IDAGetNumJacEvals(ida_mem, &njevals);
+  IDAGetNumLinSolvSetups(ida_mem, &nlinsetups);
+  IDAGetNumNonlinSolvIters(ida_mem, &nniters);
+  IDAGetNumErrTestFails(ida_mem, &netfails);
+  IDAGetNumNonlinSolvConvFails(ida_mem, &nncfails);
+
   /* Free memory */
   IDAFree(&ida_mem);
   SUNLinSolFree(LS);
   SUNMatDestroy(J);
   N_VDestroy(avtol);
   N_VDestroy(yp);
+  if (number_of_parameters > 0)
+  {
+    N_VDestroyVectorArray(yS, number_of_parameters);
+    N_VDestroyVectorArray(ypS, number_of_parameters);
+    N_VDestroy(yS_interp);
+  }
 
   py::array_t<double> t_ret = py::array_t<double>((t_i + 1), &t_return[0]);
   py::array_t<double> y_ret =
       py::array_t<double>((t_i + 1) * number_of_states, &y_return[0]);
-
-  Solution sol(retval, t_ret, y_ret);
+  py::array_t<double> yS_ret =
+      py::array_t<double>((t_i + 1) * n_yS, yS_return.data());
+
+  Solution sol(retval, t_ret, y_ret, yS_ret);
+  sol.nsteps = nsteps;
+  sol.nrevals = nrevals;
+  sol.njevals = njevals;
+  sol.nlinsetups = nlinsetups;
+  sol.nniters = nniters;
+  sol.netfails = netfails;
+  sol.nncfails = nncfails;
 
   return sol;
 }
 
+Solution solve(np_array t_np, np_array y0_np, np_array yp0_np,
+               residual_type res, jacobian_type jac, jac_get_type gjd,
+               jac_get_type gjrv, jac_get_type gjcp, int nnz, event_type event,
+               int number_of_events, int use_jacobian, np_array rhs_alg_id,
+               np_array atol_np, double rel_tol, bool interpolate)
+{
+  int number_of_states = y0_np.request().size;
+  PybammFunctions pybamm_functions(res, jac, gjd, gjrv, gjcp, event,
+                                   number_of_states, number_of_events);
+  return solve_ida(t_np, y0_np, yp0_np, residual, jacobian, events,
+                   &pybamm_functions, nnz, number_of_events, use_jacobian,
+                   rhs_alg_id, atol_np, rel_tol, interpolate, false, nullptr, 0,
+                   np_array());
+}
+
+Solution solve_casadi(np_array t_np, np_array y0_np, np_array yp0_np,
+                      const casadi::Function &res,
+                      const casadi::Function &jac_times_cjmass,
+                      np_array_int jac_colptrs, np_array_int jac_rowvals,
+                      int nnz, const casadi::Function &event,
+                      int number_of_events, np_array rhs_alg_id,
+                      np_array atol_np, double rel_tol, np_array inputs,
+                      bool interpolate,
+                      const std::vector<casadi::Function> &sensitivities,
+                      int number_of_parameters, np_array yS0)
+{
+  int number_of_states = y0_np.request().size;
+  CasadiFunctions casadi_functions(
+      res, jac_times_cjmass, jac_colptrs, jac_rowvals, event, number_of_states,
+      number_of_events, inputs, sensitivities, number_of_parameters);
+  return solve_ida(t_np, y0_np, yp0_np, residual_casadi, jacobian_casadi,
+                   events_casadi, &casadi_functions, nnz, number_of_events, 1,
+                   rhs_alg_id, atol_np, rel_tol, interpolate, true,
+                   sensitivities_casadi, number_of_parameters, yS0);
+}
+
 PYBIND11_MODULE(idaklu, m)
 {
   m.doc() = "sundials solvers"; // optional module docstring
@@ -366,10 +775,36 @@ PYBIND11_MODULE(idaklu, m)
         py::arg("get_jac_row_vals"), py::arg("get_jac_col_ptr"), py::arg("nnz"),
         py::arg("events"), py::arg("number_of_events"), py::arg("use_jacobian"),
         py::arg("rhs_alg_id"), py::arg("atol"), py::arg("rtol"),
+        py::arg("interpolate") = false,
+        py::return_value_policy::take_ownership);
+
+  m.def("solve_casadi", &solve_casadi,
+        "The solve function, evaluating CasADi functions", py::arg("t"),
+        py::arg("y0"), py::arg("yp0"), py::arg("res"),
+        py::arg("jac_times_cjmass"), py::arg("jac_times_cjmass_colptrs"),
+        py::arg("jac_times_cjmass_rowvals"), py::arg("jac_times_cjmass_nnz"),
+        py::arg("events"), py::arg("number_of_events"), py::arg("rhs_alg_id"),
+        py::arg("atol"), py::arg("rtol"), py::arg("inputs"),
+        py::arg("interpolate") = false,
+        py::arg("sensitivities") = std::vector<casadi::Function>(),
+        py::arg("number_of_parameters") = 0, py::arg("yS0") = np_array(),
         py::return_value_policy::take_ownership);
 
+  m.def("generate_function", &generate_function,
+        "Create a CasADi function from its serialization", py::arg("string"));
+
+  py::class_<casadi::Function>(m, "Function");
+
   py::class_<Solution>(m, "solution")
       .def_readwrite("t", &Solution::t)
       .def_readwrite("y", &Solution::y)
-      .def_readwrite("flag", &Solution::flag);
+      .def_readwrite("yS", &Solution::yS)
+      .def_readwrite("flag", &Solution::flag)
+      .def_readwrite("nsteps", &Solution::nsteps)
+      .def_readwrite("nrevals", &Solution::nrevals)
+      .def_readwrite("njevals", &Solution::njevals)
+      .def_readwrite("nlinsetups", &Solution::nlinsetups)
+      .def_readwrite("nniters", &Solution::nniters)
+      .def_readwrite("netfails", &Solution::netfails)
+      .def_readwrite("nncfails", &Solution::nncfails);
 }
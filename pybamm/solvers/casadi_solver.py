@@ -47,6 +47,19 @@ class CasadiSolver(pybamm.BaseSolver):
         The maximum global step size (in seconds) used in "safe" mode. If None
         the default value corresponds to a non-dimensional time of 0.01
         (i.e. ``0.01 * model.timescale_eval``).
+    event_location : str, optional
+        How terminating events are located in "safe" mode (default is
+        "interpolate"):
+
+        - "interpolate": find the event time with a bracketed search on the \
+        states of the window interpolated in time, and integrate the window \
+        again up to the event.
+        - "rootfinder": find the event time with a CasADi (Newton) rootfinder \
+        on the integrator from the last time point before the event, which \
+        gives the event time and state without integrating the window again. \
+        Falls back to a bracketed search on the same function if Newton's \
+        method fails. Only used if all the events are converted to CasADi, and
+        the sensitivities aren't calculated.
     extra_options_setup : dict, optional
         Any options to pass to the CasADi integrator when creating the integrator.
         Please consult `CasADi documentation <https://tinyurl.com/y5rk76os>`_ for
@@ -71,10 +84,12 @@ class CasadiSolver(pybamm.BaseSolver):
         root_tol=1e-6,
         max_step_decrease_count=5,
         dt_max=None,
+        event_location="interpolate",
         extra_options_setup=None,
         extra_options_call=None,
     ):
         super().__init__("problem dependent", rtol, atol, root_method, root_tol)
+        self.supports_sensitivities = True
         if mode in ["safe", "fast", "safe without grid"]:
             self.mode = mode
         else:
@@ -85,6 +100,13 @@ class CasadiSolver(pybamm.BaseSolver):
             )
         self.max_step_decrease_count = max_step_decrease_count
         self.dt_max = dt_max
+        if event_location in ["interpolate", "rootfinder"]:
+            self.event_location = event_location
+        else:
+            raise ValueError(
+                "invalid event_location '{}'. Must be 'interpolate' or "
+                "'rootfinder'".format(event_location)
+            )
 
         self.extra_options_setup = extra_options_setup or {}
         self.extra_options_call = extra_options_call or {}
@@ -94,6 +116,22 @@ class CasadiSolver(pybamm.BaseSolver):
         # Initialize
         self.integrators = {}
         self.integrator_specs = {}
+        self.mapped_integrators = {}
+        # Integrators for each model, keyed by their normalised grid (None if they
+        # don't use a grid)
+        self.grid_integrators = {}
+        # Maximum number of grid shapes for which integrators are kept, per model
+        self.max_grid_integrators = 100
+        # Functions giving the states and their sensitivities over a grid, for each
+        # model, keyed by the inputs (and their sizes), the names of the inputs with
+        # respect to which the sensitivities are calculated and the normalised grid
+        self.sensitivity_functions = {}
+        # Functions and rootfinders used to locate events, for each model
+        self.event_functions = {}
+        self.event_rootfinders = {}
+        # Time taken to create integrators since the last integration, which is
+        # added to the profile of the next solution
+        self._integrator_creation_time = 0
 
         pybamm.citations.register("Andersson2019")
 
@@ -111,11 +149,13 @@ class CasadiSolver(pybamm.BaseSolver):
             Any external variables or input parameters to pass to the model when solving
         """
         # Record whether there are any symbolic inputs
-        inputs = inputs or {}
-        has_symbolic_inputs = any(isinstance(v, casadi.MX) for v in inputs.values())
+        inputs_dict = inputs or {}
+        has_symbolic_inputs = any(
+            isinstance(v, casadi.MX) for v in inputs_dict.values()
+        )
 
         # convert inputs to casadi format
-        inputs = casadi.vertcat(*[x for x in inputs.values()])
+        inputs = casadi.vertcat(*[x for x in inputs_dict.values()])
 
         if has_symbolic_inputs:
             # Create integrator without grid to avoid having to create several times
@@ -126,6 +166,13 @@ class CasadiSolver(pybamm.BaseSolver):
         elif self.mode == "fast" or not model.events:
             if not model.events:
                 pybamm.logger.info("No events found, running fast mode")
+            if model.calculate_sensitivities:
+                # Calculate the states along with their sensitivities, in one call
+                solution = self._run_integrator_with_sensitivities(
+                    model, inputs_dict, t_eval
+                )
+                solution.termination = "final time"
+                return solution
             # Create an integrator with the grid (we just need to do this once)
             self.create_integrator(model, inputs, t_eval)
             solution = self._run_integrator(model, model.y0, inputs, t_eval)
@@ -135,6 +182,8 @@ class CasadiSolver(pybamm.BaseSolver):
             y0 = model.y0
             if isinstance(y0, casadi.DM):
                 y0 = y0.full().flatten()
+            # Sensitivities of the state, integrated along with it window by window
+            y0S = model.y0S if model.calculate_sensitivities else None
             # Step-and-check
             t = t_eval[0]
             t_f = t_eval[-1]
@@ -145,15 +194,18 @@ class CasadiSolver(pybamm.BaseSolver):
             )
             pybamm.logger.info("Start solving {} with {}".format(model.name, self.name))
 
-            if self.mode == "safe without grid":
+            if self.mode == "safe without grid" and y0S is None:
                 # in "safe without grid" mode,
                 # create integrator once, without grid,
                 # to avoid having to create several times
+                # (the sensitivities are integrated with the grid of each window,
+                # as in "safe" mode)
                 self.create_integrator(model, inputs)
                 # Initialize solution
                 solution = pybamm.Solution(np.array([t]), y0[:, np.newaxis])
                 solution.solve_time = 0
                 solution.integration_time = 0
+                self._store_output_variables(model, solution, inputs_dict)
             else:
                 solution = None
 
@@ -184,14 +236,11 @@ class CasadiSolver(pybamm.BaseSolver):
                     if len(t_window) == 1:
                         t_window = np.array([t, t + dt])
 
-                    if self.mode == "safe":
-                        # update integrator with the grid
-                        self.create_integrator(model, inputs, t_window)
                     # Try to solve with the current global step, if it fails then
                     # halve the step size and try again.
                     try:
-                        current_step_sol = self._run_integrator(
-                            model, y0, inputs, t_window
+                        current_step_sol = self._run_window(
+                            model, y0, y0S, inputs, inputs_dict, t_window
                         )
                         solved = True
                     except pybamm.SolverError:
@@ -222,59 +271,85 @@ class CasadiSolver(pybamm.BaseSolver):
                 # event state using interpolation. The solution is then truncated
                 # so that only the times up to the event are returned
                 if (new_event_signs != init_event_signs).any():
-                    # get the index of the events that have been crossed
-                    event_ind = np.where(new_event_signs != init_event_signs)[0]
-                    active_events = [model.terminate_events_eval[i] for i in event_ind]
-
-                    # create interpolant to evaluate y in the current integration
-                    # window
-                    y_sol = interp1d(current_step_sol.t, current_step_sol.y)
-
-                    # loop over events to compute the time at which they were triggered
-                    t_events = [None] * len(active_events)
-                    for i, event in enumerate(active_events):
-
-                        def event_fun(t):
-                            return event(t, y_sol(t), inputs)
-
-                        if np.isnan(event_fun(current_step_sol.t[-1])[0]):
-                            # bracketed search fails if f(a) or f(b) is NaN, so we
-                            # need to find the times for which we can evaluate the event
-                            times = [
-                                t
-                                for t in current_step_sol.t
-                                if event_fun(t)[0] == event_fun(t)[0]
-                            ]
-                        else:
-                            times = current_step_sol.t
-                        # skip if sign hasn't changed
-                        if np.sign(event_fun(times[0])) != np.sign(
-                            event_fun(times[-1])
-                        ):
-                            t_events[i] = brentq(
-                                lambda t: event_fun(t), times[0], times[-1]
-                            )
-                        else:
-                            t_events[i] = np.nan
-
-                    # t_event is the earliest event triggered
-                    t_event = np.nanmin(t_events)
-                    y_event = y_sol(t_event)
+                    if (
+                        self.event_location == "rootfinder"
+                        and not model.calculate_sensitivities
+                        and all(
+                            event.form == "casadi"
+                            for event in model.terminate_events_eval
+                        )
+                    ):
+                        # Locate the event using the states computed by the
+                        # integrator, and truncate the current step at the event
+                        # (so the window doesn't need to be integrated again)
+                        current_step_sol, t_event, y_event = self._locate_event(
+                            model, current_step_sol, init_event_signs, inputs
+                        )
+                    else:
+                        timer = pybamm.Timer()
+                        # get the index of the events that have been crossed
+                        event_ind = np.where(new_event_signs != init_event_signs)[0]
+                        active_events = [
+                            model.terminate_events_eval[i] for i in event_ind
+                        ]
 
-                    # solve again until the event time
-                    # See comments above on creating t_window
-                    t_window = np.concatenate(
-                        ([t], t_eval[(t_eval > t) & (t_eval < t_event)])
-                    )
-                    if len(t_window) == 1:
-                        t_window = np.array([t, t_event])
+                        # create interpolant to evaluate y in the current integration
+                        # window
+                        y_sol = interp1d(current_step_sol.t, current_step_sol.y)
+
+                        # loop over events to compute the time at which they were
+                        # triggered
+                        t_events = [None] * len(active_events)
+                        for i, event in enumerate(active_events):
+
+                            def event_fun(t):
+                                return event(t, y_sol(t), inputs)
+
+                            if np.isnan(event_fun(current_step_sol.t[-1])[0]):
+                                # bracketed search fails if f(a) or f(b) is NaN, so
+                                # we need to find the times for which we can
+                                # evaluate the event
+                                times = [
+                                    t
+                                    for t in current_step_sol.t
+                                    if event_fun(t)[0] == event_fun(t)[0]
+                                ]
+                            else:
+                                times = current_step_sol.t
+                            # skip if sign hasn't changed
+                            if np.sign(event_fun(times[0])) != np.sign(
+                                event_fun(times[-1])
+                            ):
+                                t_events[i] = brentq(
+                                    lambda t: event_fun(t), times[0], times[-1]
+                                )
+                            else:
+                                t_events[i] = np.nan
+
+                        # t_event is the earliest event triggered
+                        t_event = np.nanmin(t_events)
+                        y_event = y_sol(t_event)
+                        event_location_time = timer.time()
+
+                        # solve again until the event time
+                        # See comments above on creating t_window
+                        t_window = np.concatenate(
+                            ([t], t_eval[(t_eval > t) & (t_eval < t_event)])
+                        )
+                        if len(t_window) == 1:
+                            t_window = np.array([t, t_event])
 
-                    if self.mode == "safe":
-                        self.create_integrator(model, inputs, t_window)
-                    current_step_sol = self._run_integrator(model, y0, inputs, t_window)
+                        current_step_sol = self._run_window(
+                            model, y0, y0S, inputs, inputs_dict, t_window
+                        )
+                        current_step_sol.update_profile(
+                            {"event location": event_location_time}
+                        )
 
                     # assign temporary solve time
                     current_step_sol.solve_time = np.nan
+                    # only keep the output variables (if any) of the step
+                    self._store_output_variables(model, current_step_sol, inputs_dict)
                     # append solution from the current step to solution
                     if solution is None:
                         solution = current_step_sol
@@ -289,6 +364,8 @@ class CasadiSolver(pybamm.BaseSolver):
                 else:
                     # assign temporary solve time
                     current_step_sol.solve_time = np.nan
+                    # only keep the output variables (if any) of the step
+                    self._store_output_variables(model, current_step_sol, inputs_dict)
                     if solution is None:
                         solution = current_step_sol
                     else:
@@ -297,35 +374,383 @@ class CasadiSolver(pybamm.BaseSolver):
                     # update time
                     t = t_window[-1]
                     # update y0
-                    y0 = solution.y[:, -1]
+                    y0 = solution.last_y
+                    if y0S is not None:
+                        y0S = solution.last_sensitivities
             return solution
 
+    def _run_window(self, model, y0, y0S, inputs, inputs_dict, t_window):
+        """
+        Integrate the model over a window of "safe" mode from the state `y0`, along
+        with the sensitivities of the states from their sensitivities `y0S` at the
+        start of the window, if they are calculated
+
+        Parameters
+        ----------
+        model : :class:`pybamm.BaseModel`
+            The model whose solution to calculate.
+        y0 : :class:`numpy.array`
+            The state at the start of the window
+        y0S : :class:`numpy.array`
+            The sensitivities of the state at the start of the window, or None if
+            the sensitivities aren't calculated
+        inputs : :class:`casadi.DM`
+            The input parameters
+        inputs_dict : dict
+            The input parameters, by name
+        t_window : :class:`numpy.array`
+            The times at which to compute the solution
+        """
+        if y0S is not None:
+            return self._run_integrator_with_sensitivities(
+                model, inputs_dict, t_window, y0, y0S
+            )
+        if self.mode == "safe":
+            # update integrator with the grid
+            self.create_integrator(model, inputs, t_window)
+        return self._run_integrator(model, y0, inputs, t_window)
+
+    def _run_integrator_with_sensitivities(
+        self, model, inputs, t_eval, y0=None, y0S=None
+    ):
+        """
+        Integrate the model from the state `y0` over the grid `t_eval`, along with
+        the forward sensitivities of the states with respect to the inputs in
+        :attr:`model.calculate_sensitivities`, from their sensitivities `y0S`. The
+        sensitivities are found by differentiating the integrator with the grid, for
+        which CasADi integrates the forward sensitivity equations along with the
+        states. The function giving the states and their sensitivities is only
+        created once per model, inputs and (normalised) grid.
+
+        Parameters
+        ----------
+        model : :class:`pybamm.BaseModel`
+            The model whose solution to calculate.
+        inputs : dict
+            Any external variables or input parameters to pass to the model
+        t_eval : numeric type
+            The times at which to compute the solution
+        y0 : :class:`numpy.array`, optional
+            The initial state. Default is None, in which case `model.y0` is used.
+        y0S : :class:`numpy.array`, optional
+            The sensitivities of the initial state, with one row per state. Default
+            is None, in which case `model.y0S` is used.
+
+        Returns
+        -------
+        :class:`pybamm.Solution`
+            The solution, with its sensitivities in `solution.sensitivities["all"]`
+        """
+        integrator = self.create_integrator(
+            model, casadi.vertcat(*inputs.values()), t_eval
+        )
+        grid = (t_eval - t_eval[0]) / (t_eval[-1] - t_eval[0])
+        key = (
+            tuple((name, np.size(value)) for name, value in inputs.items()),
+            tuple(model.calculate_sensitivities),
+            tuple(np.round(grid, 12)),
+        )
+        sensitivity_functions = self.sensitivity_functions.setdefault(model, {})
+        # The integrator for this grid may have been re-created since the function
+        # was created
+        cached = sensitivity_functions.get(key)
+        if cached is None or cached[0] is not integrator:
+            timer = pybamm.Timer()
+            # Discard the oldest function if there are too many
+            if len(sensitivity_functions) >= self.max_grid_integrators:
+                del sensitivity_functions[next(iter(sensitivity_functions))]
+            input_symbols = [
+                casadi.MX.sym(name, np.size(value)) for name, value in inputs.items()
+            ]
+            p = casadi.vertcat(
+                *[
+                    symbol
+                    for name, symbol in zip(inputs, input_symbols)
+                    if name in model.calculate_sensitivities
+                ]
+            )
+            p_value = casadi.MX.sym("p_value", p.shape[0])
+            n_y = model.y0.shape[0]
+            y0_casadi = casadi.MX.sym("y0", n_y)
+            y0S_casadi = casadi.MX.sym("y0S", n_y, p.shape[0])
+            t_0 = casadi.MX.sym("t_0")
+            t_f = casadi.MX.sym("t_f")
+            len_rhs = model.concatenated_rhs.size
+            # Initial conditions of the differential states, to first order in p
+            x0 = y0_casadi[:len_rhs] + casadi.mtimes(
+                y0S_casadi[:len_rhs, :], p - p_value
+            )
+            sol = integrator(
+                x0=x0,
+                z0=y0_casadi[len_rhs:],
+                p=casadi.vertcat(*input_symbols, t_0, t_f),
+                **self.extra_options_call,
+            )
+            # Stack the states time by time
+            y = casadi.vec(casadi.vertcat(sol["xf"], sol["zf"]))
+            sensitivity_functions[key] = (
+                integrator,
+                casadi.Function(
+                    "sensitivities",
+                    input_symbols + [p_value, y0_casadi, y0S_casadi, t_0, t_f],
+                    [y, casadi.jacobian(y, p)],
+                ),
+            )
+            self._integrator_creation_time += timer.time()
+        sensitivity_function = sensitivity_functions[key][1]
+
+        p_value = casadi.vertcat(
+            *[inputs[name] for name in model.calculate_sensitivities]
+        )
+        try:
+            timer = pybamm.Timer()
+            y, sensitivities = sensitivity_function(
+                *inputs.values(),
+                p_value,
+                casadi.DM(model.y0 if y0 is None else y0),
+                model.y0S if y0S is None else y0S,
+                t_eval[0],
+                t_eval[-1],
+            )
+            integration_time = timer.time()
+        except RuntimeError as e:
+            raise pybamm.SolverError(e.args[0])
+        solution = pybamm.Solution(t_eval, y.full().reshape(len(t_eval), -1).T)
+        solution.sensitivities = {"all": sensitivities.full()}
+        solution.integration_time = integration_time
+        solution.update_profile(self._get_profile(integration_time, []))
+        return solution
+
+    def _locate_event(self, model, solution, init_event_signs, inputs):
+        """
+        Locate the earliest termination event in the solution over an integration
+        window, and truncate the solution at the event. The event time is found with
+        a CasADi (Newton) rootfinder on the event function evaluated at the end of an
+        integration from the last time point before the event, so that the event
+        state is given by the integrator (rather than by interpolation) and the
+        window doesn't need to be integrated again.
+
+        Parameters
+        ----------
+        model : :class:`pybamm.BaseModel`
+            The model whose solution to calculate.
+        solution : :class:`pybamm.Solution`
+            The solution over the integration window, in which an event has been
+            crossed
+        init_event_signs : :class:`numpy.array`
+            The signs of the events at the initial time
+        inputs : :class:`casadi.DM`
+            The input parameters
+
+        Returns
+        -------
+        solution : :class:`pybamm.Solution`
+            The solution up to the event
+        t_event : float
+            The time of the event
+        y_event : :class:`numpy.array`
+            The state at the time of the event
+        """
+        timer = pybamm.Timer()
+        n_t = len(solution.t)
+        len_rhs = model.concatenated_rhs.size
+        events = [event._function for event in model.terminate_events_eval]
+        # Find the first time point after which the sign of an event has changed
+        event_values = np.concatenate(
+            [
+                event.map(n_t)(
+                    solution.t[np.newaxis, :],
+                    solution.y,
+                    casadi.repmat(inputs, 1, n_t),
+                ).full()
+                for event in events
+            ]
+        )
+        crossed = np.sign(event_values) != np.reshape(init_event_signs, (-1, 1))
+        idx = max(np.argmax(crossed.any(axis=0)), 1)
+        t_start = solution.t[idx - 1]
+        t_end = solution.t[idx]
+        y_start = solution.y[:, idx - 1]
+
+        # Create (once per model) functions giving the value of each event, and the
+        # state, at the end of an integration from the start time
+        if model not in self.event_functions:
+            # (the integrator without a grid doesn't replace the model's current
+            # integrator)
+            current_integrator = self.integrators[model]
+            integrator = self.create_integrator(model, inputs)
+            self.integrators[model] = current_integrator
+            t_event = casadi.MX.sym("t_event")
+            y0 = casadi.MX.sym("y0", model.y0.shape[0])
+            p = casadi.MX.sym("p", inputs.shape[0])
+            t_0 = casadi.MX.sym("t_0")
+            sol = integrator(
+                x0=y0[:len_rhs], z0=y0[len_rhs:], p=casadi.vertcat(p, t_0, t_event)
+            )
+            y_event = casadi.vertcat(sol["xf"], sol["zf"])
+            self.event_functions[model] = [
+                casadi.Function(
+                    "event",
+                    [t_event, casadi.vertcat(y0, p, t_0)],
+                    [event(t_event, y_event, p), y_event],
+                )
+                for event in events
+            ]
+            self.event_rootfinders[model] = {}
+
+        # Find the time of each event that has been crossed
+        params = casadi.vertcat(y_start, inputs, t_start)
+        t_events = np.full(len(events), np.nan)
+        y_events = [None] * len(events)
+        for i in np.where(crossed[:, idx])[0]:
+            event_function = self.event_functions[model][i]
+            # Create the rootfinder for this event (once per model)
+            rootfinders = self.event_rootfinders[model]
+            if i not in rootfinders:
+                try:
+                    rootfinders[i] = casadi.rootfinder(
+                        "event_root", "newton", event_function
+                    )
+                except RuntimeError:
+                    # e.g. if the event doesn't depend on time or the state
+                    rootfinders[i] = None
+            # Initial guess from linear interpolation of the event values
+            e_start, e_end = event_values[i, idx - 1], event_values[i, idx]
+            t_guess = t_start + (t_end - t_start) * e_start / (e_start - e_end)
+            try:
+                if rootfinders[i] is None:
+                    raise RuntimeError("no rootfinder for this event")
+                t_root, y_root = rootfinders[i](t_guess, params)
+                t_root = float(t_root)
+                if not t_start <= t_root <= t_end:
+                    raise RuntimeError("event time is outside the window")
+            except RuntimeError:
+                # Fall back to a bracketed search if Newton's method fails
+                t_root = brentq(
+                    lambda t: float(event_function(t, params)[0]), t_start, t_end
+                )
+                y_root = event_function(t_root, params)[1]
+            t_events[i] = t_root
+            y_events[i] = y_root.full().flatten()
+
+        # t_event is the earliest event triggered
+        i_event = np.nanargmin(t_events)
+        t_event = t_events[i_event]
+        y_event = y_events[i_event]
+
+        # Keep the time points before the event, or the event itself if there are
+        # none after the start of the window
+        keep = solution.t < t_event
+        if keep.sum() == 1:
+            t_sol = np.array([solution.t[0], t_event])
+            y_sol = np.column_stack([solution.y[:, 0], y_event])
+        else:
+            t_sol = solution.t[keep]
+            y_sol = solution.y[:, keep]
+        truncated_solution = pybamm.Solution(t_sol, y_sol)
+        truncated_solution.integration_time = solution.integration_time
+        truncated_solution.update_profile(solution._solve_profile)
+        truncated_solution.update_profile({"event location": timer.time()})
+        return truncated_solution, t_event, y_event
+
+    def _integrate_batch(self, model, t_eval, y0_list, inputs_list):
+        """
+        Solve a DAE model for several sets of inputs at once. In "fast" mode (or if
+        the model has no events), the integrator with the grid is mapped over the
+        stacked initial conditions and inputs, so that the whole batch is integrated
+        in a single call. Otherwise each set of inputs is integrated in turn.
+
+        Parameters
+        ----------
+        model : :class:`pybamm.BaseModel`
+            The model whose solution to calculate.
+        t_eval : numeric type
+            The times at which to compute the solution
+        y0_list : list
+            The (consistent) initial conditions for each set of inputs
+        inputs_list : list of dict
+            Any external variables or input parameters to pass to the model, one
+            dictionary per solution
+        """
+        has_symbolic_inputs = any(
+            isinstance(v, casadi.MX) for inputs in inputs_list for v in inputs.values()
+        )
+        if has_symbolic_inputs or (self.mode != "fast" and model.events):
+            return super()._integrate_batch(model, t_eval, y0_list, inputs_list)
+
+        # convert inputs to casadi format
+        inputs_list = [
+            casadi.vertcat(*[x for x in inputs.values()]) for inputs in inputs_list
+        ]
+        n = len(inputs_list)
+
+        # Create an integrator with the grid, and map it over the batch
+        integrator = self.create_integrator(model, inputs_list[0], t_eval)
+        mapped = self.mapped_integrators.get(model)
+        if mapped is None or mapped[0] is not integrator or mapped[1] != n:
+            mapped = (integrator, n, integrator.map(n))
+            self.mapped_integrators[model] = mapped
+        batch_integrator = mapped[2]
+
+        len_rhs = model.concatenated_rhs.size
+        y0_stacked = casadi.horzcat(*[casadi.DM(y0) for y0 in y0_list])
+        inputs_stacked = casadi.horzcat(
+            *[casadi.vertcat(inputs, t_eval[0], t_eval[-1]) for inputs in inputs_list]
+        )
+        try:
+            timer = pybamm.Timer()
+            sol = batch_integrator(
+                x0=y0_stacked[:len_rhs, :],
+                z0=y0_stacked[len_rhs:, :],
+                p=inputs_stacked,
+                **self.extra_options_call,
+            )
+            integration_time = timer.time()
+        except RuntimeError as e:
+            # If it doesn't work raise error
+            raise pybamm.SolverError(e.args[0])
+
+        # Split the stacked outputs into one solution per set of inputs
+        y_stacked = np.concatenate([sol["xf"].full(), sol["zf"].full()])
+        solutions = []
+        # The statistics of the mapped integrator aren't available, so only the
+        # times are recorded, shared equally between the solutions
+        profile = self._get_profile(integration_time / n, [])
+        profile["integrator creation"] /= n
+        for y_sol in np.split(y_stacked, n, axis=1):
+            solution = pybamm.Solution(t_eval, y_sol)
+            solution.integration_time = integration_time / n
+            solution.update_profile(profile)
+            solution.termination = "final time"
+            solutions.append(solution)
+        return solutions
+
     def create_integrator(self, model, inputs, t_eval=None):
         """
         Method to create a casadi integrator object.
         If t_eval is provided, the integrator uses t_eval to make the grid.
         Otherwise, the integrator has grid [0,1].
+
+        The problem is only set up once per model, with time rescaled by the first
+        and last times of the integration interval (which are passed to the
+        integrator as parameters). Integrators with a grid are then created for the
+        grid normalised to [0, 1], and kept for each normalised grid, so that an
+        integrator is only created once for all the calls with the same grid shape
+        (e.g. the global steps of "safe" mode, or repeated steps of an experiment).
         """
         # Use grid if t_eval is given
         use_grid = not (t_eval is None)
-        # Only set up problem once
-        if model in self.integrators:
-            # If we're not using the grid, we don't need to change the integrator
-            if use_grid is False:
-                return self.integrators[model][0]
-            # Otherwise, create new integrator with an updated grid
-            # We don't need to update the grid if reusing the same t_eval
-            else:
-                method, problem, options = self.integrator_specs[model]
-                t_eval_old = options["grid"]
-                if np.array_equal(t_eval_old, t_eval):
-                    return self.integrators[model][0]
-                else:
-                    options["grid"] = t_eval
-                    integrator = casadi.integrator("F", method, problem, options)
-                    self.integrators[model] = (integrator, use_grid)
-                    return integrator
+        if use_grid:
+            # Normalise the grid, and round it for the key so that grids with the
+            # same shape share the same integrator
+            grid = (t_eval - t_eval[0]) / (t_eval[-1] - t_eval[0])
+            grid_key = tuple(np.round(grid, 12))
         else:
+            grid_key = None
+
+        timer = pybamm.Timer()
+        # Only set up problem once
+        if model not in self.integrator_specs:
             y0 = model.y0
             rhs = model.casadi_rhs
             algebraic = model.casadi_algebraic
@@ -351,20 +776,12 @@ class CasadiSolver(pybamm.BaseSolver):
             p = casadi.MX.sym("p", inputs.shape[0])
             y_diff = casadi.MX.sym("y_diff", rhs(0, y0, p).shape[0])
 
-            if use_grid is False:
-                # rescale time
-                t_min = casadi.MX.sym("t_min")
-                t_max = casadi.MX.sym("t_max")
-                t_scaled = t_min + (t_max - t_min) * t
-                # add time limits as inputs
-                p_with_tlims = casadi.vertcat(p, t_min, t_max)
-            else:
-                options.update({"grid": t_eval, "output_t0": True})
-                # Set dummy parameters for consistency with rescaled time
-                t_max = 1
-                t_min = 0
-                t_scaled = t
-                p_with_tlims = p
+            # rescale time
+            t_min = casadi.MX.sym("t_min")
+            t_max = casadi.MX.sym("t_max")
+            t_scaled = t_min + (t_max - t_min) * t
+            # add time limits as inputs
+            p_with_tlims = casadi.vertcat(p, t_min, t_max)
 
             problem = {"t": t, "x": y_diff, "p": p_with_tlims}
             if algebraic(0, y0, p).is_empty():
@@ -383,10 +800,52 @@ class CasadiSolver(pybamm.BaseSolver):
                         "alg": algebraic(t_scaled, y_full, p),
                     }
                 )
-            integrator = casadi.integrator("F", method, problem, options)
             self.integrator_specs[model] = method, problem, options
-            self.integrators[model] = (integrator, use_grid)
-            return integrator
+            self.grid_integrators[model] = {}
+
+        # Reuse the integrator with the same (normalised) grid, or create a new one
+        grid_integrators = self.grid_integrators[model]
+        if grid_key not in grid_integrators:
+            method, problem, options = self.integrator_specs[model]
+            if use_grid:
+                options = {**options, "grid": grid, "output_t0": True}
+            # Discard the oldest integrator if there are too many
+            if len(grid_integrators) >= self.max_grid_integrators:
+                del grid_integrators[next(iter(grid_integrators))]
+            grid_integrators[grid_key] = casadi.integrator(
+                "F", method, problem, options
+            )
+        integrator = grid_integrators[grid_key]
+        self.integrators[model] = (integrator, use_grid)
+        self._integrator_creation_time += timer.time()
+        return integrator
+
+    def _get_profile(self, integration_time, stats):
+        """
+        Create the profile of a call to the integrator, from the integration time,
+        the time taken to create integrators since the last call, and the
+        statistics of the integrator (a list of CasADi stats dictionaries, one per
+        call, which may be empty if the statistics aren't available). The times and
+        counts are summed over all the calls.
+        """
+        profile = {
+            "integrator creation": self._integrator_creation_time,
+            "integration": integration_time,
+        }
+        self._integrator_creation_time = 0
+        if not stats:
+            return profile
+        for name, key in [
+            ("integrator steps", "nsteps"),
+            ("rhs evaluations", "nfevals"),
+            ("jacobian evaluations", "n_call_jacF"),
+            ("linear solver setups", "nlinsetups"),
+            ("newton iterations", "nniters"),
+            ("error test failures", "netfails"),
+            ("nonlinear convergence failures", "nncfails"),
+        ]:
+            profile[name] = sum(int(call_stats.get(key, 0)) for call_stats in stats)
+        return profile
 
     def _run_integrator(self, model, y0, inputs, t_eval):
         integrator, use_grid = self.integrators[model]
@@ -397,14 +856,20 @@ class CasadiSolver(pybamm.BaseSolver):
             # Try solving
             if use_grid is True:
                 # Call the integrator once, with the grid
+                inputs_with_tlims = casadi.vertcat(inputs, t_eval[0], t_eval[-1])
                 timer = pybamm.Timer()
                 sol = integrator(
-                    x0=y0_diff, z0=y0_alg, p=inputs, **self.extra_options_call
+                    x0=y0_diff,
+                    z0=y0_alg,
+                    p=inputs_with_tlims,
+                    **self.extra_options_call,
                 )
                 integration_time = timer.time()
+                stats = [integrator.stats()]
                 y_sol = np.concatenate([sol["xf"].full(), sol["zf"].full()])
                 sol = pybamm.Solution(t_eval, y_sol)
                 sol.integration_time = integration_time
+                sol.update_profile(self._get_profile(integration_time, stats))
                 return sol
             else:
                 # Repeated calls to the integrator
@@ -412,6 +877,8 @@ class CasadiSolver(pybamm.BaseSolver):
                 z = y0_alg
                 y_diff = x
                 y_alg = z
+                integration_time = 0
+                stats = []
                 for i in range(len(t_eval) - 1):
                     t_min = t_eval[i]
                     t_max = t_eval[i + 1]
@@ -420,7 +887,10 @@ class CasadiSolver(pybamm.BaseSolver):
                     sol = integrator(
                         x0=x, z0=z, p=inputs_with_tlims, **self.extra_options_call
                     )
-                    integration_time = timer.time()
+                    integration_time += timer.time()
+                    # Statistics are only available for numerical calls
+                    if isinstance(sol["xf"], casadi.DM):
+                        stats.append(integrator.stats())
                     x = sol["xf"]
                     z = sol["zf"]
                     y_diff = casadi.horzcat(y_diff, x)
@@ -433,6 +903,7 @@ class CasadiSolver(pybamm.BaseSolver):
                     sol = pybamm.Solution(t_eval, y_sol)
 
                 sol.integration_time = integration_time
+                sol.update_profile(self._get_profile(integration_time, stats))
                 return sol
         except RuntimeError as e:
             # If it doesn't work raise error
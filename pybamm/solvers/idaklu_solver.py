@@ -4,7 +4,6 @@
 import casadi
 import pybamm
 import numpy as np
-import scipy.sparse as sparse
 
 import importlib
 
@@ -36,6 +35,14 @@ class IDAKLUSolver(pybamm.BaseSolver):
         specified by 'root_method' (e.g. "lm", "hybr", ...)
     root_tol : float, optional
         The tolerance for the initial-condition solver (default is 1e-8).
+    output_mode : str, optional
+        How the solution is found at the times in `t_eval`. Options are:
+
+        - "stop" (default): the integrator stops at each time, which limits its \
+        step size when the times are close together
+        - "interpolate": the integrator steps freely up to the final time, and the \
+        solution at each time is interpolated from the steps (with IDAGetDky). \
+        Discontinuities are still stopped at, as the solve is split at them.
     """
 
     def __init__(
@@ -45,17 +52,121 @@ class IDAKLUSolver(pybamm.BaseSolver):
         root_method="casadi",
         root_tol=1e-6,
         max_steps="deprecated",
+        output_mode="stop",
     ):
 
         if idaklu_spec is None:
             raise ImportError("KLU is not installed")
 
+        output_mode_options = ["stop", "interpolate"]
+        if output_mode not in output_mode_options:
+            raise ValueError(
+                "output_mode must be one of {}".format(output_mode_options)
+            )
+        self.output_mode = output_mode
+
         super().__init__("ida", rtol, atol, root_method, root_tol, max_steps)
         self.name = "IDA KLU solver"
+        self.supports_sensitivities = True
 
         pybamm.citations.register("hindmarsh2000pvode")
         pybamm.citations.register("hindmarsh2005sundials")
 
+    def set_up(self, model, inputs=None, t_eval=None):
+        """
+        Set up the model as :meth:`pybamm.BaseSolver.set_up` does, and, for models
+        converted to CasADi, pass the CasADi functions for the residuals, the
+        Jacobian of the residuals and the events to the compiled solver, so that they
+        are evaluated from C++ during the integration, without calling Python.
+        """
+        super().set_up(model, inputs, t_eval)
+        # Functions for the sensitivity equations, keyed by the names of the inputs
+        model.idaklu_sensitivity_functions = {}
+
+        if (
+            model.convert_to_format != "casadi"
+            or model.jac_residuals_eval is None
+            or not hasattr(idaklu, "solve_casadi")
+        ):
+            model.idaklu_functions = None
+            return
+
+        jac_res = model.jac_residuals_eval._function
+        t_casadi, y_casadi, cj_casadi, p_casadi = jac_res.mx_in()
+        # the nonzeros of the transpose of the Jacobian, in CSC format, are the
+        # nonzeros of the Jacobian in the CSR format of the KLU matrix
+        jac_times_cjmass = casadi.Function(
+            "jac_times_cjmass",
+            [t_casadi, y_casadi, cj_casadi, p_casadi],
+            [jac_res(t_casadi, y_casadi, cj_casadi, p_casadi).T],
+        )
+        colptrs, rowvals = jac_times_cjmass.sparsity_out(0).get_ccs()
+        events = casadi.Function(
+            "events",
+            [t_casadi, y_casadi, p_casadi],
+            [
+                casadi.vertcat(
+                    *[
+                        event._function(t_casadi, y_casadi, p_casadi)
+                        for event in model.terminate_events_eval
+                    ]
+                )
+            ],
+        )
+        model.idaklu_functions = {
+            "res": idaklu.generate_function(model.residuals_eval._function.serialize()),
+            "jac_times_cjmass": idaklu.generate_function(jac_times_cjmass.serialize()),
+            "jac_times_cjmass_colptrs": np.array(colptrs, dtype=np.int64),
+            "jac_times_cjmass_rowvals": np.array(rowvals, dtype=np.int64),
+            "jac_times_cjmass_nnz": len(rowvals),
+            "events": idaklu.generate_function(events.serialize()),
+        }
+
+    def _get_sensitivity_functions(self, model, inputs):
+        """
+        Create (once per set of inputs) the CasADi functions for the forward
+        sensitivity equations (dr/dy) s + (dr/dy') s' + dr/dp = 0 of the inputs in
+        :attr:`model.calculate_sensitivities`, which are solved by IDAS along with
+        the model: the product of the Jacobians with the sensitivities of one
+        input, and the derivative of the residuals with respect to the inputs.
+        """
+        names = tuple(model.calculate_sensitivities)
+        if names not in model.idaklu_sensitivity_functions:
+            # Position of each input in the stacked inputs
+            sizes = [np.size(value) for value in inputs.values()]
+            starts = dict(zip(inputs.keys(), np.cumsum([0] + sizes)))
+            p_indices = [
+                int(starts[name]) + i
+                for name in names
+                for i in range(np.size(inputs[name]))
+            ]
+
+            res = model.residuals_eval._function
+            t_casadi, y_casadi, ydot_casadi, p_casadi = res.mx_in()
+            r = res(t_casadi, y_casadi, ydot_casadi, p_casadi)
+            yS = casadi.MX.sym("yS", y_casadi.shape[0])
+            ydotS = casadi.MX.sym("ydotS", y_casadi.shape[0])
+            jvp = casadi.Function(
+                "sens_jvp",
+                [t_casadi, y_casadi, ydot_casadi, p_casadi, yS, ydotS],
+                [
+                    casadi.densify(
+                        casadi.jtimes(r, y_casadi, yS)
+                        + casadi.jtimes(r, ydot_casadi, ydotS)
+                    )
+                ],
+            )
+            res_p = casadi.Function(
+                "sens_res_p",
+                [t_casadi, y_casadi, ydot_casadi, p_casadi],
+                [casadi.densify(casadi.jacobian(r, p_casadi)[:, p_indices])],
+            )
+            model.idaklu_sensitivity_functions[names] = [
+                idaklu.generate_function(jvp.serialize()),
+                idaklu.generate_function(res_p.serialize()),
+            ]
+        return model.idaklu_sensitivity_functions[names]
+
     def set_atol_by_variable(self, variables_with_tols, model):
         """
         A method to set the absolute tolerances in the solver by state variable.
@@ -154,6 +265,7 @@ class IDAKLUSolver(pybamm.BaseSolver):
         t_eval : numeric type
             The times at which to compute the solution
         """
+        inputs_dict = inputs
         if model.rhs_eval.form == "casadi":
             # stack inputs
             inputs = casadi.vertcat(*[x for x in inputs.values()])
@@ -173,91 +285,128 @@ class IDAKLUSolver(pybamm.BaseSolver):
         rtol = self._rtol
         atol = self._check_atol_type(atol, y0.size)
 
-        mass_matrix = model.mass_matrix.entries
-
-        if model.jacobian_eval:
-            jac_y0_t0 = model.jacobian_eval(t_eval[0], y0, inputs)
-            if sparse.issparse(jac_y0_t0):
-
-                def jacfn(t, y, cj):
-                    j = model.jacobian_eval(t, y, inputs) - cj * mass_matrix
-                    return j
-
-            else:
-
-                def jacfn(t, y, cj):
-                    jac_eval = model.jacobian_eval(t, y, inputs) - cj * mass_matrix
-                    return sparse.csr_matrix(jac_eval)
-
-        class SundialsJacobian:
-            def __init__(self):
-                self.J = None
-
-                random = np.random.random(size=y0.size)
-                J = jacfn(10, random, 20)
-                self.nnz = J.nnz  # hoping nnz remains constant...
-
-            def jac_res(self, t, y, cj):
-                # must be of form j_res = (dr/dy) - (cj) (dr/dy')
-                # cj is just the input parameter
-                # see p68 of the ida_guide.pdf for more details
-                self.J = jacfn(t, y, cj)
-
-            def get_jac_data(self):
-                return self.J.data
-
-            def get_jac_row_vals(self):
-                return self.J.indices
-
-            def get_jac_col_ptrs(self):
-                return self.J.indptr
-
         # solver works with ydot0 set to zero
         ydot0 = np.zeros_like(y0)
 
-        jac_class = SundialsJacobian()
-
         num_of_events = len(model.terminate_events_eval)
-        use_jac = 1
-
-        def rootfn(t, y):
-            return_root = np.ones((num_of_events,))
-            return_root[:] = [
-                event(t, y, inputs) for event in model.terminate_events_eval
-            ]
-
-            return return_root
+        interpolate = self.output_mode == "interpolate"
 
         # get ids of rhs and algebraic variables
         rhs_ids = np.ones(model.rhs_eval(0, y0, inputs).shape)
         alg_ids = np.zeros(len(y0) - len(rhs_ids))
         ids = np.concatenate((rhs_ids, alg_ids))
 
-        # solve
-        timer = pybamm.Timer()
-        sol = idaklu.solve(
-            t_eval,
-            y0,
-            ydot0,
-            lambda t, y, ydot: model.residuals_eval(t, y, ydot, inputs),
-            jac_class.jac_res,
-            jac_class.get_jac_data,
-            jac_class.get_jac_row_vals,
-            jac_class.get_jac_col_ptrs,
-            jac_class.nnz,
-            rootfn,
-            num_of_events,
-            use_jac,
-            ids,
-            atol,
-            rtol,
-        )
+        if model.calculate_sensitivities:
+            if getattr(model, "idaklu_functions", None) is None:
+                raise pybamm.SolverError(
+                    "Sensitivities can only be calculated with the KLU solver when "
+                    "the CasADi functions are evaluated from C++"
+                )
+            # the sensitivities of the initial conditions are passed input by input
+            sensitivity_args = {
+                "sensitivities": self._get_sensitivity_functions(model, inputs_dict),
+                "number_of_parameters": model.y0S.shape[1],
+                "yS0": model.y0S.T.flatten(),
+            }
+        else:
+            sensitivity_args = {}
+
+        if getattr(model, "idaklu_functions", None) is not None:
+            # the CasADi functions are evaluated from C++
+            timer = pybamm.Timer()
+            sol = idaklu.solve_casadi(
+                t_eval,
+                y0,
+                ydot0,
+                number_of_events=num_of_events,
+                rhs_alg_id=ids,
+                atol=atol,
+                rtol=rtol,
+                inputs=np.array(inputs, dtype=float).flatten(),
+                interpolate=interpolate,
+                **sensitivity_args,
+                **model.idaklu_functions,
+            )
+        else:
+            jacobian = model.jac_residuals_eval
+
+            class SundialsJacobian:
+                def __init__(self):
+                    # the Jacobian is written into the same matrix at each call
+                    random = np.random.random(size=y0.size)
+                    self.J = jacobian.empty_jacobian(10, random, inputs)
+                    self.nnz = self.J.nnz  # hoping nnz remains constant...
+
+                def jac_res(self, t, y, cj):
+                    # must be of form j_res = (dr/dy) - (cj) (dr/dy')
+                    # cj is just the input parameter
+                    # see p68 of the ida_guide.pdf for more details
+                    jacobian(t, y, cj, inputs, out=self.J)
+
+                def get_jac_data(self):
+                    return self.J.data
+
+                def get_jac_row_vals(self):
+                    return self.J.indices
+
+                def get_jac_col_ptrs(self):
+                    return self.J.indptr
+
+            jac_class = SundialsJacobian()
+
+            use_jac = 1
+
+            def rootfn(t, y):
+                return_root = np.ones((num_of_events,))
+                return_root[:] = [
+                    event(t, y, inputs) for event in model.terminate_events_eval
+                ]
+
+                return return_root
+
+            # the residuals are written into the same array at each call
+            residuals = np.empty(y0.size)
+
+            # solve
+            timer = pybamm.Timer()
+            sol = idaklu.solve(
+                t_eval,
+                y0,
+                ydot0,
+                lambda t, y, ydot: model.residuals_eval(
+                    t, y, ydot, inputs, out=residuals
+                ),
+                jac_class.jac_res,
+                jac_class.get_jac_data,
+                jac_class.get_jac_row_vals,
+                jac_class.get_jac_col_ptrs,
+                jac_class.nnz,
+                rootfn,
+                num_of_events,
+                use_jac,
+                ids,
+                atol,
+                rtol,
+                interpolate,
+            )
         integration_time = timer.time()
 
         t = sol.t
         number_of_timesteps = t.size
         number_of_states = y0.size
         y_out = sol.y.reshape((number_of_timesteps, number_of_states))
+        yS_out = sol.yS
+        profile = {"integration": integration_time}
+        for name, key in [
+            ("integrator steps", "nsteps"),
+            ("rhs evaluations", "nrevals"),
+            ("jacobian evaluations", "njevals"),
+            ("linear solver setups", "nlinsetups"),
+            ("newton iterations", "nniters"),
+            ("error test failures", "netfails"),
+            ("nonlinear convergence failures", "nncfails"),
+        ]:
+            profile[name] = getattr(sol, key)
 
         # return solution, we need to tranpose y to match scipy's interface
         if sol.flag in [0, 2]:
@@ -276,6 +425,15 @@ class IDAKLUSolver(pybamm.BaseSolver):
                 termination,
             )
             sol.integration_time = integration_time
+            sol.update_profile(profile)
+            if sensitivity_args:
+                # sensitivities are returned time by time and input by input
+                n_p = sensitivity_args["number_of_parameters"]
+                sol.sensitivities = {
+                    "all": yS_out.reshape(number_of_timesteps, n_p, number_of_states)
+                    .transpose(0, 2, 1)
+                    .reshape(number_of_timesteps * number_of_states, n_p)
+                }
             return sol
         else:
             raise pybamm.SolverError(sol.message)
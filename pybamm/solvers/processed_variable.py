@@ -1,6 +1,7 @@
 #
 # Processed Variable class
 #
+import casadi
 import numbers
 import numpy as np
 import pybamm
@@ -46,10 +47,19 @@ class ProcessedVariable(object):
     warn : bool, optional
         Whether to raise warnings when trying to evaluate time and length scales.
         Default is True.
+    values : :class:`numpy.array`, size (m, n), optional
+        The flattened (column-major) values of the variable at each time of the
+        solution, if they have already been evaluated (e.g. during the solve, see
+        :attr:`pybamm.Solution.output_data`). If None (default), the variable is
+        evaluated from the solution.
     """
 
-    def __init__(self, base_variable, solution, known_evals=None, warn=True):
+    def __init__(
+        self, base_variable, solution, known_evals=None, warn=True, values=None
+    ):
         self.base_variable = base_variable
+        self.solution = solution
+        self.model = solution.model
         self.t_sol = solution.t
         self.u_sol = solution.y
         self.mesh = base_variable.mesh
@@ -58,6 +68,8 @@ class ProcessedVariable(object):
         self.auxiliary_domains = base_variable.auxiliary_domains
         self.known_evals = known_evals
         self.warn = warn
+        # Sensitivities with respect to the inputs, calculated when first accessed
+        self._sensitivities = None
 
         # Set timescale
         self.timescale = solution.timescale_eval
@@ -68,7 +80,10 @@ class ProcessedVariable(object):
             self.length_scales = solution.length_scales_eval
 
         # Evaluate base variable at initial time
-        if self.known_evals:
+        self._values = values
+        if values is not None:
+            self.base_eval = values[:, :1]
+        elif self.known_evals:
             self.base_eval, self.known_evals[solution.t[0]] = base_variable.evaluate(
                 solution.t[0],
                 solution.y[:, 0],
@@ -121,20 +136,119 @@ class ProcessedVariable(object):
                             + "(note processing of 3D variables is not yet implemented)"
                         )
 
-    def initialise_0D(self):
-        # initialise empty array of the correct size
-        entries = np.empty(len(self.t_sol))
-        # Evaluate the base_variable index-by-index
+    def evaluate_all_times(self):
+        """
+        Evaluate the base variable at all the times in the solution. The variable is
+        compiled once into a CasADi function of (t, y, inputs) and evaluated on the
+        whole solution in a single (mapped) call. If the variable can't be converted
+        to CasADi, it is evaluated time point by time point instead.
+
+        Returns
+        -------
+        :class:`numpy.array`, size (m, n)
+            The flattened (column-major) values of the variable at each time
+        """
+        if self._values is not None:
+            return self._values
+        entries = self._evaluate_all_times_casadi()
+        if entries is None:
+            entries = self._evaluate_each_time()
+        return entries
+
+    def _evaluate_all_times_casadi(self):
+        """
+        Evaluate the base variable at all times with a compiled CasADi function, or
+        return None if the variable (or its inputs) can't be converted to CasADi
+        """
+        # Symbolic inputs are handled by ProcessedSymbolicVariable
+        if any(not isinstance(inp, np.ndarray) for inp in self.inputs.values()):
+            return None
+        n_t = len(self.t_sol)
+        n_y = self.u_sol.shape[0]
+
+        # Only pass the rows of y and the inputs that the variable reads
+        if hasattr(self.model, "get_variable_dependencies"):
+            y_slices, input_names = self.model.get_variable_dependencies(
+                self.base_variable
+            )
+        else:
+            y_slices, input_names = pybamm.find_dependencies(self.base_variable)
+        inputs = {name: inp for name, inp in self.inputs.items() if name in input_names}
+        input_sizes = tuple((name, inp.shape[0]) for name, inp in inputs.items())
+
+        # Compile the variable once per model, and reuse it for other solutions
+        key = (self.base_variable.id, n_y, input_sizes)
+        variables_casadi = getattr(self.model, "variables_casadi", {})
+        if key not in variables_casadi:
+            t_casadi = casadi.MX.sym("t")
+            n_rows = sum(y_slice.stop - y_slice.start for y_slice in y_slices)
+            y_casadi = casadi.MX.sym("y", n_rows)
+            # Place the rows read by the variable in a state vector of the full size
+            y_pieces = []
+            start = 0
+            row = 0
+            for y_slice in y_slices:
+                if y_slice.start > start:
+                    y_pieces.append(casadi.MX.zeros(y_slice.start - start))
+                size = y_slice.stop - y_slice.start
+                y_pieces.append(y_casadi[row : row + size])
+                start = y_slice.stop
+                row += size
+            if n_y > start:
+                y_pieces.append(casadi.MX.zeros(n_y - start))
+            p_casadi = {name: casadi.MX.sym(name, size) for name, size in input_sizes}
+            p_casadi_stacked = casadi.vertcat(*p_casadi.values())
+            try:
+                var_casadi = self.base_variable.to_casadi(
+                    t_casadi, casadi.vertcat(*y_pieces), inputs=p_casadi
+                )
+            except (NotImplementedError, TypeError, ValueError, KeyError) as e:
+                # e.g. symbols that can't be converted, or external variables
+                pybamm.logger.warning(
+                    "Cannot convert '{}' to CasADi ({}), evaluating it time by "
+                    "time instead".format(self.base_variable.name, e)
+                )
+                return None
+            variables_casadi[key] = casadi.Function(
+                "variable", [t_casadi, y_casadi, p_casadi_stacked], [var_casadi]
+            )
+        # Mapping is cheap (about as long as one evaluation), so the mapped function
+        # isn't kept: keeping one per number of time points would grow without bound
+        casadi_fun_mapped = variables_casadi[key].map(n_t)
+
+        # Evaluate at all times at once (the states of a stored solution, see
+        # pybamm.SolutionStore, are only read row by row, and not kept in memory)
+        if y_slices == (slice(0, n_y),) and isinstance(self.u_sol, np.ndarray):
+            y_sol = self.solution.y_casadi
+        else:
+            # (the empty slice allows for variables that don't depend on y)
+            y_sol = self.u_sol[np.r_[(slice(0, 0),) + y_slices], :]
+        inputs_stacked = np.vstack(
+            [np.reshape(inp, (inp.shape[0], -1)) for inp in inputs.values()]
+            or [np.zeros((0, n_t))]
+        )
+        entries = casadi_fun_mapped(self.t_sol[np.newaxis, :], y_sol, inputs_stacked)
+        return entries.full()
+
+    def _evaluate_each_time(self):
+        "Evaluate the base variable index-by-index, using any known evaluations"
+        entries = np.empty((np.size(self.base_eval), len(self.t_sol)))
         for idx in range(len(self.t_sol)):
             t = self.t_sol[idx]
             u = self.u_sol[:, idx]
             inputs = {name: inp[:, idx] for name, inp in self.inputs.items()}
             if self.known_evals:
-                entries[idx], self.known_evals[t] = self.base_variable.evaluate(
+                entry, self.known_evals[t] = self.base_variable.evaluate(
                     t, u, inputs=inputs, known_evals=self.known_evals[t]
                 )
             else:
-                entries[idx] = self.base_variable.evaluate(t, u, inputs=inputs)
+                entry = self.base_variable.evaluate(t, u, inputs=inputs)
+            entries[:, idx] = np.reshape(entry, -1, order="F")
+        return entries
+
+    def initialise_0D(self):
+        # Evaluate the base_variable at all times
+        entries = self.evaluate_all_times()[0]
 
         # set up interpolation
         if len(self.t_sol) == 1:
@@ -157,22 +271,8 @@ class ProcessedVariable(object):
         self.dimensions = 0
 
     def initialise_1D(self, fixed_t=False):
-        len_space = self.base_eval.shape[0]
-        entries = np.empty((len_space, len(self.t_sol)))
-
-        # Evaluate the base_variable index-by-index
-        for idx in range(len(self.t_sol)):
-            t = self.t_sol[idx]
-            u = self.u_sol[:, idx]
-            inputs = {name: inp[:, idx] for name, inp in self.inputs.items()}
-            if self.known_evals:
-                eval_and_known_evals = self.base_variable.evaluate(
-                    t, u, inputs=inputs, known_evals=self.known_evals[t]
-                )
-                entries[:, idx] = eval_and_known_evals[0][:, 0]
-                self.known_evals[t] = eval_and_known_evals[1]
-            else:
-                entries[:, idx] = self.base_variable.evaluate(t, u, inputs=inputs)[:, 0]
+        # Evaluate the base_variable at all times
+        entries = self.evaluate_all_times()
 
         # Get node and edge values
         nodes = self.mesh.nodes
@@ -268,29 +368,13 @@ class ProcessedVariable(object):
         second_dim_pts = second_dim_nodes
         first_dim_size = len(first_dim_pts)
         second_dim_size = len(second_dim_pts)
-        entries = np.empty((first_dim_size, second_dim_size, len(self.t_sol)))
 
-        # Evaluate the base_variable index-by-index
-        for idx in range(len(self.t_sol)):
-            t = self.t_sol[idx]
-            u = self.u_sol[:, idx]
-            inputs = {name: inp[:, idx] for name, inp in self.inputs.items()}
-            if self.known_evals:
-                eval_and_known_evals = self.base_variable.evaluate(
-                    t, u, inputs=inputs, known_evals=self.known_evals[t]
-                )
-                entries[:, :, idx] = np.reshape(
-                    eval_and_known_evals[0],
-                    [first_dim_size, second_dim_size],
-                    order="F",
-                )
-                self.known_evals[t] = eval_and_known_evals[1]
-            else:
-                entries[:, :, idx] = np.reshape(
-                    self.base_variable.evaluate(t, u, inputs=inputs),
-                    [first_dim_size, second_dim_size],
-                    order="F",
-                )
+        # Evaluate the base_variable at all times
+        entries = np.reshape(
+            self.evaluate_all_times(),
+            [first_dim_size, second_dim_size, len(self.t_sol)],
+            order="F",
+        )
 
         # add points outside first dimension domain for extrapolation to
         # boundaries
@@ -419,28 +503,11 @@ class ProcessedVariable(object):
         len_y = len(y_sol)
         z_sol = self.mesh.edges["z"]
         len_z = len(z_sol)
-        entries = np.empty((len_y, len_z, len(self.t_sol)))
 
-        # Evaluate the base_variable index-by-index
-        for idx in range(len(self.t_sol)):
-            t = self.t_sol[idx]
-            u = self.u_sol[:, idx]
-            inputs = {name: inp[:, idx] for name, inp in self.inputs.items()}
-
-            if self.known_evals:
-                eval_and_known_evals = self.base_variable.evaluate(
-                    t, u, inputs=inputs, known_evals=self.known_evals[t]
-                )
-                entries[:, :, idx] = np.reshape(
-                    eval_and_known_evals[0], [len_y, len_z], order="F"
-                )
-                self.known_evals[t] = eval_and_known_evals[1]
-            else:
-                entries[:, :, idx] = np.reshape(
-                    self.base_variable.evaluate(t, u, inputs=inputs),
-                    [len_y, len_z],
-                    order="F",
-                )
+        # Evaluate the base_variable at all times
+        entries = np.reshape(
+            self.evaluate_all_times(), [len_y, len_z, len(self.t_sol)], order="F"
+        )
 
         # assign attributes for reference
         self.entries = entries
@@ -554,6 +621,80 @@ class ProcessedVariable(object):
         "Same as entries, but different name"
         return self.entries
 
+    @property
+    def sensitivities(self):
+        """
+        Dictionary of the sensitivities of the variable with respect to each input
+        for which the sensitivities of the solution were calculated (see
+        :attr:`pybamm.Solution.sensitivities`), at the times of the solution. Each
+        value is an array with one row per (flattened) entry of the variable,
+        stacked time by time, and one column per entry of the input. Empty if the
+        sensitivities of the solution weren't calculated.
+        """
+        if self._sensitivities is None:
+            if self.solution.sensitivities:
+                self._sensitivities = self._calculate_sensitivities()
+            else:
+                self._sensitivities = {}
+        return self._sensitivities
+
+    def _calculate_sensitivities(self):
+        """
+        Calculate the sensitivities of the variable by the chain rule,
+        dvar/dp = dvar/dy * dy/dp + dvar/dp, from the sensitivities of the solution,
+        with a CasADi function of the variable mapped over the times of the solution
+        """
+        names = [name for name in self.solution.sensitivities if name != "all"]
+        sensitivities_all = self.solution.sensitivities["all"]
+        n_t = len(self.t_sol)
+        n_y = self.u_sol.shape[0]
+        n_p = sensitivities_all.shape[1]
+
+        t_casadi = casadi.MX.sym("t")
+        y_casadi = casadi.MX.sym("y", n_y)
+        p_casadi = {
+            name: casadi.MX.sym(name, inp.shape[0]) for name, inp in self.inputs.items()
+        }
+        p_casadi_stacked = casadi.vertcat(*p_casadi.values())
+        p_sens = casadi.vertcat(*[p_casadi[name] for name in names])
+        dy_dp = casadi.MX.sym("dy_dp", n_y, n_p)
+        var_casadi = self.base_variable.to_casadi(t_casadi, y_casadi, inputs=p_casadi)
+        dvar_dp = casadi.mtimes(
+            casadi.jacobian(var_casadi, y_casadi), dy_dp
+        ) + casadi.jacobian(var_casadi, p_sens)
+        dvar_dp_fun = casadi.Function(
+            "dvar_dp", [t_casadi, y_casadi, p_casadi_stacked, dy_dp], [dvar_dp]
+        ).map(n_t)
+
+        # The mapped function takes the sensitivities at each time side by side
+        dy_dp_stacked = (
+            sensitivities_all.reshape(n_t, n_y, n_p)
+            .transpose(1, 0, 2)
+            .reshape(n_y, n_t * n_p)
+        )
+        inputs_stacked = np.vstack(
+            [np.reshape(inp, (inp.shape[0], -1)) for inp in self.inputs.values()]
+            or [np.zeros((0, n_t))]
+        )
+        dvar_dp_eval = dvar_dp_fun(
+            self.t_sol[np.newaxis, :], self.u_sol, inputs_stacked, dy_dp_stacked
+        ).full()
+        n_var = dvar_dp_eval.shape[0]
+        dvar_dp_eval = (
+            dvar_dp_eval.reshape(n_var, n_t, n_p)
+            .transpose(1, 0, 2)
+            .reshape(n_t * n_var, n_p)
+        )
+
+        # Split by input parameter
+        sensitivities = {"all": dvar_dp_eval}
+        start = 0
+        for name in names:
+            size = self.solution.sensitivities[name].shape[1]
+            sensitivities[name] = dvar_dp_eval[:, start : start + size]
+            start += size
+        return sensitivities
+
 
 def eval_dimension_name(name, x, r, y, z):
     if name == "x":
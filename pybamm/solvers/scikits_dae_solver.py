@@ -6,7 +6,6 @@ import pybamm
 
 import numpy as np
 import importlib
-import scipy.sparse as sparse
 
 scikits_odes_spec = importlib.util.find_spec("scikits")
 if scikits_odes_spec is not None:
@@ -90,11 +89,11 @@ class ScikitsDaeSolver(pybamm.BaseSolver):
 
         residuals = model.residuals_eval
         events = model.terminate_events_eval
-        jacobian = model.jacobian_eval
-        mass_matrix = model.mass_matrix.entries
+        jacobian = model.jac_residuals_eval
 
         def eqsres(t, y, ydot, return_residuals):
-            return_residuals[:] = residuals(t, y, ydot, inputs)
+            # write directly into the solver's memory
+            residuals(t, y, ydot, inputs, out=return_residuals)
 
         def rootfn(t, y, ydot, return_root):
             return_root[:] = [event(t, y, inputs) for event in events]
@@ -107,18 +106,9 @@ class ScikitsDaeSolver(pybamm.BaseSolver):
         }
 
         if jacobian:
-            jac_y0_t0 = jacobian(t_eval[0], y0, inputs)
-            if sparse.issparse(jac_y0_t0):
 
-                def jacfn(t, y, ydot, residuals, cj, J):
-                    jac_eval = jacobian(t, y, inputs) - cj * mass_matrix
-                    J[:][:] = jac_eval.toarray()
-
-            else:
-
-                def jacfn(t, y, ydot, residuals, cj, J):
-                    jac_eval = jacobian(t, y, inputs) - cj * mass_matrix
-                    J[:][:] = jac_eval
+            def jacfn(t, y, ydot, residuals, cj, J):
+                jacobian(t, y, cj, inputs, out=J)
 
             extra_options.update({"jacfn": jacfn})
 
@@ -154,6 +144,19 @@ class ScikitsDaeSolver(pybamm.BaseSolver):
                 termination,
             )
             sol.integration_time = integration_time
+            info = dae_solver.get_info()
+            profile = {"integration": integration_time}
+            for name, key in [
+                ("integrator steps", "NumSteps"),
+                ("rhs evaluations", "NumResEvals"),
+                ("jacobian evaluations", "NumJacEvals"),
+                ("linear solver setups", "NumLinSolvSetups"),
+                ("newton iterations", "NumNonlinSolvIters"),
+                ("error test failures", "NumErrTestFails"),
+                ("nonlinear convergence failures", "NumNonlinSolvConvFails"),
+            ]:
+                profile[name] = int(info.get(key, 0))
+            sol.update_profile(profile)
             return sol
         else:
             raise pybamm.SolverError(sol.message)
@@ -92,27 +92,26 @@ class ScikitsOdeSolver(pybamm.BaseSolver):
         jacobian = model.jacobian_eval
 
         def eqsydot(t, y, return_ydot):
-            return_ydot[:] = derivs(t, y, inputs)
+            # write directly into the solver's memory
+            derivs(t, y, inputs, out=return_ydot)
 
         def rootfn(t, y, return_root):
             return_root[:] = [event(t, y, inputs) for event in events]
 
         if jacobian:
+
+            def jacfn(t, y, fy, J):
+                jacobian(t, y, inputs, out=J)
+
             jac_y0_t0 = jacobian(t_eval[0], y0, inputs)
             if sparse.issparse(jac_y0_t0):
 
-                def jacfn(t, y, fy, J):
-                    J[:][:] = jacobian(t, y, inputs).toarray()
-
                 def jac_times_vecfn(v, Jv, t, y, userdata):
                     Jv[:] = userdata._jac_eval * v
                     return 0
 
             else:
 
-                def jacfn(t, y, fy, J):
-                    J[:][:] = jacobian(t, y, inputs)
-
                 def jac_times_vecfn(v, Jv, t, y, userdata):
                     Jv[:] = np.matmul(userdata._jac_eval, v)
                     return 0
@@ -171,6 +170,19 @@ class ScikitsOdeSolver(pybamm.BaseSolver):
                 termination,
             )
             sol.integration_time = integration_time
+            info = ode_solver.get_info()
+            profile = {"integration": integration_time}
+            for name, key in [
+                ("integrator steps", "NumSteps"),
+                ("rhs evaluations", "NumRhsEvals"),
+                ("jacobian evaluations", "NumJacEvals"),
+                ("linear solver setups", "NumLinSolvSetups"),
+                ("newton iterations", "NumNonlinSolvIters"),
+                ("error test failures", "NumErrTestFails"),
+                ("nonlinear convergence failures", "NumNonlinSolvConvFails"),
+            ]:
+                profile[name] = int(info.get(key, 0))
+            sol.update_profile(profile)
             return sol
         else:
             raise pybamm.SolverError(sol.message)
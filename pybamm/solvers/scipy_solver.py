@@ -109,8 +109,14 @@ class ScipySolver(pybamm.BaseSolver):
                 termination = "final time"
                 t_event = None
                 y_event = np.array(None)
+            profile = {
+                "integration": integration_time,
+                "rhs evaluations": sol.nfev,
+                "jacobian evaluations": sol.njev,
+            }
             sol = pybamm.Solution(sol.t, sol.y, t_event, y_event, termination)
             sol.integration_time = integration_time
+            sol.update_profile(profile)
             return sol
         else:
             raise pybamm.SolverError(sol.message)
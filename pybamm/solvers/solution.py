@@ -42,11 +42,21 @@ class _BaseSolution(object):
     ):
         self._t = t
         if isinstance(y, casadi.DM):
+            self._y_casadi = y
             y = y.full()
+        else:
+            self._y_casadi = None
         self._y = y
+        # Chunks of (t, y, inputs, output data, sensitivities) appended since the
+        # arrays were last concatenated
+        self._chunks = []
         self._t_event = t_event
         self._y_event = y_event
         self._termination = termination
+        # Sensitivities of y with respect to the inputs, see `sensitivities`
+        self._sensitivities = {}
+        # Values of the output variables, if only these are stored, see `output_data`
+        self._output_data = None
         if copy_this is None:
             # initialize empty inputs and model, to be populated later
             self._inputs = pybamm.FuzzyDict()
@@ -54,6 +64,7 @@ class _BaseSolution(object):
             self.set_up_time = None
             self.solve_time = None
             self.integration_time = None
+            self._solve_profile = {}
             self.has_symbolic_inputs = False
         else:
             self._inputs = copy.copy(copy_this.inputs)
@@ -61,11 +72,16 @@ class _BaseSolution(object):
             self.set_up_time = copy_this.set_up_time
             self.solve_time = copy_this.solve_time
             self.integration_time = copy_this.integration_time
+            self._solve_profile = dict(copy_this._solve_profile)
             self.has_symbolic_inputs = copy_this.has_symbolic_inputs
+            if copy_this.output_data is not None:
+                self._output_data = dict(copy_this.output_data)
 
         # initiaize empty variables and data
         self._variables = pybamm.FuzzyDict()
-        self.data = pybamm.FuzzyDict()
+        self._data = pybamm.FuzzyDict()
+        # names of variables that must be re-processed before they are next used
+        self._stale_variables = set()
 
         # initialize empty known evals
         self._known_evals = defaultdict(dict)
@@ -75,13 +91,102 @@ class _BaseSolution(object):
     @property
     def t(self):
         "Times at which the solution is evaluated"
+        self._concatenate_chunks()
         return self._t
 
     @property
     def y(self):
-        "Values of the solution"
+        """
+        Values of the solution. If the solution only stores the output variables
+        (see :attr:`output_data`), only the final state is kept, as a single column.
+        """
+        self._concatenate_chunks()
         return self._y
 
+    @property
+    def last_t(self):
+        """
+        Final time of the solution. Unlike `t[-1]`, this doesn't concatenate the
+        solutions appended since `t` was last accessed, so it can be read after each
+        append (e.g. when stepping) at no cost.
+        """
+        for t_chunk, *_ in reversed(self._chunks):
+            if len(t_chunk) > 0:
+                return t_chunk[-1]
+        return self._t[-1]
+
+    @property
+    def last_y(self):
+        """
+        Final state of the solution. Unlike `y[:, -1]`, this doesn't concatenate the
+        solutions appended since `y` was last accessed.
+        """
+        for _, y_chunk, *_ in reversed(self._chunks):
+            if y_chunk.shape[1] > 0:
+                return y_chunk[:, -1]
+        return self._y[:, -1]
+
+    @property
+    def output_data(self):
+        """
+        Dictionary of the values of the output variables at each time (flattened,
+        one column per time), if the solution only stores these variables (see the
+        `output_variables` argument of :meth:`pybamm.BaseSolver.solve`), or None
+        otherwise. Only these variables can then be processed from the solution.
+        """
+        self._concatenate_chunks()
+        return self._output_data
+
+    def _set_output_data(self, output_data):
+        """
+        Store the values of the output variables at each time, and discard the
+        states at all times but the final one
+        """
+        self._concatenate_chunks()
+        self._output_data = output_data
+        self._y = self._y[:, -1:]
+        self._y_casadi = None
+
+    @property
+    def y_casadi(self):
+        "Values of the solution, as a CasADi matrix (used for post-processing)"
+        self._concatenate_chunks()
+        if self._y_casadi is None:
+            self._y_casadi = casadi.DM(np.asarray(self._y))
+        return self._y_casadi
+
+    @property
+    def sensitivities(self):
+        """
+        Dictionary of the (forward) sensitivities of y with respect to each input
+        parameter for which they were calculated (see :meth:`pybamm.BaseSolver.solve`).
+        Each value is an array with one row per entry of y, stacked time by time
+        (i.e. in the order of `y.T.flatten()`), and one column per entry of the input.
+        The key "all" gives the sensitivities with respect to all these inputs at
+        once. Empty if no sensitivities were calculated.
+        """
+        self._concatenate_chunks()
+        return self._sensitivities
+
+    @sensitivities.setter
+    def sensitivities(self, value):
+        self._concatenate_chunks()
+        self._sensitivities = value
+
+    @property
+    def last_sensitivities(self):
+        """
+        Sensitivities of the final state of the solution with respect to all the
+        inputs for which they were calculated (i.e. the last rows of
+        `sensitivities["all"]`). Like :attr:`last_y`, this doesn't concatenate the
+        solutions appended since the sensitivities were last accessed.
+        """
+        n_y = self._y.shape[0]
+        for *_, sensitivities_chunk in reversed(self._chunks):
+            if sensitivities_chunk and len(sensitivities_chunk["all"]) > 0:
+                return sensitivities_chunk["all"][-n_y:]
+        return self._sensitivities["all"][-n_y:]
+
     @property
     def model(self):
         "Model used for solution"
@@ -110,6 +215,7 @@ class _BaseSolution(object):
     @property
     def inputs(self):
         "Values of the inputs"
+        self._concatenate_chunks()
         return self._inputs
 
     @inputs.setter
@@ -166,6 +272,71 @@ class _BaseSolution(object):
     def total_time(self):
         return self.set_up_time + self.solve_time
 
+    @property
+    def profile(self):
+        """
+        Time (in seconds) taken by each stage of processing, setting up and solving
+        the model, and statistics of the integrator (number of steps, right-hand side
+        evaluations, etc.). The stages of processing and setting up the model are
+        taken from the model's `profile`, and the stages of solving are summed over
+        all the solutions that have been appended to this one.
+        """
+        return {**self.model.profile, **self._solve_profile}
+
+    def update_profile(self, profile):
+        "Add the times and counts in a dictionary to the profile of the solve"
+        for key, value in profile.items():
+            self._solve_profile[key] = self._solve_profile.get(key, 0) + value
+
+    @property
+    def data(self):
+        "Dictionary of the data of the variables that have been processed so far"
+        self._update_stale_variables()
+        return self._data
+
+    def _concatenate_chunks(self):
+        """
+        Concatenate the chunks of times, states and inputs that have been appended
+        since the last access. Appending is then amortised O(1), with the cost of
+        concatenating paid once, when the arrays are next needed.
+        """
+        if not self._chunks:
+            return
+        t_chunks, y_chunks, inputs_chunks, output_chunks, sensitivities_chunks = zip(
+            *self._chunks
+        )
+        self._chunks = []
+        self._t = np.concatenate((self._t,) + t_chunks)
+        if self._output_data is None:
+            self._y = np.concatenate((self._y,) + y_chunks, axis=1)
+        else:
+            # only the final state is kept
+            self._y = y_chunks[-1]
+            self._output_data = {
+                name: np.concatenate(
+                    [data] + [outputs[name] for outputs in output_chunks], axis=1
+                )
+                for name, data in self._output_data.items()
+            }
+        self._y_casadi = None
+        for name, inp in self._inputs.items():
+            self._inputs[name] = np.concatenate(
+                [inp] + [inputs[name] for inputs in inputs_chunks], axis=1
+            )
+        self._sensitivities = {
+            name: np.concatenate(
+                [sens] + [sensitivities[name] for sensitivities in sensitivities_chunks]
+            )
+            for name, sens in self._sensitivities.items()
+        }
+
+    def _update_stale_variables(self):
+        "Re-process any variables that have been invalidated by appending"
+        if self._stale_variables:
+            stale_variables = list(self._stale_variables)
+            self._stale_variables = set()
+            self.update(stale_variables)
+
     def update(self, variables):
         """Add ProcessedVariables to the dictionary of variables in the solution"""
         # Convert single entry to list
@@ -174,9 +345,20 @@ class _BaseSolution(object):
         # Process
         for key in variables:
             pybamm.logger.debug("Post-processing {}".format(key))
+            # If only the output variables are stored, use their stored values
+            if self.output_data is not None:
+                if key not in self.output_data:
+                    raise KeyError(
+                        "'{}' is not stored in the solution, which only stores the "
+                        "output variables {}".format(key, list(self.output_data))
+                    )
+                var = pybamm.ProcessedVariable(
+                    self.model.variables[key], self, values=self.output_data[key]
+                )
+
             # If there are symbolic inputs then we need to make a
             # ProcessedSymbolicVariable
-            if self.has_symbolic_inputs is True:
+            elif self.has_symbolic_inputs is True:
                 var = pybamm.ProcessedSymbolicVariable(self.model.variables[key], self)
 
             # Otherwise a standard ProcessedVariable is ok
@@ -191,7 +373,8 @@ class _BaseSolution(object):
 
             # Save variable and data
             self._variables[key] = var
-            self.data[key] = var.data
+            self._data[key] = var.data
+            self._stale_variables.discard(key)
 
     def __getitem__(self, key):
         """Read a variable from the solution. Variables are created 'just in time', i.e.
@@ -209,8 +392,8 @@ class _BaseSolution(object):
             underlying data for this variable is available in its attribute ".data"
         """
 
-        # return it if it exists
-        if key in self._variables:
+        # return it if it exists and is up to date
+        if key in self._variables and key not in self._stale_variables:
             return self._variables[key]
         else:
             # otherwise create it, save it and then return it
@@ -234,12 +417,65 @@ class _BaseSolution(object):
         """
         return pybamm.dynamic_plot(self, output_variables=output_variables, **kwargs)
 
-    def save(self, filename):
-        """Save the whole solution using pickle"""
+    def save(self, filename, variables=None):
+        """
+        Save the whole solution using pickle
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file to save the solution to
+        variables : list, optional
+            Names of the variables that will be processed from the loaded solution. If
+            given, only the rows of y that these variables depend on (see
+            :meth:`pybamm.BaseModel.get_variable_dependencies`) are saved, and the
+            other rows are NaN once the solution is loaded. Processed variables and
+            sub-solutions are then not saved. If None (default), saves all of y.
+        """
         # No warning here if len(self.data)==0 as solution can be loaded
         # and used to process new variables
+        if variables is None:
+            solution = self
+        else:
+            solution = self._copy_with_rows_for(variables)
         with open(filename, "wb") as f:
-            pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(solution, f, pickle.HIGHEST_PROTOCOL)
+
+    def _copy_with_rows_for(self, variables):
+        """
+        Shallow copy of the solution keeping only the rows of y needed to process
+        `variables`, for saving. The full y is restored, with NaN in the other rows,
+        when the copy is unpickled.
+        """
+        if isinstance(variables, str):
+            variables = [variables]
+        y_slices, _ = self.model.get_variable_dependencies(variables)
+        # (the empty slice allows for variables that don't depend on y)
+        rows = np.r_[(slice(0, 0),) + y_slices]
+        solution = copy.copy(self)
+        solution._t = self.t
+        solution._y = self.y[rows]
+        solution._y_rows = (rows, self.y.shape[0])
+        solution._y_casadi = None
+        solution._chunks = []
+        solution._inputs = copy.copy(self.inputs)
+        solution._variables = pybamm.FuzzyDict()
+        solution._data = pybamm.FuzzyDict()
+        solution._stale_variables = set()
+        solution._known_evals = defaultdict(dict)
+        solution._sensitivities = {}
+        solution.__dict__.pop("_sub_solutions", None)
+        return solution
+
+    def __setstate__(self, state):
+        "Restore the full y of a solution saved with only some of its rows"
+        y_rows = state.pop("_y_rows", None)
+        if y_rows is not None:
+            rows, n_y = y_rows
+            y = np.full((n_y, state["_y"].shape[1]), np.nan)
+            y[rows] = state["_y"]
+            state["_y"] = y
+        self.__dict__.update(state)
 
     def save_data(self, filename, variables=None, to_format="pickle", short_names=None):
         """
@@ -390,15 +626,36 @@ class Solution(_BaseSolution):
         # (Create and) update sub-solutions
         # Create a list of sub-solutions, which are simpler BaseSolution classes
 
-        # Update t, y and inputs
-        self._t = np.concatenate((self._t, solution.t[start_index:]))
-        self._y = np.concatenate((self._y, solution.y[:, start_index:]), axis=1)
-        for name, inp in self.inputs.items():
-            solution_inp = solution.inputs[name]
-            self.inputs[name] = np.c_[inp, solution_inp[:, start_index:]]
+        # Store t, y, inputs and sensitivities (or, if only the output variables are
+        # stored, the final state and the output variables) as new chunks, to be
+        # concatenated when next accessed. Sensitivities are stored time by time, so
+        # the rows of the initial time are the first n_y rows
+        n_y = solution.y.shape[0]
+        if self._output_data is None:
+            y_chunk = solution.y[:, start_index:]
+            output_chunk = None
+        else:
+            y_chunk = solution.y[:, -1:]
+            output_chunk = {
+                name: data[:, start_index:]
+                for name, data in solution.output_data.items()
+            }
+        self._chunks.append(
+            (
+                solution.t[start_index:],
+                y_chunk,
+                {name: solution.inputs[name][:, start_index:] for name in self._inputs},
+                output_chunk,
+                {
+                    name: solution.sensitivities[name][start_index * n_y :]
+                    for name in self._sensitivities
+                },
+            )
+        )
         # Update solution time
         self.solve_time += solution.solve_time
         self.integration_time += solution.integration_time
+        self.update_profile(solution._solve_profile)
         # Update termination
         self._termination = solution.termination
         self._t_event = solution._t_event
@@ -407,9 +664,8 @@ class Solution(_BaseSolution):
         # Update known_evals
         for t, evals in solution._known_evals.items():
             self._known_evals[t].update(evals)
-        # Recompute existing variables
-        for var in self._variables.keys():
-            self.update(var)
+        # Existing variables are recomputed only when they are next used
+        self._stale_variables.update(self._variables.keys())
 
         # Append sub_solutions
         if create_sub_solutions:
@@ -0,0 +1,298 @@
+#
+# Chunked, append-only store of a solution on disk
+#
+import numbers
+import numpy as np
+import os
+import pickle
+import pybamm
+import struct
+
+
+class SolutionStore(object):
+    """
+    Chunked, append-only store of a solution on disk, to which the solution of a long
+    simulation can be written step by step (see :meth:`pybamm.BaseSolver.step` and
+    :meth:`pybamm.Simulation.solve`), so that it doesn't need to be kept in memory.
+
+    The store is a directory with one `.npy` file each for the times and the inputs,
+    one `.npy` file of states per solution written or appended, and pickles of the
+    model and of the other attributes of the solution. Each file of states is stored
+    state by state (i.e. each row of y is contiguous), so that a row can be read
+    without reading the others. The arrays are memory-mapped when the solution is
+    loaded (see :meth:`load`), so only the parts of y that are read (e.g. the rows
+    that a variable depends on) are paged in from disk.
+
+    Parameters
+    ----------
+    path : str
+        The directory of the store. It is created when the first solution is written
+        to the store, if it doesn't exist.
+    """
+
+    # Size in bytes of the header of each array file, which is kept fixed so that the
+    # shape in the header can be updated in place when rows are appended
+    HEADER_SIZE = 128
+
+    def __init__(self, path):
+        self.path = path
+        self._metadata = None
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _array_names(self, metadata):
+        "Names of the array files appended to: times, then one file per input"
+        return ["t.npy"] + [
+            "input_{}.npy".format(i) for i in range(len(metadata["inputs"]))
+        ]
+
+    def _states_name(self, index):
+        "Name of the file of states of the `index`-th solution written or appended"
+        return "y_{}.npy".format(index)
+
+    @property
+    def metadata(self):
+        """
+        Attributes of the stored solution: the number of times stored, the number of
+        states, the names and sizes of the inputs, the reason for termination, the
+        times taken, etc.
+        """
+        if self._metadata is None:
+            try:
+                with open(self._file("solution.pkl"), "rb") as f:
+                    self._metadata = pickle.load(f)
+            except FileNotFoundError:
+                raise ValueError(
+                    "No solution has been written to the store at '{}'".format(
+                        self.path
+                    )
+                )
+        return self._metadata
+
+    def write(self, solution):
+        """
+        Write a solution to the store, replacing any solution already stored
+
+        Parameters
+        ----------
+        solution : :class:`pybamm.Solution`
+            The solution to write
+        """
+        if solution.has_symbolic_inputs:
+            raise ValueError("Cannot store a solution with symbolic inputs")
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._file("model.pkl"), "wb") as f:
+            pickle.dump(solution.model, f, pickle.HIGHEST_PROTOCOL)
+        metadata = {
+            "n_t": 0,
+            "n_y": solution.y.shape[0],
+            "y_chunk_sizes": [],
+            "inputs": [(name, inp.shape[0]) for name, inp in solution.inputs.items()],
+            "timescale_eval": solution.timescale_eval,
+            "length_scales_eval": solution.length_scales_eval,
+            "set_up_time": solution.set_up_time,
+            "solve_time": 0,
+            "integration_time": 0,
+            "solve_profile": {},
+        }
+        row_shapes = [()] + [(size,) for _, size in metadata["inputs"]]
+        for name, row_shape in zip(self._array_names(metadata), row_shapes):
+            with open(self._file(name), "wb") as f:
+                _write_header(f, (0,) + row_shape)
+        self._metadata = metadata
+        self.append(solution, start_index=0)
+
+    def append(self, solution, start_index=1):
+        """
+        Append the times, states and inputs of a solution to the store, and update
+        the other attributes of the stored solution (see
+        :meth:`pybamm.Solution.append`)
+
+        Parameters
+        ----------
+        solution : :class:`pybamm.Solution`
+            The solution to append
+        start_index : int, optional
+            Index of the first time of the solution to append. Default is 1, which
+            removes the initial time and state of the solution, which are the same as
+            the final ones already stored.
+        """
+        metadata = self.metadata
+        n_t = metadata["n_t"]
+        y_chunk_sizes = list(metadata["y_chunk_sizes"])
+        # The states are written to a new file (replacing any file left by an
+        # interrupted append)
+        y_chunk = solution.y[:, start_index:]
+        if y_chunk.shape[1] > 0:
+            np.save(
+                self._file(self._states_name(len(y_chunk_sizes))),
+                np.ascontiguousarray(y_chunk, dtype="<f8"),
+            )
+            y_chunk_sizes.append(y_chunk.shape[1])
+        rows = [solution.t[start_index:]] + [
+            solution.inputs[name][:, start_index:].T for name, _ in metadata["inputs"]
+        ]
+        for name, new_rows in zip(self._array_names(metadata), rows):
+            new_rows = np.ascontiguousarray(new_rows, dtype="<f8")
+            row_shape = new_rows.shape[1:]
+            with open(self._file(name), "r+b") as f:
+                # Overwrite anything left after the stored rows by an interrupted
+                # append, then update the shape in the header
+                f.seek(self.HEADER_SIZE + n_t * new_rows[:1].nbytes)
+                f.write(new_rows.tobytes())
+                f.truncate()
+                f.seek(0)
+                _write_header(f, (n_t + len(new_rows),) + row_shape)
+
+        # The stored rows are only counted once they have all been written
+        metadata["n_t"] = n_t + len(rows[0])
+        metadata["y_chunk_sizes"] = y_chunk_sizes
+        metadata["termination"] = solution.termination
+        metadata["t_event"] = solution.t_event
+        metadata["y_event"] = solution.y_event
+        metadata["solve_time"] += solution.solve_time
+        metadata["integration_time"] += solution.integration_time
+        for key, value in solution._solve_profile.items():
+            metadata["solve_profile"][key] = (
+                metadata["solve_profile"].get(key, 0) + value
+            )
+        with open(self._file("solution.pkl.tmp"), "wb") as f:
+            pickle.dump(metadata, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(self._file("solution.pkl.tmp"), self._file("solution.pkl"))
+
+    def load(self, model=None):
+        """
+        Load the stored solution, with its times, states and inputs memory-mapped
+        (read-only) from the store. The states are read lazily: indexing `y` (e.g.
+        `solution.y[rows]`) only reads the rows and times indexed, and the whole
+        array is only read when converted to a numpy array. The files of states are
+        only opened while they are read, so any number of them can be loaded.
+
+        Parameters
+        ----------
+        model : :class:`pybamm.BaseModel`, optional
+            The model of the solution. If None (default), the model stored with the
+            solution is loaded.
+
+        Returns
+        -------
+        :class:`pybamm.Solution`
+            The stored solution
+        """
+        # Re-read the attributes, in case the store has been appended to elsewhere
+        self._metadata = None
+        metadata = self.metadata
+        n_t = metadata["n_t"]
+        t, *inputs = [
+            np.asarray(np.load(self._file(name), mmap_mode="r")[:n_t])
+            for name in self._array_names(metadata)
+        ]
+        y = _StoredStates(
+            [
+                self._file(self._states_name(i))
+                for i in range(len(metadata["y_chunk_sizes"]))
+            ],
+            metadata["n_y"],
+            metadata["y_chunk_sizes"],
+        )
+        solution = pybamm.Solution(
+            t,
+            y,
+            metadata["t_event"],
+            metadata["y_event"],
+            metadata["termination"],
+        )
+        if model is None:
+            with open(self._file("model.pkl"), "rb") as f:
+                model = pickle.load(f)
+        solution.model = model
+        solution.timescale_eval = metadata["timescale_eval"]
+        solution.length_scales_eval = metadata["length_scales_eval"]
+        solution._inputs = {
+            name: inp.T for (name, _), inp in zip(metadata["inputs"], inputs)
+        }
+        solution.set_up_time = metadata["set_up_time"]
+        solution.solve_time = metadata["solve_time"]
+        solution.integration_time = metadata["integration_time"]
+        solution._solve_profile = dict(metadata["solve_profile"])
+        return solution
+
+
+class _StoredStates(object):
+    """
+    Read-only states of a stored solution (see :meth:`SolutionStore.load`), made of
+    the states of each solution written or appended to the store, side by side.
+    Indexing (with the rows first, then the times) only reads the rows and times
+    indexed from each file. Each file is memory-mapped while it is read, and closed
+    afterwards, so that the number of open files doesn't grow with the number of
+    files.
+
+    Parameters
+    ----------
+    paths : list of str
+        The `.npy` files of the states of each solution, with one row per state
+    n_y : int
+        The number of states
+    sizes : list of int
+        The number of times in each file
+    """
+
+    ndim = 2
+    dtype = np.dtype("float64")
+
+    def __init__(self, paths, n_y, sizes):
+        self.paths = paths
+        self.sizes = sizes
+        self.shape = (n_y, sum(sizes))
+        self.size = self.shape[0] * self.shape[1]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None):
+        return np.concatenate([np.load(path) for path in self.paths], axis=1).astype(
+            dtype or self.dtype
+        )
+
+    def _chunk(self, index):
+        "Memory-map the states of the `index`-th file"
+        return np.load(self.paths[index], mmap_mode="r")
+
+    def _read(self, index, key):
+        # Copy the values read, so that the file is closed once the memory map is
+        # discarded
+        return np.array(self._chunk(index)[key])
+
+    def __getitem__(self, key):
+        rows, times = key if isinstance(key, tuple) else (key, slice(None))
+        if isinstance(times, numbers.Integral):
+            # Read the column from the file that contains it
+            index = times + self.shape[1] if times < 0 else times
+            if not 0 <= index < self.shape[1]:
+                raise IndexError("index {} is out of bounds".format(times))
+            for i, size in enumerate(self.sizes):
+                if index < size:
+                    return self._read(i, (rows, index))
+                index -= size
+        # Only read the rows indexed from each file
+        y = np.concatenate(
+            [self._read(i, rows) for i in range(len(self.paths))], axis=-1
+        )
+        if isinstance(times, slice) and times == slice(None):
+            return y
+        return y[..., times]
+
+
+def _write_header(f, shape):
+    """
+    Write the header of a `.npy` file (format version 1.0) of float64 values with the
+    given shape, padded to :attr:`SolutionStore.HEADER_SIZE` bytes
+    """
+    header_len = SolutionStore.HEADER_SIZE - 10
+    header = "{{'descr': '<f8', 'fortran_order': False, 'shape': {}, }}".format(
+        tuple(shape)
+    )
+    f.write(np.lib.format.magic(1, 0))
+    f.write(struct.pack("<H", header_len))
+    f.write(header.ljust(header_len - 1).encode("latin1") + b"\n")
@@ -206,6 +206,7 @@ setup(
     ],
     extras_require={
         "docs": ["sphinx>=1.5", "guzzle-sphinx-theme"],  # For doc generation
+        "numba": ["numba>=0.50"],  # For the "numba" convert_to_format option
         "dev": [
             "flake8>=3",  # For code style checking
             "black",  # For code style auto-formatting
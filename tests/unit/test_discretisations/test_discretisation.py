@@ -606,6 +606,18 @@ class TestDiscretise(unittest.TestCase):
 
         combined_submesh = mesh.combine_submeshes(*whole_cell)
         disc.process_model(model)
+        self.assertEqual(
+            list(model.profile),
+            [
+                "discretisation: set-up",
+                "discretisation: initial conditions",
+                "discretisation: variables",
+                "discretisation: equations",
+                "discretisation: events",
+                "discretisation: mass matrix",
+                "discretisation: checks",
+            ],
+        )
 
         y0 = model.concatenated_initial_conditions.evaluate()
         np.testing.assert_array_equal(
@@ -82,6 +82,24 @@ class TestExperiment(unittest.TestCase):
         )
         self.assertEqual(experiment.period, 60)
 
+    def test_read_strings_cycles(self):
+        experiment = pybamm.Experiment(
+            ["Discharge at 10 mA for 0.5 hours"]
+            + [("Charge at 0.5 C for 45 minutes", "Hold at 1 V for 20 seconds")] * 2
+        )
+        self.assertEqual(
+            experiment.operating_conditions,
+            [
+                (0.01, "A", 1800.0, 60),
+                (-0.5, "C", 2700.0, 60),
+                (1, "V", 20.0, 60),
+                (-0.5, "C", 2700.0, 60),
+                (1, "V", 20.0, 60),
+            ],
+        )
+        self.assertEqual(experiment.cycle_lengths, [1, 2, 2])
+        self.assertEqual(len(experiment.operating_conditions_strings), 5)
+
     def test_str_repr(self):
         conds = ["Discharge at 1 C for 20 seconds", "Charge at 0.5 W for 10 minutes"]
         experiment = pybamm.Experiment(conds)
@@ -3,6 +3,7 @@
 #
 import pybamm
 import numpy as np
+import tempfile
 import unittest
 
 
@@ -83,6 +84,58 @@ class TestSimulationExperiment(unittest.TestCase):
         sim.solve(solver=pybamm.CasadiSolver())
         self.assertEqual(sim._solution.termination, "final time")
 
+    def test_run_experiment_cycles(self):
+        experiment = pybamm.Experiment(
+            [("Discharge at C/2 for 10 minutes", "Rest for 5 minutes")] * 3
+        )
+        model = pybamm.lithium_ion.SPM()
+        sim = pybamm.Simulation(model, experiment=experiment)
+        solver = pybamm.CasadiSolver()
+        sim.solve(solver=solver)
+        self.assertEqual(sim._solution.termination, "final time")
+        self.assertEqual(len(sim.experiment_step_times), 6)
+        self.assertEqual(len(sim.experiment_cycle_times), 3)
+        self.assertAlmostEqual(
+            sum(sim.experiment_cycle_times), sum(sim.experiment_step_times)
+        )
+        # Integrators are only created for the distinct grid shapes, and reused in
+        # later cycles
+        n_integrators = len(solver.grid_integrators[sim.built_model])
+        experiment = pybamm.Experiment(
+            [("Discharge at C/2 for 10 minutes", "Rest for 5 minutes")] * 6
+        )
+        sim = pybamm.Simulation(pybamm.lithium_ion.SPM(), experiment=experiment)
+        solver = pybamm.CasadiSolver()
+        sim.solve(solver=solver)
+        self.assertEqual(len(solver.grid_integrators[sim.built_model]), n_integrators)
+
+    def test_run_experiment_with_store(self):
+        experiment = pybamm.Experiment(
+            [("Discharge at C/2 for 10 minutes", "Rest for 5 minutes")] * 2
+        )
+        sim = pybamm.Simulation(pybamm.lithium_ion.SPM(), experiment=experiment)
+        solution = sim.solve(solver=pybamm.CasadiSolver())
+        voltage = solution["Terminal voltage [V]"].entries
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Solving twice replaces the stored solution
+            for _ in range(2):
+                stored_solution = sim.solve(solver=pybamm.CasadiSolver(), store=tmp_dir)
+            self.assertFalse(stored_solution.t.flags.writeable)
+            self.assertEqual(len(stored_solution.y.paths), 4)
+            self.assertIs(stored_solution.model, sim.built_model)
+            self.assertEqual(stored_solution.termination, "final time")
+            np.testing.assert_allclose(stored_solution.t, solution.t)
+            np.testing.assert_allclose(
+                stored_solution["Terminal voltage [V]"].entries, voltage
+            )
+            del stored_solution, sim._solution
+
+        # Only available with an experiment
+        sim = pybamm.Simulation(pybamm.lithium_ion.SPM())
+        with self.assertRaisesRegex(NotImplementedError, "store"):
+            sim.solve([0, 600], store="store")
+
     def test_run_experiment_breaks_early(self):
         experiment = pybamm.Experiment(["Discharge at 2 C for 1 hour"])
         model = pybamm.lithium_ion.SPM()
@@ -3,6 +3,7 @@
 #
 import pybamm
 import numpy as np
+from scipy.sparse import csr_matrix, coo_matrix
 
 import unittest
 
@@ -18,6 +19,41 @@ class TestArray(unittest.TestCase):
         vect = pybamm.Array([[1], [2], [3]])
         np.testing.assert_array_equal(vect.entries, np.array([[1], [2], [3]]))
 
+    def test_entries_digest(self):
+        entries = np.arange(1000.0)
+        arr = pybamm.Array(entries)
+        # fixed-size digest, kept by copies
+        self.assertEqual(len(arr.entries_string), 16)
+        self.assertEqual(arr.new_copy().entries_string, arr.entries_string)
+        self.assertEqual(arr.new_copy().id, arr.id)
+        self.assertEqual(pybamm.Array(entries.copy()).id, arr.id)
+        # different values, shapes or types give different ids
+        changed = entries.copy()
+        changed[500] = -1
+        self.assertNotEqual(pybamm.Array(changed).id, arr.id)
+        self.assertNotEqual(
+            pybamm.entries_digest(entries[:, np.newaxis]),
+            pybamm.entries_digest(entries[np.newaxis, :]),
+        )
+        self.assertNotEqual(
+            pybamm.entries_digest(np.arange(10)),
+            pybamm.entries_digest(np.arange(10.0)),
+        )
+        # non-contiguous arrays
+        self.assertEqual(
+            pybamm.entries_digest(entries[::2]),
+            pybamm.entries_digest(entries[::2].copy()),
+        )
+
+        # sparse matrices, including entries hidden by the printed summary
+        dense = np.eye(1000)
+        mat = pybamm.Matrix(csr_matrix(dense))
+        self.assertEqual(len(mat.entries_string), 16)
+        self.assertEqual(mat.new_copy().id, mat.id)
+        self.assertEqual(pybamm.Matrix(coo_matrix(dense)).id, mat.id)
+        dense[500, 500] = 2
+        self.assertNotEqual(pybamm.Matrix(csr_matrix(dense)).id, mat.id)
+
     def test_linspace(self):
         x = np.linspace(0, 1, 100)[:, np.newaxis]
         y = pybamm.linspace(0, 1, 100)
@@ -48,6 +48,18 @@ class TestInterpolant(unittest.TestCase):
         interp = pybamm.Interpolant(np.hstack([x, x]), a, "name")
         self.assertEqual(interp.name, "interpolating function (name)")
 
+    def test_entries_digest(self):
+        a = pybamm.StateVector(slice(0, 1))
+        x = np.linspace(0, 1)[:, np.newaxis]
+        interp = pybamm.Interpolant(np.hstack([x, x]), a)
+        self.assertEqual(len(interp.entries_string), 16)
+        self.assertEqual(interp.new_copy().id, interp.id)
+        self.assertEqual(pybamm.Interpolant(np.hstack([x, x]), a).id, interp.id)
+        self.assertNotEqual(pybamm.Interpolant(np.hstack([x, 2 * x]), a).id, interp.id)
+        # The id depends on the child
+        b = pybamm.StateVector(slice(1, 2))
+        self.assertNotEqual(pybamm.Interpolant(np.hstack([x, x]), b).id, interp.id)
+
     def test_diff(self):
         x = np.linspace(0, 1)[:, np.newaxis]
         y = pybamm.StateVector(slice(0, 2))
@@ -0,0 +1,134 @@
+#
+# Tests for the Jacobian found from its sparsity pattern by colouring
+#
+import pybamm
+import numpy as np
+import unittest
+from platform import system
+from scipy.sparse import csr_matrix, diags
+
+
+class TestColouredJacobian(unittest.TestCase):
+    def test_jacobian_sparsity(self):
+        y = pybamm.StateVector(slice(0, 4))
+        y_eval = np.array([1.0, 2.0, 3.0, 4.0])
+        A = pybamm.Matrix(diags([1, -2, 1], [-1, 0, 1], shape=(4, 4), format="csr"))
+        t = pybamm.t
+        for expr in [
+            A @ y,
+            pybamm.exp(A @ y) * y,
+            pybamm.sin(pybamm.Index(y, slice(1, 3))),
+            pybamm.Index(y, slice(0, 1)) * y,
+            t * pybamm.Index(y, slice(2, 3)) + 1,
+            pybamm.NumpyConcatenation(
+                2 * pybamm.Index(y, slice(2, 4)),
+                pybamm.cos(pybamm.Index(y, slice(0, 1))),
+                -pybamm.Index(y, slice(1, 3)),
+            ),
+        ]:
+            pattern = pybamm.jacobian_sparsity(expr, y)
+            self.assertEqual(pattern.shape, (expr.size, 4))
+            jac = expr.jac(y).evaluate(t=1, y=y_eval)
+            jac = jac.toarray() if hasattr(jac, "toarray") else jac
+            np.testing.assert_array_equal(pattern.toarray(), jac != 0)
+
+        # The pattern may have structural nonzeros whose value is zero
+        expr = pybamm.maximum(
+            pybamm.Index(y, slice(0, 2)), pybamm.Index(y, slice(2, 4))
+        )
+        pattern = pybamm.jacobian_sparsity(expr, y).toarray()
+        jac = expr.jac(y).evaluate(y=y_eval).toarray()
+        np.testing.assert_array_equal(pattern, [[1, 0, 1, 0], [0, 1, 0, 1]])
+        self.assertFalse(np.any((jac != 0) & ~pattern))
+
+        # Constants and piecewise constant functions have no nonzeros
+        for expr in [pybamm.Scalar(1), pybamm.Vector(np.ones(4)), y > 2, t * 2]:
+            self.assertEqual(pybamm.jacobian_sparsity(expr, y).nnz, 0)
+
+        # Only the part of the state vector with respect to which we differentiate
+        x = pybamm.StateVector(slice(2, 4))
+        pattern = pybamm.jacobian_sparsity(pybamm.exp(y), x)
+        np.testing.assert_array_equal(pattern.toarray(), np.eye(4, 2, -2) != 0)
+
+        # Patterns are memoised
+        memo = {}
+        pybamm.jacobian_sparsity(A @ y, y, memo=memo)
+        self.assertIn((A @ y).id, memo)
+
+        # Unknown nodes
+        with self.assertRaisesRegex(NotImplementedError, "Inner"):
+            pybamm.jacobian_sparsity(pybamm.Inner(y, y), y)
+        with self.assertRaisesRegex(NotImplementedError, "isn't constant"):
+            pybamm.jacobian_sparsity(
+                pybamm.MatrixMultiplication(pybamm.Index(y, slice(0, 1)) * A, y), y
+            )
+
+    def test_colour_columns(self):
+        # Tridiagonal: three colours
+        pattern = diags([1, 1, 1], [-1, 0, 1], shape=(6, 6), format="csr")
+        colours = pybamm.colour_columns(pattern)
+        np.testing.assert_array_equal(colours, [0, 1, 2, 0, 1, 2])
+
+        # No two columns of the same colour have a nonzero in the same row
+        pattern = csr_matrix(np.random.RandomState(0).rand(20, 30) > 0.9)
+        colours = pybamm.colour_columns(pattern)
+        for colour in range(colours.max() + 1):
+            self.assertLessEqual(pattern[:, colours == colour].sum(axis=1).max(), 1)
+
+        # Diagonal: one colour, dense row: one colour per column
+        np.testing.assert_array_equal(pybamm.colour_columns(np.eye(4)), 0)
+        np.testing.assert_array_equal(
+            pybamm.colour_columns(np.ones((1, 4))), [0, 1, 2, 3]
+        )
+
+    def test_coloured_jacobian_python(self):
+        y = pybamm.StateVector(slice(0, 4))
+        A = pybamm.Matrix(diags([1, -2, 1], [-1, 0, 1], shape=(4, 4), format="csr"))
+        expr = pybamm.NumpyConcatenation(
+            pybamm.exp(A @ y) * y, pybamm.Index(y, slice(0, 1)) ** 2
+        )
+        y_eval = np.array([0.1, 0.2, 0.3, 0.4])
+        jac_exact = expr.jac(y).evaluate(y=y_eval).toarray()
+
+        pattern = pybamm.jacobian_sparsity(expr, y)
+        jac = pybamm.ColouredJacobian(pybamm.EvaluatorPython(expr), pattern, y)
+        self.assertEqual(jac.n_colours, 3)
+        result = jac.evaluate(y=y_eval)
+        self.assertIsInstance(result, csr_matrix)
+        np.testing.assert_allclose(result.toarray(), jac_exact, rtol=1e-6, atol=1e-8)
+
+        # Symbol.evaluate signature
+        result, known_evals = jac.evaluate(y=y_eval, known_evals={})
+        np.testing.assert_allclose(result.toarray(), jac_exact, rtol=1e-6, atol=1e-8)
+
+        # Part of the state vector
+        x = pybamm.StateVector(slice(1, 3))
+        pattern = pybamm.jacobian_sparsity(expr, x)
+        jac = pybamm.ColouredJacobian(pybamm.EvaluatorPython(expr), pattern, x)
+        np.testing.assert_allclose(
+            jac.evaluate(y=y_eval).toarray(), jac_exact[:, 1:3], rtol=1e-6, atol=1e-8
+        )
+
+    @unittest.skipIf(system() == "Windows", "JAX not supported on windows")
+    def test_coloured_jacobian_jax(self):
+        y = pybamm.StateVector(slice(0, 3))
+        expr = pybamm.NumpyConcatenation(
+            pybamm.exp(y) * y, pybamm.Index(y, slice(0, 1)) ** 2
+        )
+        y_eval = np.array([0.1, 0.2, 0.3])
+        jac_exact = expr.jac(y).evaluate(y=y_eval).toarray()
+
+        pattern = pybamm.jacobian_sparsity(expr, y)
+        jac = pybamm.ColouredJacobian(pybamm.EvaluatorJax(expr), pattern, y)
+        self.assertEqual(jac.n_colours, 1)
+        np.testing.assert_allclose(jac.evaluate(y=y_eval).toarray(), jac_exact)
+
+
+if __name__ == "__main__":
+    print("Add -v for more debug output")
+    import sys
+
+    if "-v" in sys.argv:
+        debug = True
+    pybamm.settings.debug_mode = True
+    unittest.main()
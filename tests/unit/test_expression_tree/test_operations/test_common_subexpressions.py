@@ -0,0 +1,119 @@
+#
+# Tests for the elimination of common subexpressions
+#
+import pybamm
+import numpy as np
+import unittest
+from scipy.sparse import csr_matrix, csc_matrix
+
+
+class TestCommonSubexpressionElimination(unittest.TestCase):
+    def test_count_nodes(self):
+        a = pybamm.StateVector(slice(0, 1))
+        b = pybamm.StateVector(slice(1, 2))
+        self.assertEqual(pybamm.count_nodes(a), 1)
+        self.assertEqual(pybamm.count_nodes(a + b), 3)
+        # Repeated subtrees are counted once
+        self.assertEqual(pybamm.count_nodes((a + b) * (a + b)), 4)
+
+    def test_commutative_operators(self):
+        a = pybamm.StateVector(slice(0, 1))
+        b = pybamm.StateVector(slice(1, 2))
+        y = np.array([2.0, 3.0])
+        cse = pybamm.CommonSubexpressionElimination()
+
+        expr = a * b + b * a
+        new_expr = cse.eliminate(expr)
+        self.assertIs(new_expr.left, new_expr.right)
+        self.assertEqual(cse.nodes_removed, 1)
+        self.assertEqual(pybamm.count_nodes(new_expr), 4)
+        self.assertEqual(new_expr.evaluate(y=y), expr.evaluate(y=y))
+
+        # Results are shared between calls
+        self.assertIs(cse.eliminate(b * a), new_expr.left)
+        self.assertIs(cse.eliminate(a + b), cse.eliminate(b + a))
+
+        # Non-commutative operators are unchanged
+        expr = a - b
+        self.assertIs(cse.eliminate(expr), expr)
+        self.assertEqual(pybamm.count_nodes(cse.eliminate((a - b) + (b - a))), 5)
+
+    def test_fold_matrix_products(self):
+        y = pybamm.StateVector(slice(0, 2))
+        y_eval = np.array([1.0, 2.0])
+        A = np.array([[1.0, 2.0], [3.0, 4.0]])
+        B = np.array([[0.0, 1.0], [1.0, 0.0]])
+        cse = pybamm.CommonSubexpressionElimination()
+
+        for expr, entries in [
+            (pybamm.Matrix(A) @ y + pybamm.Matrix(B) @ y, A + B),
+            (pybamm.Matrix(A) @ y - pybamm.Matrix(B) @ y, A - B),
+            (
+                pybamm.Matrix(csr_matrix(A)) @ y - pybamm.Matrix(csc_matrix(B)) @ y,
+                A - B,
+            ),
+        ]:
+            new_expr = cse.eliminate(expr)
+            self.assertIsInstance(new_expr, pybamm.MatrixMultiplication)
+            self.assertIs(new_expr.right, y)
+            np.testing.assert_array_equal(
+                new_expr.left.evaluate().toarray()
+                if isinstance(new_expr.left.entries, csr_matrix)
+                else new_expr.left.evaluate(),
+                entries,
+            )
+            np.testing.assert_array_equal(
+                new_expr.evaluate(y=y_eval), expr.evaluate(y=y_eval)
+            )
+
+        # Products with different expressions or types of matrices are not folded
+        x = pybamm.StateVector(slice(2, 4))
+        for expr in [
+            pybamm.Matrix(A) @ y + pybamm.Matrix(B) @ x,
+            pybamm.Matrix(A) @ y + pybamm.Matrix(csr_matrix(B)) @ y,
+        ]:
+            self.assertIsInstance(cse.eliminate(expr), pybamm.Addition)
+
+    def test_sparse_matrices(self):
+        A = np.array([[1.0, 0.0], [0.0, 2.0]])
+        y = pybamm.StateVector(slice(0, 2))
+        cse = pybamm.CommonSubexpressionElimination()
+
+        csr = pybamm.Matrix(csr_matrix(A))
+        csc = pybamm.Matrix(csc_matrix(A))
+        self.assertNotEqual(csr.id, csc.id)
+        self.assertIs(cse.eliminate(csr), cse.eliminate(csc))
+        self.assertIsInstance(cse.eliminate(csc).entries, csr_matrix)
+
+        expr = pybamm.exp(csr @ y) * pybamm.exp(csc @ y)
+        new_expr = cse.eliminate(expr)
+        self.assertIs(new_expr.left, new_expr.right)
+        self.assertEqual(pybamm.count_nodes(new_expr), 5)
+
+        # Sparse operands of multiplications keep their order
+        expr = pybamm.Matrix(csr_matrix(np.ones((2, 1)))) * y
+        self.assertIsInstance(cse.eliminate(expr).left, pybamm.Matrix)
+
+    def test_clear_domains(self):
+        a = pybamm.StateVector(slice(0, 1), domain="negative electrode")
+        b = pybamm.StateVector(slice(1, 2))
+        expr = pybamm.exp(a) + b
+        cse = pybamm.CommonSubexpressionElimination()
+        new_expr = cse.eliminate(expr)
+        self.assertEqual(new_expr.domain, [])
+        for child in new_expr.children:
+            self.assertEqual(child.domain, [])
+        self.assertEqual(expr.domain, ["negative electrode"])
+        self.assertEqual(a.domain, ["negative electrode"])
+        y = np.array([1.0, 2.0])
+        self.assertEqual(new_expr.evaluate(y=y), expr.evaluate(y=y))
+
+
+if __name__ == "__main__":
+    print("Add -v for more debug output")
+    import sys
+
+    if "-v" in sys.argv:
+        debug = True
+    pybamm.settings.debug_mode = True
+    unittest.main()
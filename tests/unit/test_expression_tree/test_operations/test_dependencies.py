@@ -0,0 +1,57 @@
+#
+# Tests for finding the parts of the state vector and the inputs a tree depends on
+#
+import pybamm
+import unittest
+
+
+class TestDependencies(unittest.TestCase):
+    def test_find_dependencies(self):
+        a = pybamm.StateVector(slice(0, 2))
+        b = pybamm.StateVector(slice(4, 6), slice(2, 3))
+        c = pybamm.StateVector(slice(10, 12))
+        p = pybamm.InputParameter("p")
+        q = pybamm.InputParameter("q")
+
+        self.assertEqual(pybamm.find_dependencies(pybamm.Scalar(1)), ((), ()))
+        self.assertEqual(pybamm.find_dependencies(pybamm.t * 2), ((), ()))
+        self.assertEqual(pybamm.find_dependencies(a), ((slice(0, 2),), ()))
+        self.assertEqual(pybamm.find_dependencies(2 * p), ((), ("p",)))
+        # Slices are merged and inputs sorted
+        self.assertEqual(
+            pybamm.find_dependencies(q * pybamm.exp(a) + b * p + pybamm.t),
+            ((slice(0, 3), slice(4, 6)), ("p", "q")),
+        )
+        self.assertEqual(
+            pybamm.find_dependencies(pybamm.Index(c, 0) + a),
+            ((slice(0, 2), slice(10, 12)), ()),
+        )
+        # Time derivatives of the state vector aren't included
+        self.assertEqual(
+            pybamm.find_dependencies(a + pybamm.StateVectorDot(slice(0, 2))),
+            ((slice(0, 2),), ()),
+        )
+
+        # Dependencies are memoised
+        memo = {}
+        expr = a * p
+        pybamm.find_dependencies(expr, memo=memo)
+        self.assertIn(expr.id, memo)
+        self.assertIn(a.id, memo)
+
+    def test_merge_slices(self):
+        self.assertEqual(pybamm.merge_slices([]), ())
+        self.assertEqual(
+            pybamm.merge_slices([slice(5, 8), slice(0, 2), slice(2, 3), slice(6, 7)]),
+            (slice(0, 3), slice(5, 8)),
+        )
+
+
+if __name__ == "__main__":
+    print("Add -v for more debug output")
+    import sys
+
+    if "-v" in sys.argv:
+        debug = True
+    pybamm.settings.debug_mode = True
+    unittest.main()
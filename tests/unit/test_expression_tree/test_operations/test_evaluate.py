@@ -456,6 +456,81 @@ class TestEvaluate(unittest.TestCase):
             result = evaluator.evaluate(t=t, y=y)
             np.testing.assert_allclose(result, expr.evaluate(t=t, y=y))
 
+    def test_find_symbols_numba(self):
+        y = pybamm.StateVector(slice(0, 2))
+        A = pybamm.Matrix(scipy.sparse.csr_matrix(np.array([[0, 2], [0, 4]])))
+
+        # products of sparse matrices by vectors are written into a buffer
+        constant_symbols = OrderedDict()
+        variable_symbols = OrderedDict()
+        expr = A @ y
+        pybamm.find_symbols(
+            expr, constant_symbols, variable_symbols, output_numba=True
+        )
+        self.assertEqual(
+            list(variable_symbols.values())[-1],
+            "csr_matvec({}, {}, {})".format(
+                pybamm.id_to_python_variable(A.id, True),
+                pybamm.id_to_python_variable(y.id),
+                pybamm.id_to_python_variable(expr.id, True),
+            ),
+        )
+        self.assertEqual(constant_symbols[expr.id].shape, (2,))
+
+        # other operations with sparse matrices, matrix-valued nodes and unknown
+        # functions can't be compiled
+        for expr, message in [
+            (A * y, "sparse"),
+            (
+                pybamm.Matrix(np.ones((2, 2))) * pybamm.Index(y, slice(0, 1)),
+                "matrix-valued",
+            ),
+            (pybamm.Function(test_function, y), "ufuncs"),
+        ]:
+            with self.assertRaisesRegex(NotImplementedError, message):
+                pybamm.to_python(expr, output_numba=True)
+
+    @unittest.skipIf(not pybamm.have_numba(), "numba is not installed")
+    def test_evaluator_numba(self):
+        y = pybamm.StateVector(slice(0, 4))
+        A = pybamm.Matrix(
+            scipy.sparse.diags([1, -2, 1], [-1, 0, 1], shape=(4, 4), format="csr")
+        )
+        a = pybamm.InputParameter("a")
+        t_tests = [1, 2, -1]
+        y_tests = [
+            np.array([1.0, 2.0, 3.0, 4.0]),
+            np.array([[0.5], [-1.0], [2.0], [0.0]]),
+            np.linspace(0, 1, 4),
+        ]
+        for expr in [
+            A @ y,
+            pybamm.exp(A @ y) * y + pybamm.t * a,
+            pybamm.Index(A @ y, slice(1, 3)),
+            pybamm.NumpyConcatenation(pybamm.sin(y), (A @ y) / 2),
+            pybamm.maximum(y, 2) - pybamm.Matrix(np.ones((4, 4))) @ y,
+            pybamm.StateVector(slice(0, 1), slice(2, 4)) ** 2,
+            pybamm.Vector(np.ones(3)),
+            pybamm.Scalar(2),
+        ]:
+            evaluator = pybamm.EvaluatorNumba(expr)
+            for t, y_test in zip(t_tests, y_tests):
+                result = evaluator.evaluate(t=t, y=y_test, inputs={"a": 3})
+                np.testing.assert_allclose(
+                    result,
+                    expr.evaluate(t=t, y=y_test.reshape(-1, 1), inputs={"a": 3}),
+                )
+
+        # results aren't overwritten by later calls
+        evaluator = pybamm.EvaluatorNumba(pybamm.Index(A @ y, slice(1, 3)))
+        result = evaluator.evaluate(y=y_tests[0])
+        evaluator.evaluate(y=y_tests[1])
+        np.testing.assert_array_equal(result, [[0], [0]])
+
+        # known_evals
+        result, known_evals = evaluator.evaluate(y=y_tests[1], known_evals={})
+        np.testing.assert_array_equal(result, [[4.5], [-5]])
+
     @unittest.skipIf(system() == "Windows", "JAX not supported on windows")
     def test_find_symbols_jax(self):
         # test sparse conversion
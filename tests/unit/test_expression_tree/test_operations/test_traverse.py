@@ -0,0 +1,143 @@
+#
+# Tests for the iterative traversal of expression trees
+#
+import pybamm
+import casadi
+import numpy as np
+import sys
+import unittest
+from collections import OrderedDict
+
+
+def classes_in(symbol):
+    "Classes of the nodes of an expression tree, found without recursion"
+    return pybamm.traverse(
+        symbol,
+        lambda node, children: set.union({type(node)}, *children),
+    )
+
+
+def deep_tree(depth):
+    "Expression tree deeper than the recursion limit"
+    x = pybamm.StateVector(slice(0, 1))
+    expr = x
+    for i in range(depth):
+        expr = pybamm.sin(expr) if i % 2 else pybamm.cos(expr) * x
+    return x, expr
+
+
+class TestTraverse(unittest.TestCase):
+    def test_post_order(self):
+        a = pybamm.Scalar(1)
+        b = pybamm.StateVector(slice(0, 1))
+        expr = (a + b) * pybamm.exp(b)
+
+        visited = []
+
+        def visit(node, children):
+            visited.append(node.name)
+            if not children:
+                return node.name
+            return "{}({})".format(node.name, ", ".join(children))
+
+        result = pybamm.traverse(expr, visit)
+        self.assertEqual(result, "*(+(1.0, y[0:1]), function (exp)(y[0:1]))")
+        # Children are visited before their parents, and the shared subtree once
+        self.assertEqual(visited, ["1.0", "y[0:1]", "+", "function (exp)", "*"])
+
+    def test_memo_children_enter(self):
+        a = pybamm.Scalar(1)
+        b = pybamm.StateVector(slice(0, 1))
+        expr = a + b
+
+        # Results already in the memo are reused, and their children skipped
+        memo = {b.id: "b"}
+        result = pybamm.traverse(expr, lambda node, children: children, memo=memo)
+        self.assertEqual(result, [[], "b"])
+        self.assertEqual(memo[expr.id], [[], "b"])
+
+        # Only the given children are processed, and enter is called before them
+        entered = []
+        result = pybamm.traverse(
+            expr,
+            lambda node, children: len(children),
+            children=lambda node: node.children[:1],
+            enter=lambda node: entered.append(node.id),
+        )
+        self.assertEqual(result, 1)
+        self.assertEqual(entered, [expr.id, a.id])
+
+    def test_tree_is_constant(self):
+        a = pybamm.Scalar(1)
+        b = pybamm.StateVector(slice(0, 1))
+        for expr in [a, a + 2 * a, b, a + b, pybamm.exp(b) * a]:
+            memo = {}
+            self.assertEqual(pybamm.tree_is_constant(expr), expr.is_constant())
+            self.assertEqual(
+                pybamm.tree_is_constant(expr, memo=memo), expr.is_constant()
+            )
+            self.assertEqual(memo[expr.id], expr.is_constant())
+
+    def test_deep_tree(self):
+        depth = 2 * sys.getrecursionlimit()
+        x, expr = deep_tree(depth)
+        y = np.array([[0.3]])
+        self.assertFalse(expr.is_constant())
+
+        # convert to casadi
+        y_casadi = casadi.MX.sym("y", 1)
+        casadi_expr = expr.to_casadi(y=y_casadi)
+        value = casadi.Function("f", [y_casadi], [casadi_expr])(y)
+
+        # convert to python
+        evaluator = pybamm.EvaluatorPython(expr)
+        np.testing.assert_allclose(evaluator.evaluate(y=y), value)
+
+        # simplify
+        simp = expr.simplify()
+        evaluator = pybamm.EvaluatorPython(simp)
+        np.testing.assert_allclose(evaluator.evaluate(y=y), value)
+
+        # Jacobian (of a shallower tree, as its size grows with the square of the
+        # depth)
+        x, expr = deep_tree(100)
+        jac = pybamm.Jacobian().jac(expr, x)
+        self.assertEqual(jac.shape, (1, 1))
+
+    def test_deep_tree_parameters_discretisation(self):
+        depth = 2 * sys.getrecursionlimit()
+        var = pybamm.Variable("var")
+        param = pybamm.Parameter("param")
+        expr = var
+        for _ in range(depth):
+            expr = pybamm.sin(expr) * param
+        param_values = pybamm.ParameterValues({"param": 1})
+        processed = param_values.process_symbol(expr)
+        self.assertNotIn(pybamm.Parameter, classes_in(processed))
+        self.assertIn(pybamm.Scalar, classes_in(processed))
+        disc = pybamm.Discretisation()
+        disc.y_slices = {var.id: [slice(0, 1)]}
+        disc_expr = disc.process_symbol(processed)
+        self.assertIn(pybamm.StateVector, classes_in(disc_expr))
+        self.assertNotIn(pybamm.Variable, classes_in(disc_expr))
+
+    def test_find_symbols_shared_subtree(self):
+        a = pybamm.StateVector(slice(0, 1))
+        b = pybamm.exp(a)
+        expr = b + b * b
+        constant_symbols = OrderedDict()
+        variable_symbols = OrderedDict()
+        pybamm.find_symbols(expr, constant_symbols, variable_symbols)
+        # One line of code per distinct node
+        self.assertEqual(
+            list(variable_symbols.keys()), [a.id, b.id, (b * b).id, expr.id]
+        )
+
+
+if __name__ == "__main__":
+    print("Add -v for more debug output")
+
+    if "-v" in sys.argv:
+        debug = True
+    pybamm.settings.debug_mode = True
+    unittest.main()
@@ -14,27 +14,31 @@ class TestSymbol(unittest.TestCase):
         self.assertEqual(sym.name, "a symbol")
         self.assertEqual(str(sym), "a symbol")
 
-    def test_cached_children(self):
+    def test_children(self):
         symc1 = pybamm.Symbol("child1")
         symc2 = pybamm.Symbol("child2")
-        symc3 = pybamm.Symbol("child3")
         symp = pybamm.Symbol("parent", children=[symc1, symc2])
 
-        # test tuples of children for equality based on their name
-        def check_are_equal(children1, children2):
-            self.assertEqual(len(children1), len(children2))
-            for i in range(len(children1)):
-                self.assertEqual(children1[i].name, children2[i].name)
-
-        check_are_equal(symp.children, super(pybamm.Symbol, symp).children)
-        check_are_equal(symp.children, (symc1, symc2))
-
-        # update children, since we cache the children they will be unchanged
-        symc3.parent = symp
-        check_are_equal(symp.children, (symc1, symc2))
-
-        # check that the *actual* children are updated
-        check_are_equal(super(pybamm.Symbol, symp).children, (symc1, symc2, symc3))
+        # children are stored in a tuple, and shared rather than copied
+        self.assertIsInstance(symp.children, tuple)
+        self.assertIs(symp.children[0], symc1)
+        self.assertIs(symp.children[1], symc2)
+        self.assertIs(symp.cached_children, symp.children)
+
+        # a node can be the child of several nodes
+        symp2 = pybamm.Symbol("parent 2", children=[symc1])
+        self.assertIs(symp2.children[0], symp.children[0])
+        self.assertFalse(hasattr(symc1, "parent"))
+
+    def test_slots(self):
+        a = pybamm.StateVector(slice(0, 1))
+        expr = pybamm.exp(2 * a)
+        # common attributes are stored in slots rather than in a dictionary
+        for node in expr.pre_order():
+            self.assertEqual(node.__dict__, {})
+        # other attributes can still be set
+        expr.print_name = "b"
+        self.assertEqual(expr.__dict__, {"print_name": "b"})
 
     def test_symbol_domains(self):
         a = pybamm.Symbol("a", domain="test")
@@ -381,8 +385,8 @@ class TestSymbol(unittest.TestCase):
         summ = a + b
 
         a_orp, b_orp = summ.orphans
-        self.assertIsNone(a_orp.parent)
-        self.assertIsNone(b_orp.parent)
+        self.assertIsNot(a_orp, summ.children[0])
+        self.assertIsNot(b_orp, summ.children[1])
         self.assertEqual(a.id, a_orp.id)
         self.assertEqual(b.id, b_orp.id)
 
@@ -169,6 +169,26 @@ class TestBaseModel(unittest.TestCase):
             all(isinstance(x, pybamm.InputParameter) for x in model.input_parameters)
         )
 
+    def test_get_variable_dependencies(self):
+        model = pybamm.BaseModel()
+        a = pybamm.StateVector(slice(0, 2))
+        b = pybamm.StateVector(slice(2, 4))
+        c = pybamm.StateVector(slice(6, 8))
+        p = pybamm.InputParameter("p")
+        model.variables = {"a": a, "a + b": a + b, "c * p": c * p, "t": pybamm.t}
+
+        self.assertEqual(model.get_variable_dependencies("a"), ((slice(0, 2),), ()))
+        self.assertEqual(
+            model.get_variable_dependencies(["a + b", "c * p"]),
+            ((slice(0, 4), slice(6, 8)), ("p",)),
+        )
+        self.assertEqual(model.get_variable_dependencies("t"), ((), ()))
+        # Expression trees
+        self.assertEqual(
+            model.get_variable_dependencies(pybamm.exp(b)), ((slice(2, 4),), ())
+        )
+        self.assertEqual(model.get_variable_dependencies([]), ((), ()))
+
     def test_update(self):
         # model
         whole_cell = ["negative electrode", "separator", "positive electrode"]
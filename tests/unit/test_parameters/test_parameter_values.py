@@ -288,6 +288,45 @@ class TestParameterValues(unittest.TestCase):
         processed_c = parameter_values.process_symbol(c)
         self.assertEqual(processed_c.evaluate(inputs={"c": 5}), 10)
 
+    def test_as_inputs(self):
+        parameter_values = pybamm.ParameterValues(
+            {"a": 1, "b": 2, "const": 3, "func": lambda x: 2 * x}
+        )
+        new_parameter_values = parameter_values.as_inputs(["a", "const"])
+        self.assertEqual(new_parameter_values.input_values, {"a": 1, "const": 3})
+        self.assertEqual(parameter_values.input_values, {})
+        self.assertEqual(new_parameter_values.copy().input_values, {"a": 1, "const": 3})
+
+        # parameters are processed as input parameters
+        a = pybamm.Parameter("a")
+        b = pybamm.Parameter("b")
+        processed_add = new_parameter_values.process_symbol(a + b)
+        self.assertIsInstance(processed_add.children[0], pybamm.InputParameter)
+        self.assertIsInstance(processed_add.children[1], pybamm.Scalar)
+        self.assertEqual(processed_add.evaluate(inputs={"a": 4}), 6)
+
+        # scalar function parameters too
+        x = pybamm.Variable("x")
+        const = pybamm.FunctionParameter("const", {"x": x})
+        processed_const = new_parameter_values.process_symbol(const)
+        self.assertEqual(
+            processed_const.evaluate(y=np.array([5]), inputs={"const": 7}), 7
+        )
+        processed_diff = new_parameter_values.process_symbol(const.diff(x))
+        self.assertEqual(processed_diff.evaluate(inputs={"const": 7}), 0)
+
+        # updating the value keeps a numerical parameter as an input
+        new_parameter_values.update({"a": 5})
+        self.assertEqual(new_parameter_values.input_values, {"a": 5, "const": 3})
+        new_parameter_values.update({"a": lambda x: x})
+        self.assertEqual(new_parameter_values.input_values, {"const": 3})
+
+        # only parameters with numerical values can be inputs
+        with self.assertRaisesRegex(ValueError, "Cannot process parameter 'func'"):
+            parameter_values.as_inputs(["func"])
+        with self.assertRaises(KeyError):
+            parameter_values.as_inputs(["not a parameter"])
+
     def test_process_function_parameter(self):
         parameter_values = pybamm.ParameterValues(
             {
@@ -544,6 +583,7 @@ class TestParameterValues(unittest.TestCase):
 
         parameter_values = pybamm.ParameterValues({"a": 1, "b": 2, "c": 3, "d": 42})
         parameter_values.process_model(model)
+        self.assertIn("parameter processing", model.profile)
         # rhs
         self.assertIsInstance(model.rhs[var1], pybamm.Multiplication)
         self.assertIsInstance(model.rhs[var1].children[0], pybamm.Scalar)
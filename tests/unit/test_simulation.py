@@ -2,6 +2,7 @@ import pybamm
 import numpy as np
 import pandas as pd
 import os
+import tempfile
 import unittest
 
 
@@ -205,6 +206,70 @@ class TestSimulation(unittest.TestCase):
         sim.solve(t_eval=[0, 600], inputs={"Current function [A]": 1})
         np.testing.assert_array_equal(sim.solution.inputs["Current function [A]"], 1)
 
+    def test_solve_with_multiple_inputs(self):
+        model = pybamm.lithium_ion.SPM()
+        param = model.default_parameter_values
+        param.update({"Current function [A]": "[input]"})
+        sim = pybamm.Simulation(model, parameter_values=param)
+        inputs_list = [{"Current function [A]": i} for i in range(1, 4)]
+        solutions = sim.solve(t_eval=[0, 600], inputs=inputs_list)
+        self.assertEqual(len(solutions), 3)
+        np.testing.assert_array_almost_equal(sim.t_eval, np.linspace(0, 600, 100))
+        for i, solution in enumerate(solutions):
+            np.testing.assert_array_equal(
+                solution.inputs["Current function [A]"], i + 1
+            )
+
+        # Solve in parallel
+        parallel_solutions = sim.solve(t_eval=[0, 600], inputs=inputs_list, nproc=2)
+        for solution, parallel_solution in zip(solutions, parallel_solutions):
+            np.testing.assert_array_almost_equal(
+                solution["Terminal voltage [V]"].entries,
+                parallel_solution["Terminal voltage [V]"].entries,
+            )
+
+        # Not available with an experiment
+        experiment = pybamm.Experiment(["Discharge at C/20 for 1 hour"])
+        sim = pybamm.Simulation(model, experiment=experiment)
+        with self.assertRaisesRegex(NotImplementedError, "list of inputs"):
+            sim.solve(inputs=inputs_list)
+
+    def test_solve_with_sensitivities(self):
+        model = pybamm.lithium_ion.SPM()
+        param = model.default_parameter_values
+        param.update({"Current function [A]": "[input]"})
+        sim = pybamm.Simulation(
+            model, parameter_values=param, solver=pybamm.CasadiSolver(mode="fast")
+        )
+        solution = sim.solve(
+            t_eval=[0, 600],
+            inputs={"Current function [A]": 1},
+            calculate_sensitivities=True,
+        )
+        sensitivities = solution["Terminal voltage [V]"].sensitivities
+        self.assertEqual(sensitivities["Current function [A]"].shape, (100, 1))
+        # The voltage decreases with the current
+        np.testing.assert_array_less(sensitivities["Current function [A]"][1:], 0)
+
+        # Not available with an experiment
+        experiment = pybamm.Experiment(["Discharge at C/20 for 1 hour"])
+        sim = pybamm.Simulation(model, experiment=experiment)
+        with self.assertRaisesRegex(NotImplementedError, "sensitivities"):
+            sim.solve(calculate_sensitivities=True)
+
+    def test_solve_with_output_variables(self):
+        model = pybamm.lithium_ion.SPM()
+        sim = pybamm.Simulation(model)
+        solution = sim.solve(t_eval=[0, 600], output_variables=["Terminal voltage [V]"])
+        self.assertEqual(solution.y.shape[1], 1)
+        self.assertEqual(solution["Terminal voltage [V]"].entries.shape, (100,))
+
+        # Not available with an experiment
+        experiment = pybamm.Experiment(["Discharge at C/20 for 1 hour"])
+        sim = pybamm.Simulation(model, experiment=experiment)
+        with self.assertRaisesRegex(NotImplementedError, "output variables"):
+            sim.solve(output_variables=["Terminal voltage [V]"])
+
     def test_step_with_inputs(self):
         dt = 0.001
         model = pybamm.lithium_ion.SPM()
@@ -232,6 +297,74 @@ class TestSimulation(unittest.TestCase):
             sim.solution.inputs["Current function [A]"], np.array([[1, 1, 2]])
         )
 
+    def test_lift_parameters(self):
+        model = pybamm.lithium_ion.SPM()
+        sim = pybamm.Simulation(model, lift_parameters=True)
+        sim.solve([0, 600])
+        self.assertIn("Current function [A]", sim._lifted_parameters)
+        self.assertNotIn("Negative electrode thickness [m]", sim._lifted_parameters)
+        self.assertNotIn("Typical current [A]", sim._lifted_parameters)
+        built_model = sim.built_model
+
+        # Changing a lifted parameter re-binds its value without rebuilding
+        sim.parameter_values.update({"Current function [A]": 0.5})
+        sim.solve([0, 600])
+        self.assertIs(sim.built_model, built_model)
+        np.testing.assert_array_equal(sim.solution.inputs["Current function [A]"], 0.5)
+        sim_ref = pybamm.Simulation(model, parameter_values=sim.parameter_values)
+        sim_ref.solve([0, 600])
+        np.testing.assert_array_almost_equal(
+            sim.solution["Terminal voltage [V]"].entries,
+            sim_ref.solution["Terminal voltage [V]"].entries,
+        )
+
+        # Inputs given by the user take precedence
+        sim.solve([0, 600], inputs={"Current function [A]": 0.25})
+        np.testing.assert_array_equal(sim.solution.inputs["Current function [A]"], 0.25)
+
+        # Changing a geometric parameter rebuilds the model
+        sim.parameter_values.update({"Negative electrode thickness [m]": 90e-6})
+        sim.solve([0, 600])
+        self.assertIsNot(sim.built_model, built_model)
+        sim_ref = pybamm.Simulation(model, parameter_values=sim.parameter_values)
+        sim_ref.solve([0, 600])
+        np.testing.assert_array_almost_equal(
+            sim.solution["Terminal voltage [V]"].entries,
+            sim_ref.solution["Terminal voltage [V]"].entries,
+        )
+
+    def test_sweep_parameters(self):
+        model = pybamm.lithium_ion.SPM()
+        sim = pybamm.Simulation(model, sweep_parameters=["Current function [A]"])
+        inputs_list = [{"Current function [A]": i} for i in [0.5, 1]]
+        solutions = sim.solve([0, 600], inputs=inputs_list)
+        self.assertEqual(sim._lifted_parameters, ["Current function [A]"])
+        for inputs, solution in zip(inputs_list, solutions):
+            param = model.default_parameter_values
+            param.update(inputs)
+            sim_ref = pybamm.Simulation(model, parameter_values=param)
+            sim_ref.solve([0, 600])
+            np.testing.assert_array_almost_equal(
+                solution["Terminal voltage [V]"].entries,
+                sim_ref.solution["Terminal voltage [V]"].entries,
+            )
+
+        # Without inputs, the value in the parameter values is used
+        built_model = sim.built_model
+        sim.solve([0, 600])
+        self.assertIs(sim.built_model, built_model)
+        np.testing.assert_array_equal(
+            sim.solution.inputs["Current function [A]"],
+            model.default_parameter_values["Current function [A]"],
+        )
+
+        # Geometric parameters can't be swept
+        sim = pybamm.Simulation(
+            model, sweep_parameters=["Negative electrode thickness [m]"]
+        )
+        with self.assertRaisesRegex(ValueError, "Cannot sweep parameters"):
+            sim.build()
+
     def test_save_load(self):
         model = pybamm.lead_acid.LOQS()
         model.use_jacobian = True
@@ -260,6 +393,88 @@ class TestSimulation(unittest.TestCase):
         ):
             sim.save("test.pickle")
 
+    def test_cache(self):
+        model = pybamm.lithium_ion.SPM()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            sim = pybamm.Simulation(model, cache_dir=cache_dir)
+            sim.solve([0, 600])
+            self.assertTrue(
+                os.path.exists(os.path.join(cache_dir, sim.cache_key() + ".pkl"))
+            )
+
+            # Same settings: load the built and set-up model from the cache
+            sim_cached = pybamm.Simulation(model, cache_dir=cache_dir)
+            self.assertEqual(sim_cached.cache_key(), sim.cache_key())
+            sim_cached.build()
+            self.assertTrue(sim_cached._built_model_is_cached)
+            self.assertIsNone(sim_cached._model_with_set_params)
+            self.assertIn(sim_cached.built_model, sim_cached.solver.models_set_up)
+            sim_cached.solve([0, 600])
+            np.testing.assert_array_almost_equal(
+                sim.solution["Terminal voltage [V]"].entries,
+                sim_cached.solution["Terminal voltage [V]"].entries,
+            )
+
+            # The model with parameters set, the mesh and the discretisation aren't
+            # cached, and are restored when first accessed
+            self.assertEqual(sim_cached.mesh.keys(), sim.mesh.keys())
+            self.assertEqual(
+                [var.name for var in sim_cached.model_with_set_params.rhs],
+                [var.name for var in sim.model_with_set_params.rhs],
+            )
+            self.assertEqual(sim_cached._disc.y_slices, sim._disc.y_slices)
+            self.assertIs(sim_cached.built_model, sim_cached._built_model)
+
+            # Custom models with the same name but different equations have
+            # different keys
+            solutions = []
+            for rate in [1, 5]:
+                custom_model = pybamm.BaseModel()
+                v = pybamm.Variable("v")
+                custom_model.rhs = {v: -rate * v}
+                custom_model.initial_conditions = {v: 1}
+                custom_model.variables = {"v": v}
+                sim_custom = pybamm.Simulation(custom_model, cache_dir=cache_dir)
+                solutions.append(sim_custom.solve([0, 1]))
+            self.assertAlmostEqual(solutions[0]["v"].entries[-1], np.exp(-1), 4)
+            self.assertAlmostEqual(solutions[1]["v"].entries[-1], np.exp(-5), 4)
+
+            # Different settings give a different key
+            param = model.default_parameter_values
+            param["Current function [A]"] = 2
+            sim_other = pybamm.Simulation(
+                model, parameter_values=param, cache_dir=cache_dir
+            )
+            self.assertNotEqual(sim_other.cache_key(), sim.cache_key())
+            var_pts = {k: 2 * v for k, v in model.default_var_pts.items()}
+            sim_other = pybamm.Simulation(model, var_pts=var_pts, cache_dir=cache_dir)
+            self.assertNotEqual(sim_other.cache_key(), sim.cache_key())
+
+            # With an experiment
+            experiment = pybamm.Experiment(
+                ["Discharge at 1C for 1 minute", "Rest for 1 minute"]
+            )
+            sim = pybamm.Simulation(model, experiment=experiment, cache_dir=cache_dir)
+            sim.solve()
+            sim_cached = pybamm.Simulation(
+                model, experiment=experiment, cache_dir=cache_dir
+            )
+            sim_cached.solve()
+            self.assertTrue(sim_cached._built_model_is_cached)
+            np.testing.assert_array_almost_equal(
+                sim.solution["Terminal voltage [V]"].entries,
+                sim_cached.solution["Terminal voltage [V]"].entries,
+            )
+
+            # Models in python format can't be cached
+            model = pybamm.lithium_ion.SPM()
+            model.convert_to_format = "python"
+            sim = pybamm.Simulation(model, cache_dir=cache_dir)
+            sim.solve([0, 600])
+            self.assertFalse(
+                os.path.exists(os.path.join(cache_dir, sim.cache_key() + ".pkl"))
+            )
+
     def test_save_load_dae(self):
         model = pybamm.lead_acid.LOQS({"surface form": "algebraic"})
         model.use_jacobian = True
@@ -7,6 +7,7 @@ import numpy as np
 from scipy.sparse import csr_matrix
 
 import unittest
+from tests import get_mesh_for_testing
 
 
 class TestBaseSolver(unittest.TestCase):
@@ -94,6 +95,27 @@ class TestBaseSolver(unittest.TestCase):
         ):
             solver.solve(model, np.array([1, 2, 3]))
 
+    def test_sensitivities_fail(self):
+        model = pybamm.BaseModel()
+        u = pybamm.Variable("u")
+        model.rhs = {u: -pybamm.InputParameter("a") * u}
+        model.initial_conditions = {u: 1}
+        disc = pybamm.Discretisation()
+        disc.process_model(model)
+        t_eval = np.linspace(0, 1)
+        with self.assertRaisesRegex(
+            pybamm.SolverError, "can't calculate sensitivities"
+        ):
+            pybamm.ScipySolver().solve(
+                model, t_eval, inputs={"a": 1}, calculate_sensitivities=True
+            )
+        solver = pybamm.CasadiSolver()
+        with self.assertRaisesRegex(pybamm.SolverError, "'b', which isn't an input"):
+            solver.solve(model, t_eval, inputs={"a": 1}, calculate_sensitivities=["b"])
+        # Sensitivities aren't calculated if there are no inputs
+        solution = solver.solve(model, t_eval, calculate_sensitivities=True)
+        self.assertEqual(solution.sensitivities, {})
+
     def test_ode_solver_fail_with_dae(self):
         model = pybamm.BaseModel()
         a = pybamm.Scalar(1)
@@ -207,7 +229,7 @@ class TestBaseSolver(unittest.TestCase):
 
             def algebraic_eval(self, t, y, inputs):
                 # algebraic equation has no root
-                return y ** 2 + 1
+                return y**2 + 1
 
         solver = pybamm.BaseSolver(root_method="hybr")
 
@@ -268,6 +290,193 @@ class TestBaseSolver(unittest.TestCase):
         self.assertEqual(model.convert_to_format, "casadi")
         pybamm.set_logging_level("WARNING")
 
+    def test_common_subexpression_elimination(self):
+        model = pybamm.BaseModel()
+        u = pybamm.Variable("u")
+        v = pybamm.Variable("v")
+        model.rhs = {u: u * v + v * u, v: 1}
+        model.initial_conditions = {u: 1, v: 1}
+        disc = pybamm.Discretisation()
+        disc.process_model(model)
+
+        for solver, convert_to_format in [
+            (pybamm.ScipySolver(), "python"),
+            (pybamm.CasadiSolver(), "casadi"),
+        ]:
+            model.convert_to_format = convert_to_format
+            solver.set_up(model, {})
+            self.assertEqual(
+                model.profile[
+                    "set-up: nodes removed by common subexpression elimination"
+                ],
+                1,
+            )
+
+        # Not eliminated without simplification
+        model.use_simplify = False
+        pybamm.CasadiSolver().set_up(model, {})
+        self.assertEqual(
+            model.profile["set-up: nodes removed by common subexpression elimination"],
+            0,
+        )
+
+    def test_coloured_jacobian(self):
+        model = pybamm.BaseModel()
+        u = pybamm.Variable("u", domain="negative electrode")
+        v = pybamm.Variable("v")
+        model.rhs = {u: -u * v + pybamm.div(pybamm.grad(u)), v: v**2}
+        model.initial_conditions = {u: 1, v: 0.5}
+        model.boundary_conditions = {
+            u: {"left": (0, "Neumann"), "right": (0, "Neumann")}
+        }
+        model.convert_to_format = "python"
+        mesh = get_mesh_for_testing()
+        disc = pybamm.Discretisation(
+            mesh, {"negative electrode": pybamm.FiniteVolume()}
+        )
+        disc.process_model(model)
+
+        y = np.linspace(1, 2, model.concatenated_rhs.size)
+        solver = pybamm.ScipySolver()
+        solver.set_up(model, {})
+        jac_symbolic = model.jacobian_eval(0, y, {}).toarray()
+
+        model.jacobian_method = "colouring"
+        solver.set_up(model, {})
+        self.assertIsInstance(
+            model.jacobian_eval._function.__self__, pybamm.ColouredJacobian
+        )
+        np.testing.assert_allclose(
+            model.jacobian_eval(0, y, {}).toarray(), jac_symbolic, rtol=1e-6
+        )
+
+        # Falls back to the symbolic jacobian if the sparsity pattern can't be found
+        model = pybamm.BaseModel()
+        v = pybamm.Variable("v")
+        model.rhs = {v: -pybamm.Inner(v, v)}
+        model.initial_conditions = {v: 1}
+        model.convert_to_format = "python"
+        model.use_simplify = False
+        model.jacobian_method = "colouring"
+        pybamm.Discretisation().process_model(model)
+        with self.assertLogs(pybamm.logger, level="WARNING"):
+            solver.set_up(model, {})
+        np.testing.assert_allclose(
+            model.jacobian_eval(0, np.array([2.0]), {}).toarray(), [[-4]]
+        )
+
+    @unittest.skipIf(not pybamm.have_numba(), "numba is not installed")
+    def test_numba_format(self):
+        model = pybamm.BaseModel()
+        u = pybamm.Variable("u", domain="negative electrode")
+        v = pybamm.Variable("v")
+        model.rhs = {u: -u * v + pybamm.div(pybamm.grad(u)), v: -v}
+        model.initial_conditions = {u: 1, v: 0.5}
+        model.boundary_conditions = {
+            u: {"left": (0, "Neumann"), "right": (0, "Neumann")}
+        }
+        model.events = [pybamm.Event("v small", v - 0.1)]
+        mesh = get_mesh_for_testing()
+        disc = pybamm.Discretisation(
+            mesh, {"negative electrode": pybamm.FiniteVolume()}
+        )
+        disc.process_model(model)
+
+        y = np.linspace(1, 2, model.concatenated_rhs.size)
+        solver = pybamm.ScipySolver()
+        model.convert_to_format = "python"
+        solver.set_up(model, {})
+        rhs = model.rhs_eval(0, y, {})
+        jac = model.jacobian_eval(0, y, {}).toarray()
+
+        for jacobian_method in ["symbolic", "colouring"]:
+            model.convert_to_format = "numba"
+            model.jacobian_method = jacobian_method
+            solver.set_up(model, {})
+            # only the equations are compiled
+            self.assertIsInstance(
+                model.rhs_eval._function.__self__, pybamm.EvaluatorNumba
+            )
+            self.assertIsInstance(
+                model.terminate_events_eval[0]._function.__self__,
+                pybamm.EvaluatorPython,
+            )
+            np.testing.assert_allclose(model.rhs_eval(0, y, {}), rhs)
+            np.testing.assert_allclose(
+                model.jacobian_eval(0, y, {}).toarray(), jac, rtol=1e-6
+            )
+
+        # Falls back to python if the equations can't be compiled
+        model = pybamm.BaseModel()
+        v = pybamm.Variable("v")
+        data = np.array([[0, 0], [1, 2], [2, 4]])
+        model.rhs = {v: -pybamm.Interpolant(data, v, "interpolant")}
+        model.initial_conditions = {v: 1}
+        model.convert_to_format = "numba"
+        pybamm.Discretisation().process_model(model)
+        with self.assertLogs(pybamm.logger, level="WARNING"):
+            solver.set_up(model, {})
+        self.assertIsInstance(model.rhs_eval._function.__self__, pybamm.EvaluatorPython)
+
+    def test_evaluate_in_place(self):
+        for convert_to_format in ["casadi", "python"]:
+            model = pybamm.BaseModel()
+            u = pybamm.Variable("u", domain="negative electrode")
+            v = pybamm.Variable("v")
+            a = pybamm.InputParameter("a")
+            model.rhs = {u: -u * v * a + pybamm.div(pybamm.grad(u))}
+            model.algebraic = {v: v - 2 * pybamm.Index(u, slice(0, 1))}
+            model.initial_conditions = {u: 1, v: 2}
+            model.boundary_conditions = {
+                u: {"left": (0, "Neumann"), "right": (0, "Neumann")}
+            }
+            model.convert_to_format = convert_to_format
+            mesh = get_mesh_for_testing()
+            disc = pybamm.Discretisation(
+                mesh, {"negative electrode": pybamm.FiniteVolume()}
+            )
+            disc.process_model(model)
+            pybamm.BaseSolver().set_up(model, {"a": 3})
+
+            n = model.concatenated_initial_conditions.size
+            y = np.linspace(1, 2, n)
+            ydot = np.linspace(0, 1, n)
+            inputs = casadi.vertcat(3) if convert_to_format == "casadi" else {"a": 3}
+
+            # rhs and residuals
+            rhs = model.rhs_eval(0.5, y, inputs)
+            out = np.empty(rhs.size)
+            self.assertIs(model.rhs_eval(0.5, y, inputs, out=out), out)
+            np.testing.assert_allclose(out, rhs)
+            residuals = model.residuals_eval(0.5, y, ydot, inputs)
+            out = np.empty(n)
+            self.assertIs(model.residuals_eval(0.5, y, ydot, inputs, out=out), out)
+            np.testing.assert_allclose(out, residuals)
+            np.testing.assert_allclose(
+                residuals,
+                np.concatenate([rhs, model.algebraic_eval(0.5, y, inputs)])
+                - model.mass_matrix.entries @ ydot,
+            )
+
+            # jacobians, in dense (C or Fortran order) and sparse outputs
+            jac = model.jacobian_eval(0.5, y, inputs)
+            jac = casadi.DM(jac).full() if convert_to_format == "casadi" else jac
+            jac = jac.toarray() if hasattr(jac, "toarray") else jac
+            out = np.empty((n, n))
+            model.jacobian_eval(0.5, y, inputs, out=out)
+            np.testing.assert_allclose(out, jac)
+
+            jac_residuals = model.jac_residuals_eval
+            expected = jac - 4 * model.mass_matrix.entries.toarray()
+            for out in [
+                np.empty((n, n)),
+                np.empty((n, n), order="F"),
+                jac_residuals.empty_jacobian(0, y, inputs),
+            ]:
+                self.assertIs(jac_residuals(0.5, y, 4, inputs, out=out), out)
+                out = out.toarray() if hasattr(out, "toarray") else out
+                np.testing.assert_allclose(out, expected)
+
     def test_timescale_input_fail(self):
         # Make sure timescale can't depend on inputs
         model = pybamm.BaseModel()
@@ -281,6 +490,24 @@ class TestBaseSolver(unittest.TestCase):
         sol = solver.step(old_solution=None, model=model, dt=1.0, inputs={"a": 10})
         with self.assertRaisesRegex(pybamm.SolverError, "The model timescale"):
             sol = solver.step(old_solution=sol, model=model, dt=1.0, inputs={"a": 20})
+        with self.assertRaisesRegex(pybamm.SolverError, "The model timescale"):
+            solver.solve(model, [0, 1], inputs=[{"a": 10}, {"a": 20}])
+
+    def test_length_scale_input_fail(self):
+        # Make sure length scales can't depend on inputs
+        model = pybamm.BaseModel()
+        v = pybamm.Variable("v")
+        model.rhs = {v: -1}
+        model.initial_conditions = {v: 1}
+        a = pybamm.InputParameter("a")
+        model.length_scales = {"negative electrode": a}
+        solver = pybamm.CasadiSolver()
+        solver.set_up(model, inputs={"a": 10})
+        sol = solver.step(old_solution=None, model=model, dt=1.0, inputs={"a": 10})
+        with self.assertRaisesRegex(pybamm.SolverError, "negative electrode domain"):
+            sol = solver.step(old_solution=sol, model=model, dt=1.0, inputs={"a": 20})
+        with self.assertRaisesRegex(pybamm.SolverError, "negative electrode domain"):
+            solver.solve(model, [0, 1], inputs=[{"a": 10}, {"a": 20}])
 
 
 if __name__ == "__main__":
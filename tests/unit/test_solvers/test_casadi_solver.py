@@ -1,8 +1,10 @@
 #
 # Tests for the Casadi Solver class
 #
+import casadi
 import pybamm
 import unittest
+from unittest import mock
 import numpy as np
 from tests import get_mesh_for_testing, get_discretisation_for_testing
 from scipy.sparse import eye
@@ -13,6 +15,8 @@ class TestCasadiSolver(unittest.TestCase):
     def test_bad_mode(self):
         with self.assertRaisesRegex(ValueError, "invalid mode"):
             pybamm.CasadiSolver(mode="bad mode")
+        with self.assertRaisesRegex(ValueError, "invalid event_location"):
+            pybamm.CasadiSolver(event_location="bad")
 
     def test_model_solver(self):
         # Create model
@@ -52,6 +56,39 @@ class TestCasadiSolver(unittest.TestCase):
             solution.y[0], np.exp(0.1 * solution.t), decimal=5
         )
 
+    def test_model_solver_reuse_integrators(self):
+        model = pybamm.BaseModel()
+        var = pybamm.Variable("var")
+        model.rhs = {var: -0.1 * var}
+        model.initial_conditions = {var: 1}
+        model.events = [pybamm.Event("var = 0.5", var - 0.5)]
+        disc = pybamm.Discretisation()
+        disc.process_model(model)
+
+        # Grids with the same shape (after normalisation) share an integrator
+        solver = pybamm.CasadiSolver(mode="fast", rtol=1e-8, atol=1e-8)
+        for t_eval in [np.linspace(0, 1, 10), np.linspace(2, 5, 10)]:
+            solution = solver.solve(model, t_eval)
+            np.testing.assert_array_equal(solution.t, t_eval)
+            np.testing.assert_array_almost_equal(
+                solution.y[0], np.exp(-0.1 * (solution.t - t_eval[0])), decimal=5
+            )
+        self.assertEqual(len(solver.grid_integrators[model]), 1)
+
+        # In safe mode, the global steps reuse the same integrators
+        solver = pybamm.CasadiSolver(rtol=1e-8, atol=1e-8, dt_max=1)
+        t_eval = np.linspace(0, 10, 101)
+        solution = solver.solve(model, t_eval)
+        np.testing.assert_array_almost_equal(
+            solution.y[0], np.exp(-0.1 * solution.t), decimal=5
+        )
+        self.assertEqual(solution.termination, "event: var = 0.5")
+        self.assertLessEqual(len(solver.grid_integrators[model]), 2)
+
+        # The integrator without grid is created from the same problem
+        integrator = solver.create_integrator(model, casadi.DM())
+        self.assertIs(solver.grid_integrators[model][None], integrator)
+
     def test_model_solver_python(self):
         # Create model
         pybamm.set_logging_level("ERROR")
@@ -130,6 +167,21 @@ class TestCasadiSolver(unittest.TestCase):
             solution.y[-1], 2 * np.exp(0.1 * solution.t), decimal=5
         )
 
+        # The profile records the stages of the set-up and of the solve
+        profile = solution.profile
+        for stage in [
+            "discretisation: equations",
+            "set-up: conversion",
+            "set-up: jacobian",
+            "integrator creation",
+            "integration",
+            "event location",
+            "consistent initial conditions",
+        ]:
+            self.assertGreaterEqual(profile[stage], 0)
+        self.assertGreater(profile["integrator steps"], 0)
+        self.assertGreater(profile["rhs evaluations"], 0)
+
         # Solve using "safe" mode with debug off
         pybamm.settings.debug_mode = False
         solver = pybamm.CasadiSolver(mode="safe", rtol=1e-8, atol=1e-8, dt_max=1)
@@ -176,6 +228,83 @@ class TestCasadiSolver(unittest.TestCase):
         np.testing.assert_array_less(solution.y[0], 1.02 + 1e-10)
         np.testing.assert_array_almost_equal(solution.y[0, -1], 1.02, decimal=2)
 
+    def test_model_solver_events_rootfinder(self):
+        # Create model
+        model = pybamm.BaseModel()
+        whole_cell = ["negative electrode", "separator", "positive electrode"]
+        var1 = pybamm.Variable("var1", domain=whole_cell)
+        var2 = pybamm.Variable("var2", domain=whole_cell)
+        model.rhs = {var1: 0.1 * var1}
+        model.algebraic = {var2: 2 * var1 - var2}
+        model.initial_conditions = {var1: 1, var2: 2}
+        model.events = [
+            pybamm.Event("var1 = 1.5", pybamm.min(var1 - 1.5)),
+            pybamm.Event("var2 = 2.5", pybamm.min(var2 - 2.5)),
+        ]
+        disc = get_discretisation_for_testing()
+        disc.process_model(model)
+        t_eval = np.linspace(0, 5, 100)
+
+        # The event time and state are given by the rootfinder on the integrator
+        solver = pybamm.CasadiSolver(
+            event_location="rootfinder", dt_max=0, rtol=1e-8, atol=1e-8
+        )
+        solution = solver.solve(model, t_eval)
+        np.testing.assert_array_less(solution.y[0], 1.5)
+        np.testing.assert_array_less(solution.y[-1], 2.5 + 1e-10)
+        self.assertAlmostEqual(solution.y[-1, -1], 2.5, places=8)
+        self.assertAlmostEqual(solution.t_event, 10 * np.log(1.25), places=4)
+        np.testing.assert_array_almost_equal(
+            solution.y[-1], 2 * np.exp(0.1 * solution.t), decimal=5
+        )
+        self.assertGreaterEqual(solution.profile["event location"], 0)
+        # The integrator without a grid used to locate the event doesn't replace
+        # the integrator of the model
+        integrator, use_grid = solver.integrators[model]
+        self.assertTrue(use_grid)
+
+        # Fall back to a bracketed search if there is no rootfinder, or if Newton's
+        # method gives a time outside the window
+        def rootfinder_outside_window(name, method, function):
+            return lambda t_guess, params: (t_guess + 10, None)
+
+        for rootfinder in [
+            mock.Mock(side_effect=RuntimeError),
+            rootfinder_outside_window,
+        ]:
+            solver = pybamm.CasadiSolver(
+                event_location="rootfinder", dt_max=0, rtol=1e-8, atol=1e-8
+            )
+            with mock.patch("casadi.rootfinder", rootfinder):
+                fallback_solution = solver.solve(model, t_eval)
+            self.assertAlmostEqual(
+                fallback_solution.t_event, solution.t_event, places=6
+            )
+            np.testing.assert_array_almost_equal(
+                fallback_solution.y_event, solution.y_event, decimal=6
+            )
+
+        # Several events crossed in the same window: the earliest is used
+        model = pybamm.BaseModel()
+        var = pybamm.Variable("var")
+        model.rhs = {var: 0.1 * var}
+        model.initial_conditions = {var: 1}
+        model.events = [
+            pybamm.Event("var = 1.201", var - 1.201),
+            pybamm.Event("var = 1.2", var - 1.2),
+        ]
+        disc = pybamm.Discretisation()
+        disc.process_model(model)
+        t_eval = np.linspace(0, 5, 51)
+        for event_location in ["interpolate", "rootfinder"]:
+            solver = pybamm.CasadiSolver(
+                event_location=event_location, rtol=1e-8, atol=1e-8
+            )
+            solution = solver.solve(model, t_eval)
+            self.assertAlmostEqual(solution.t_event, 10 * np.log(1.2), places=3)
+            np.testing.assert_array_almost_equal(solution.y_event, [1.2], decimal=4)
+            self.assertEqual(solution.termination, "event: var = 1.2")
+
     def test_model_step(self):
         # Create model
         model = pybamm.BaseModel()
@@ -317,6 +446,220 @@ class TestCasadiSolver(unittest.TestCase):
         self.assertLess(len(solution.t), len(t_eval))
         np.testing.assert_allclose(solution.y[0], np.exp(-1.1 * solution.t), rtol=1e-04)
 
+    def test_solve_sensitivities(self):
+        # Create model
+        model = pybamm.BaseModel()
+        u = pybamm.Variable("u")
+        v = pybamm.Variable("v")
+        a = pybamm.InputParameter("a")
+        b = pybamm.InputParameter("b")
+        model.rhs = {u: -a * u}
+        model.algebraic = {v: v - b * u}
+        model.initial_conditions = {u: a, v: 0}
+        model.variables = {"u": u, "a * v": a * v}
+        model.events = [pybamm.Event("u=0.5", u - 0.5)]
+        disc = pybamm.Discretisation()
+        disc.process_model(model)
+
+        t_eval = np.linspace(0, 1, 50)
+        for mode in ["fast", "safe", "safe without grid"]:
+            solver = pybamm.CasadiSolver(mode=mode, rtol=1e-8, atol=1e-8)
+            solution = solver.solve(
+                model, t_eval, inputs={"a": 1, "b": 2}, calculate_sensitivities=True
+            )
+            t = solution.t
+            # u = a * exp(-a * t), v = b * u (time by time)
+            du_da = (1 - t) * np.exp(-t)
+            dy_da = np.column_stack([du_da, 2 * du_da]).reshape(-1, 1)
+            dy_db = np.column_stack([0 * t, np.exp(-t)]).reshape(-1, 1)
+            np.testing.assert_allclose(solution.sensitivities["a"], dy_da, atol=1e-6)
+            np.testing.assert_allclose(solution.sensitivities["b"], dy_db, atol=1e-6)
+            np.testing.assert_allclose(
+                solution.sensitivities["all"], np.hstack([dy_da, dy_db]), atol=1e-6
+            )
+
+            # Sensitivities of the variables, by the chain rule
+            sensitivities = solution["a * v"].sensitivities
+            np.testing.assert_allclose(
+                sensitivities["a"], (2 * (2 - t) * np.exp(-t))[:, np.newaxis], atol=1e-6
+            )
+            np.testing.assert_allclose(
+                sensitivities["b"], np.exp(-t)[:, np.newaxis], atol=1e-6
+            )
+
+        # The function giving the sensitivities is only created once per model,
+        # inputs and grid, and in "fast" mode it also gives the solution
+        solver = pybamm.CasadiSolver(mode="fast", rtol=1e-8, atol=1e-8)
+        for b in [2, 3]:
+            solution = solver.solve(
+                model, t_eval, inputs={"a": 1, "b": b}, calculate_sensitivities=True
+            )
+            np.testing.assert_allclose(
+                solution.y, [np.exp(-t_eval), b * np.exp(-t_eval)], rtol=1e-6
+            )
+            self.assertNotIn("sensitivities", solution.profile)
+        self.assertEqual(len(solver.sensitivity_functions[model]), 1)
+        solver.solve(
+            model, t_eval[:10], inputs={"a": 1, "b": 2}, calculate_sensitivities=True
+        )
+        self.assertEqual(len(solver.sensitivity_functions[model]), 2)
+
+        # In "safe" modes, the sensitivities are integrated along with the states,
+        # window by window, without integrating the model again
+        for mode in ["safe", "safe without grid"]:
+            solver = pybamm.CasadiSolver(mode=mode, dt_max=0.1, rtol=1e-8, atol=1e-8)
+            with mock.patch.object(solver, "_run_integrator") as run_integrator:
+                solution = solver.solve(
+                    model, t_eval, inputs={"a": 1, "b": 2}, calculate_sensitivities=True
+                )
+            run_integrator.assert_not_called()
+            t = solution.t
+            du_da = (1 - t) * np.exp(-t)
+            np.testing.assert_allclose(
+                solution.sensitivities["a"],
+                np.column_stack([du_da, 2 * du_da]).reshape(-1, 1),
+                atol=1e-6,
+            )
+
+        # Ends at the event (located by interpolation, even with the rootfinder)
+        for event_location in ["interpolate", "rootfinder"]:
+            solver = pybamm.CasadiSolver(
+                event_location=event_location, rtol=1e-8, atol=1e-8
+            )
+            solution = solver.solve(
+                model,
+                np.linspace(0, 2, 50),
+                inputs={"a": 1, "b": 2},
+                calculate_sensitivities=["b"],
+            )
+            self.assertEqual(solution.termination, "event: u=0.5")
+            self.assertEqual(list(solution.sensitivities), ["all", "b"])
+            self.assertEqual(
+                solution.sensitivities["b"].shape, (2 * len(solution.t), 1)
+            )
+            np.testing.assert_allclose(
+                solution.sensitivities["b"][1::2, 0], np.exp(-solution.t), atol=1e-6
+            )
+
+        # No sensitivities by default
+        solution = solver.solve(model, t_eval, inputs={"a": 1, "b": 2})
+        self.assertEqual(solution.sensitivities, {})
+        self.assertEqual(solution["u"].sensitivities, {})
+
+    def test_solve_output_variables(self):
+        # Create model
+        model = pybamm.BaseModel()
+        domain = ["negative electrode", "separator", "positive electrode"]
+        var = pybamm.Variable("var", domain=domain)
+        a = pybamm.InputParameter("a")
+        model.rhs = {var: -a * var}
+        model.initial_conditions = {var: 1}
+        model.variables = {"var": var, "2a * var": 2 * a * var, "min": pybamm.min(var)}
+        model.events = [pybamm.Event("var=0.5", pybamm.min(var - 0.5))]
+        mesh = get_mesh_for_testing()
+        spatial_methods = {"macroscale": pybamm.FiniteVolume()}
+        disc = pybamm.Discretisation(mesh, spatial_methods)
+        disc.process_model(model)
+
+        t_eval = np.linspace(0, 10, 100)
+        for mode in ["fast", "safe", "safe without grid"]:
+            solver = pybamm.CasadiSolver(mode=mode, rtol=1e-8, atol=1e-8)
+            full_solution = solver.solve(model, t_eval, inputs={"a": 0.1})
+            solution = solver.solve(
+                model, t_eval, inputs={"a": 0.1}, output_variables=["2a * var", "min"]
+            )
+            # Only the final state is kept
+            np.testing.assert_array_equal(solution.t, full_solution.t)
+            self.assertEqual(solution.y.shape, (full_solution.y.shape[0], 1))
+            np.testing.assert_allclose(
+                solution.y[:, 0], full_solution.y[:, -1], rtol=1e-6
+            )
+            self.assertEqual(list(solution.output_data), ["2a * var", "min"])
+            for name in ["2a * var", "min"]:
+                np.testing.assert_allclose(
+                    solution[name].entries, full_solution[name].entries, rtol=1e-6
+                )
+            with self.assertRaisesRegex(KeyError, "only stores the output variables"):
+                solution["var"]
+
+        # The whole state is stored by default
+        solution = solver.solve(model, t_eval, inputs={"a": 0.1})
+        self.assertIsNone(solution.output_data)
+        self.assertEqual(solution.y.shape[1], len(solution.t))
+
+        with self.assertRaisesRegex(pybamm.SolverError, "isn't a variable"):
+            solver.solve(model, t_eval, inputs={"a": 0.1}, output_variables=["b"])
+        with self.assertRaisesRegex(pybamm.SolverError, "only storing output"):
+            solver.solve(
+                model,
+                t_eval,
+                inputs={"a": 0.1},
+                output_variables=["var"],
+                calculate_sensitivities=True,
+            )
+
+    def test_model_solver_multiple_inputs(self):
+        # Create model
+        model = pybamm.BaseModel()
+        var1 = pybamm.Variable("var1")
+        var2 = pybamm.Variable("var2")
+        model.rhs = {var1: -pybamm.InputParameter("rate") * var1}
+        model.algebraic = {var2: var2 - 2 * var1}
+        model.initial_conditions = {var1: pybamm.InputParameter("ic"), var2: 2}
+        model.events = [pybamm.Event("var1 = 0.95", var1 - 0.95)]
+        disc = pybamm.Discretisation()
+        disc.process_model(model)
+        t_eval = np.linspace(0, 1, 10)
+        inputs_list = [{"rate": 0.1 * (i + 1), "ic": i + 1} for i in range(5)]
+
+        # Mapped integrator (events are ignored in fast mode)
+        solver = pybamm.CasadiSolver(mode="fast", rtol=1e-8, atol=1e-8)
+        solutions = solver.solve(model, t_eval, inputs=inputs_list)
+        self.assertEqual(len(solutions), 5)
+        self.assertEqual(solver.mapped_integrators[model][1], 5)
+        for i, solution in enumerate(solutions):
+            np.testing.assert_array_equal(solution.t, t_eval)
+            expected = (i + 1) * np.exp(-0.1 * (i + 1) * t_eval)
+            np.testing.assert_allclose(solution.y[0], expected, rtol=1e-6)
+            np.testing.assert_allclose(solution.y[1], 2 * expected, rtol=1e-6)
+            self.assertEqual(solution.inputs["rate"][0, 0], 0.1 * (i + 1))
+
+        # Safe mode with events: solve each set of inputs in turn
+        solver = pybamm.CasadiSolver(rtol=1e-8, atol=1e-8)
+        solutions = solver.solve(model, t_eval, inputs=inputs_list)
+        self.assertEqual(solutions[0].termination, "event: var1 = 0.95")
+        for solution in solutions[1:]:
+            self.assertEqual(solution.termination, "final time")
+
+        with self.assertRaisesRegex(pybamm.SolverError, "empty list"):
+            solver.solve(model, t_eval, inputs=[])
+
+    def test_model_solver_multiple_inputs_in_parallel(self):
+        # Create model
+        model = pybamm.BaseModel()
+        var = pybamm.Variable("var")
+        model.rhs = {var: -pybamm.InputParameter("rate") * pybamm.sqrt(var)}
+        model.initial_conditions = {var: 1}
+        # add events so that safe mode is used (won't be triggered)
+        model.events = [pybamm.Event("10", var - 10)]
+        disc = pybamm.Discretisation()
+        disc.process_model(model)
+
+        solver = pybamm.CasadiSolver()
+        t_eval = np.linspace(0, 1, 100)
+        # the second set of inputs fails at t=0.2
+        solutions = solver.solve(
+            model, t_eval, inputs=[{"rate": 1}, {"rate": 10}, {"rate": 0.5}], nproc=2
+        )
+        np.testing.assert_allclose(solutions[0].y[0], (1 - t_eval / 2) ** 2, rtol=1e-3)
+        self.assertIsInstance(solutions[1], pybamm.SolverError)
+        np.testing.assert_allclose(solutions[2].y[0], (1 - t_eval / 4) ** 2, rtol=1e-3)
+        self.assertEqual(solutions[2].inputs["rate"][0, 0], 0.5)
+
+        # symbolic inputs can't be sent to other processes
+        with self.assertRaisesRegex(pybamm.SolverError, "symbolic inputs"):
+            solver.solve(model, t_eval, inputs=[{}, {}], nproc=2)
+
     def test_model_solver_dae_inputs_in_initial_conditions(self):
         # Create model
         model = pybamm.BaseModel()
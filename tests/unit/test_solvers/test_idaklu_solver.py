@@ -46,6 +46,112 @@ class TestIDAKLUSolver(unittest.TestCase):
             true_solution = 0.1 * solution.t
             np.testing.assert_array_almost_equal(solution.y[0, :], true_solution)
 
+            # test that the integrator statistics are recorded
+            self.assertGreater(solution.profile["integrator steps"], 0)
+            self.assertGreater(solution.profile["rhs evaluations"], 0)
+            self.assertGreaterEqual(solution.profile["error test failures"], 0)
+
+    def test_casadi_functions(self):
+        # models converted to CasADi are solved by evaluating the CasADi functions
+        # from C++, and give the same solution as models converted to python
+        solutions = {}
+        for form in ["python", "casadi"]:
+            model = pybamm.lithium_ion.SPMe()
+            model.convert_to_format = form
+            param = model.default_parameter_values
+            param["Current function [A]"] = "[input]"
+            sim = pybamm.Simulation(
+                model,
+                parameter_values=param,
+                solver=pybamm.IDAKLUSolver(root_method="lm"),
+            )
+            t_eval = np.linspace(0, 3600, 100)
+            solutions[form] = sim.solve(t_eval, inputs={"Current function [A]": 1})
+            if form == "casadi":
+                self.assertIsNotNone(sim.built_model.idaklu_functions)
+            else:
+                self.assertIsNone(sim.built_model.idaklu_functions)
+
+        np.testing.assert_array_almost_equal(
+            solutions["python"]["Terminal voltage [V]"].entries,
+            solutions["casadi"]["Terminal voltage [V]"].entries,
+            decimal=5,
+        )
+
+    def test_output_mode(self):
+        model = pybamm.BaseModel()
+        u = pybamm.Variable("u")
+        v = pybamm.Variable("v")
+        model.rhs = {u: -0.1 * u}
+        model.algebraic = {v: 1 - v}
+        model.initial_conditions = {u: 1, v: 1}
+        model.events = [pybamm.Event("u=0.8", u - 0.8)]
+        disc = pybamm.Discretisation()
+        disc.process_model(model)
+
+        # solution interpolated at the output times, up to the event
+        solver = pybamm.IDAKLUSolver(root_method="lm", output_mode="interpolate")
+        t_eval = np.linspace(0, 3, 1000)
+        solution = solver.solve(model, t_eval)
+        np.testing.assert_array_equal(solution.t[:-1], t_eval[: len(solution.t) - 1])
+        np.testing.assert_array_almost_equal(solution.t[-1], -10 * np.log(0.8))
+        np.testing.assert_array_almost_equal(
+            solution.y[0], np.exp(-0.1 * solution.t), decimal=5
+        )
+        np.testing.assert_array_almost_equal(solution.y[1], 1)
+
+        # solution at all the output times
+        t_eval = np.linspace(0, 1, 1000)
+        solution = solver.solve(model, t_eval)
+        self.assertEqual(solution.termination, "final time")
+        np.testing.assert_array_equal(solution.t, t_eval)
+        np.testing.assert_array_almost_equal(
+            solution.y[0], np.exp(-0.1 * t_eval), decimal=5
+        )
+
+        with self.assertRaisesRegex(ValueError, "output_mode must be one of"):
+            pybamm.IDAKLUSolver(output_mode="bad mode")
+
+    def test_sensitivities(self):
+        model = pybamm.BaseModel()
+        u = pybamm.Variable("u")
+        v = pybamm.Variable("v")
+        a = pybamm.InputParameter("a")
+        b = pybamm.InputParameter("b")
+        model.rhs = {u: -a * u}
+        model.algebraic = {v: v - b * u}
+        model.initial_conditions = {u: a, v: 2}
+        model.variables = {"a * v": a * v}
+        disc = pybamm.Discretisation()
+        disc.process_model(model)
+
+        t_eval = np.linspace(0, 1, 50)
+        for output_mode in ["stop", "interpolate"]:
+            solver = pybamm.IDAKLUSolver(
+                rtol=1e-8, atol=1e-8, root_method="lm", output_mode=output_mode
+            )
+            solution = solver.solve(
+                model, t_eval, inputs={"a": 1, "b": 2}, calculate_sensitivities=True
+            )
+            t = solution.t
+            # u = a * exp(-a * t), v = b * u (time by time)
+            du_da = (1 - t) * np.exp(-t)
+            np.testing.assert_allclose(
+                solution.sensitivities["a"],
+                np.column_stack([du_da, 2 * du_da]).reshape(-1, 1),
+                atol=1e-5,
+            )
+            np.testing.assert_allclose(
+                solution.sensitivities["b"],
+                np.column_stack([0 * t, np.exp(-t)]).reshape(-1, 1),
+                atol=1e-5,
+            )
+            np.testing.assert_allclose(
+                solution["a * v"].sensitivities["a"],
+                (2 * (2 - t) * np.exp(-t))[:, np.newaxis],
+                atol=1e-5,
+            )
+
     def test_set_atol(self):
         model = pybamm.lithium_ion.SPMe()
         geometry = model.default_geometry
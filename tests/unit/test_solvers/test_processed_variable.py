@@ -6,6 +6,7 @@ import tests
 
 import numpy as np
 import unittest
+from unittest import mock
 
 
 class TestProcessedVariable(unittest.TestCase):
@@ -663,6 +664,65 @@ class TestProcessedVariable(unittest.TestCase):
             sol["c"](sol.t, x_sol), np.ones_like(x_sol)[:, np.newaxis] * np.exp(-sol.t)
         )
 
+    def test_processed_variable_evaluate_all_times(self):
+        model = pybamm.BaseModel()
+        c = pybamm.Variable("conc", domain=["negative electrode", "separator"])
+        a = pybamm.InputParameter("a")
+        model.rhs = {c: -a * c}
+        model.initial_conditions = {c: 1}
+        model.boundary_conditions = {
+            c: {"left": (0, "Neumann"), "right": (0, "Neumann")}
+        }
+        model.variables = {"c": c, "a * c": a * c}
+        disc = tests.get_discretisation_for_testing()
+        disc.process_model(model)
+        solver = pybamm.CasadiSolver()
+        t_eval = np.linspace(0, 1)
+        solution = solver.solve(model, t_eval, inputs={"a": 2})
+
+        # Compiled and evaluated in one call, and the result is the same as
+        # evaluating at each time
+        var = pybamm.ProcessedVariable(model.variables["a * c"], solution, warn=False)
+        np.testing.assert_array_almost_equal(
+            var._evaluate_all_times_casadi(), var._evaluate_each_time()
+        )
+        np.testing.assert_array_almost_equal(
+            var.entries, 2 * np.exp(-2 * solution.t) * np.ones((65, 1)), decimal=4
+        )
+        # The compiled function is stored on the model and reused, including for
+        # solutions with a different number of time points
+        self.assertEqual(len(model.variables_casadi), 1)
+        solution = solver.solve(model, t_eval, inputs={"a": 3})
+        solution["a * c"]
+        solver.solve(model, t_eval[:10], inputs={"a": 3})["a * c"]
+        self.assertEqual(len(model.variables_casadi), 1)
+        np.testing.assert_array_almost_equal(
+            solution["a * c"].entries,
+            3 * np.exp(-3 * solution.t) * np.ones((65, 1)),
+            decimal=4,
+        )
+
+        # Variables that can't be converted to CasADi are evaluated time by time,
+        # with a warning
+        model.variables_casadi.clear()
+        with mock.patch.object(
+            pybamm.Symbol, "to_casadi", side_effect=NotImplementedError("no casadi")
+        ):
+            with self.assertLogs(pybamm.logger, level="WARNING") as logs:
+                var = pybamm.ProcessedVariable(
+                    model.variables["a * c"], solution, warn=False
+                )
+        self.assertIn("no casadi", logs.output[0])
+        np.testing.assert_array_almost_equal(
+            var.entries, solution["a * c"].entries, decimal=10
+        )
+        # Other errors aren't hidden by evaluating time by time
+        with mock.patch.object(
+            model, "get_variable_dependencies", side_effect=RuntimeError("bug")
+        ):
+            with self.assertRaisesRegex(RuntimeError, "bug"):
+                pybamm.ProcessedVariable(model.variables["a * c"], solution, warn=False)
+
     def test_call_failure(self):
         # x domain
         var = pybamm.Variable("var x", domain=["negative electrode", "separator"])
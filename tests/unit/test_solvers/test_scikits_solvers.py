@@ -130,6 +130,10 @@ class TestScikitsSolvers(unittest.TestCase):
         np.testing.assert_array_equal(solution.t, t_eval)
         np.testing.assert_allclose(solution.y[0], np.exp(0.1 * solution.t))
 
+        # Test the integrator statistics
+        self.assertGreater(solution.profile["integrator steps"], 0)
+        self.assertGreater(solution.profile["rhs evaluations"], 0)
+
     def test_model_solver_ode_events_python(self):
         model = pybamm.BaseModel()
         model.convert_to_format = "python"
@@ -209,6 +213,10 @@ class TestScikitsSolvers(unittest.TestCase):
         np.testing.assert_allclose(solution.y[0], np.exp(0.1 * solution.t))
         np.testing.assert_allclose(solution.y[-1], 2 * np.exp(0.1 * solution.t))
 
+        # Test the integrator statistics
+        self.assertGreater(solution.profile["integrator steps"], 0)
+        self.assertGreater(solution.profile["rhs evaluations"], 0)
+
     def test_model_solver_dae_bad_ics_python(self):
         model = pybamm.BaseModel()
         model.convert_to_format = "python"
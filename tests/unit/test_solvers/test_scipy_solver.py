@@ -8,6 +8,7 @@ from tests import get_mesh_for_testing
 import warnings
 import sys
 from platform import system
+from unittest import mock
 
 
 class TestScipySolver(unittest.TestCase):
@@ -217,6 +218,26 @@ class TestScipySolver(unittest.TestCase):
         np.testing.assert_array_equal(solution.t, t_eval[: len(solution.t)])
         np.testing.assert_allclose(solution.y[0], np.exp(-0.1 * solution.t))
 
+    def test_model_solver_multiple_inputs(self):
+        # Create model
+        model = pybamm.BaseModel()
+        model.convert_to_format = "python"
+        var = pybamm.Variable("var")
+        model.rhs = {var: -pybamm.InputParameter("rate") * var}
+        model.initial_conditions = {var: 1}
+        disc = pybamm.Discretisation()
+        disc.process_model(model)
+        # Solve
+        solver = pybamm.ScipySolver(rtol=1e-8, atol=1e-8, method="RK45")
+        t_eval = np.linspace(0, 10, 100)
+        inputs_list = [{"rate": 0.01 * (i + 1)} for i in range(5)]
+        solutions = solver.solve(model, t_eval, inputs=inputs_list)
+        for i, solution in enumerate(solutions):
+            np.testing.assert_array_equal(solution.t, t_eval)
+            np.testing.assert_allclose(
+                solution.y[0], np.exp(-0.01 * (i + 1) * solution.t)
+            )
+
     def test_model_solver_with_external(self):
         # Create model
         model = pybamm.BaseModel()
@@ -275,6 +296,53 @@ class TestScipySolver(unittest.TestCase):
             np.testing.assert_array_equal(solution.t, t_eval[: len(solution.t)])
             np.testing.assert_allclose(solution.y[0], np.exp(-0.1 * solution.t))
 
+    def test_model_solver_output_variables_in_windows(self):
+        # Create model
+        model = pybamm.BaseModel()
+        var = pybamm.Variable("var")
+        a = pybamm.InputParameter("a")
+        model.rhs = {var: -a * var}
+        model.initial_conditions = {var: 1}
+        model.variables = {"var": var, "2 * var": 2 * var}
+        model.events = [pybamm.Event("var=0.5", var - 0.5)]
+        disc = pybamm.Discretisation()
+        disc.process_model(model)
+
+        solver = pybamm.ScipySolver(rtol=1e-8, atol=1e-8)
+        solver.output_window_size = 10
+        t_eval = np.linspace(0, 10, 100)
+        for inputs in [{"a": 0.01}, {"a": 0.1}]:
+            full_solution = solver.solve(model, t_eval, inputs=inputs)
+            with mock.patch.object(
+                solver, "_integrate", wraps=solver._integrate
+            ) as integrate:
+                solution = solver.solve(
+                    model, t_eval, inputs=inputs, output_variables=["2 * var"]
+                )
+            # The model is integrated in windows of at most 10 times
+            for call in integrate.call_args_list:
+                self.assertLessEqual(len(call[0][1]), 10)
+            self.assertEqual(solution.termination, full_solution.termination)
+            np.testing.assert_allclose(solution.t, full_solution.t)
+            np.testing.assert_allclose(
+                solution["2 * var"].entries, 2 * full_solution.y[0], rtol=1e-6
+            )
+        # (the last window ends at the event)
+        self.assertEqual(solution.termination, "event: var=0.5")
+
+        # Lists of inputs are also integrated in windows
+        with mock.patch.object(solver, "_integrate", wraps=solver._integrate) as f:
+            solutions = solver.solve(
+                model,
+                t_eval,
+                inputs=[{"a": 0.01}, {"a": 0.02}],
+                output_variables=["2 * var"],
+            )
+        self.assertEqual(f.call_count, 2 * 11)
+        np.testing.assert_allclose(
+            solutions[1]["2 * var"].entries, 2 * np.exp(-0.02 * t_eval), rtol=1e-6
+        )
+
     def test_model_solver_with_inputs_with_casadi(self):
         # Create model
         model = pybamm.BaseModel()
@@ -3,6 +3,7 @@
 #
 import pybamm
 import unittest
+from unittest import mock
 import numpy as np
 import pandas as pd
 from scipy.io import loadmat
@@ -69,6 +70,181 @@ class TestSolution(unittest.TestCase):
             sol1.sub_solutions[1].inputs["a"], 2 * np.ones_like(t2)[np.newaxis, :]
         )
 
+        # Sensitivities are appended without the rows of the initial time
+        sol1 = pybamm.Solution(t1, y1)
+        sol1.solve_time = sol1.integration_time = 0
+        sol1.sensitivities = {"a": np.ones((50 * 20, 1))}
+        sol2 = pybamm.Solution(t2, y2)
+        sol2.solve_time = sol2.integration_time = 0
+        sol2.sensitivities = {"a": 2 * np.ones((50 * 20, 1))}
+        sol1.append(sol2)
+        np.testing.assert_array_equal(
+            sol1.sensitivities["a"],
+            np.concatenate([np.ones((50 * 20, 1)), 2 * np.ones((49 * 20, 1))]),
+        )
+
+        # Only the output variables and the final state are kept
+        sol1 = pybamm.Solution(t1, y1)
+        sol1.solve_time = sol1.integration_time = 0
+        sol1._set_output_data({"t": t1[np.newaxis, :]})
+        sol2 = pybamm.Solution(t2, y2)
+        sol2.solve_time = sol2.integration_time = 0
+        sol2._set_output_data({"t": t2[np.newaxis, :]})
+        sol1.append(sol2, create_sub_solutions=True)
+        np.testing.assert_array_equal(sol1.y, y2[:, -1:])
+        np.testing.assert_array_equal(
+            sol1.output_data["t"], np.concatenate([t1, t2[1:]])[np.newaxis, :]
+        )
+        np.testing.assert_array_equal(sol1.sub_solutions[1].output_data["t"], [t2])
+
+    def test_append_many(self):
+        model = pybamm.BaseModel()
+        c = pybamm.Variable("c")
+        model.rhs = {c: -c}
+        model.initial_conditions = {c: 1}
+        model.variables = {"c": c, "2c": 2 * c}
+        disc = get_discretisation_for_testing()
+        disc.process_model(model)
+
+        sol = pybamm.Solution(np.array([0]), np.array([[1]]))
+        sol.model = model
+        sol.solve_time = 0
+        sol.integration_time = 0
+        sol.inputs = {"a": 1}
+        processed_c = sol["c"]
+        for i in range(1, 101):
+            step = pybamm.Solution(
+                np.array([i - 1, i]), np.exp(-np.array([[i - 1, i]]))
+            )
+            step.solve_time = 0
+            step.integration_time = 0
+            step.inputs = {"a": i}
+            sol.append(step)
+
+        # Appended chunks are only concatenated when accessed
+        self.assertEqual(len(sol._chunks), 100)
+        np.testing.assert_array_equal(sol.t, np.arange(101))
+        self.assertEqual(len(sol._chunks), 0)
+        np.testing.assert_array_almost_equal(sol.y[0], np.exp(-np.arange(101)))
+        np.testing.assert_array_equal(sol.inputs["a"][0], np.r_[1, 1:101])
+
+        # Processed variables are only recomputed when they are next used
+        self.assertEqual(sol._stale_variables, {"c"})
+        np.testing.assert_array_almost_equal(sol["c"].entries, np.exp(-np.arange(101)))
+        self.assertIsNot(sol["c"], processed_c)
+        self.assertEqual(sol._stale_variables, set())
+        sol["2c"]
+        sol.append(step)
+        self.assertEqual(sol._stale_variables, {"c", "2c"})
+        self.assertEqual(len(sol.data["c"]), 102)
+        self.assertEqual(sol._stale_variables, set())
+
+    def test_append_sensitivities(self):
+        sol = pybamm.Solution(np.array([0]), np.array([[1], [2]]))
+        sol.solve_time = sol.integration_time = 0
+        sol.sensitivities = {"all": np.array([[1.0], [2.0]])}
+        for i in range(1, 101):
+            step = pybamm.Solution(np.array([i - 1, i]), np.array([[i, i], [i, i]]))
+            step.solve_time = step.integration_time = 0
+            # (sensitivities stacked time by time)
+            step.sensitivities = {"all": np.array([[i], [i], [i + 1], [i + 2]])}
+            sol.append(step)
+            # The final sensitivities are read without concatenating
+            np.testing.assert_array_equal(sol.last_sensitivities, [[i + 1], [i + 2]])
+
+        # Appended sensitivities are only concatenated when accessed
+        self.assertEqual(len(sol._chunks), 100)
+        np.testing.assert_array_equal(
+            sol.sensitivities["all"][:, 0],
+            np.r_[
+                1, 2, np.column_stack([np.arange(2, 102), np.arange(3, 103)]).ravel()
+            ],
+        )
+        self.assertEqual(len(sol._chunks), 0)
+        np.testing.assert_array_equal(sol.last_sensitivities, [[101], [102]])
+
+    def test_append_without_concatenating(self):
+        # Count the concatenations of appended chunks
+        concatenate_chunks = pybamm.Solution._concatenate_chunks
+        n_concatenations = [0]
+
+        def counted_concatenate_chunks(solution):
+            if solution._chunks:
+                n_concatenations[0] += 1
+            concatenate_chunks(solution)
+
+        model = pybamm.BaseModel()
+        c = pybamm.Variable("c")
+        model.rhs = {c: -c}
+        model.initial_conditions = {c: 1}
+        model.variables = {"c": c}
+        # (safe mode only integrates in windows if there are events)
+        model.events = [pybamm.Event("c = 0.1", c - 0.1)]
+        disc = get_discretisation_for_testing()
+        disc.process_model(model)
+
+        with mock.patch.object(
+            pybamm.Solution, "_concatenate_chunks", counted_concatenate_chunks
+        ):
+            # The final time and state are read without concatenating
+            sol = pybamm.Solution(np.array([0]), np.array([[1]]))
+            sol.solve_time = sol.integration_time = 0
+            for i in range(1, 4):
+                step = pybamm.Solution(np.array([i - 1, i]), np.array([[i, i + 1]]))
+                step.solve_time = step.integration_time = 0
+                sol.append(step)
+                self.assertEqual(sol.last_t, i)
+                np.testing.assert_array_equal(sol.last_y, [i + 1])
+            # (including when the last chunk is empty)
+            step = pybamm.Solution(np.array([3]), np.array([[4]]))
+            step.solve_time = step.integration_time = 0
+            sol.append(step)
+            self.assertEqual(sol.last_t, 3)
+            np.testing.assert_array_equal(sol.last_y, [4])
+            self.assertEqual(n_concatenations[0], 0)
+            np.testing.assert_array_equal(sol.t, [0, 1, 2, 3])
+            self.assertEqual(sol.last_t, 3)
+            self.assertEqual(n_concatenations[0], 1)
+
+            # Stepping
+            solver = pybamm.CasadiSolver()
+            n_concatenations[0] = 0
+            sol = None
+            for _ in range(50):
+                sol = solver.step(sol, model, 0.01)
+            self.assertEqual(n_concatenations[0], 0)
+            self.assertEqual(len(sol._chunks), 49)
+            np.testing.assert_allclose(sol.y[0], np.exp(-sol.t), rtol=1e-3)
+
+            # Integrating in many windows in safe mode
+            solver = pybamm.CasadiSolver(mode="safe", dt_max=0.01)
+            n_concatenations[0] = 0
+            sol = solver.solve(model, np.linspace(0, 1, 101))
+            self.assertLessEqual(n_concatenations[0], 2)
+            np.testing.assert_allclose(sol.y[0], np.exp(-sol.t), rtol=1e-3)
+
+    def test_profile(self):
+        model = pybamm.BaseModel()
+        model.profile = {"discretisation: variables": 0.5}
+        sol = pybamm.Solution(np.array([0, 1]), np.array([[1, 2]]))
+        sol.model = model
+        sol.solve_time = 0
+        sol.integration_time = 0
+        sol.update_profile({"integration": 0.25, "integrator steps": 3})
+        step = pybamm.Solution(np.array([1, 2]), np.array([[2, 3]]))
+        step.solve_time = 0
+        step.integration_time = 0
+        step.update_profile({"integration": 0.5, "integrator steps": 4})
+        sol.append(step)
+        self.assertEqual(
+            sol.profile,
+            {
+                "discretisation: variables": 0.5,
+                "integration": 0.75,
+                "integrator steps": 7,
+            },
+        )
+
     def test_total_time(self):
         sol = pybamm.Solution([], None)
         sol.set_up_time = 0.5
@@ -177,6 +353,21 @@ class TestSolution(unittest.TestCase):
         np.testing.assert_array_equal(solution["c"].entries, solution_load["c"].entries)
         np.testing.assert_array_equal(solution["d"].entries, solution_load["d"].entries)
 
+        # save only the rows of y needed to process some variables
+        solution.update(["c", "d"])
+        solution.save("test.pickle", variables=["2c"])
+        solution_load = pybamm.load("test.pickle")
+        self.assertEqual(solution_load.y.shape, solution.y.shape)
+        np.testing.assert_array_equal(solution_load.y[0], solution.y[0])
+        self.assertTrue(np.all(np.isnan(solution_load.y[1:])))
+        self.assertEqual(solution_load.data, {})
+        np.testing.assert_array_equal(
+            solution["2c"].entries, solution_load["2c"].entries
+        )
+        # the solution itself is unchanged
+        self.assertIn("d", solution.data)
+        self.assertFalse(np.any(np.isnan(solution.y)))
+
     def test_solution_evals_with_inputs(self):
         model = pybamm.lithium_ion.SPM()
         geometry = model.default_geometry
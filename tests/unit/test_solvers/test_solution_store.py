@@ -0,0 +1,195 @@
+#
+# Tests for the SolutionStore class
+#
+import pybamm
+import numpy as np
+import os
+import tempfile
+import unittest
+from tests import get_discretisation_for_testing
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+class TestSolutionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "store")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_write_append_load(self):
+        model = pybamm.BaseModel()
+        model.length_scales = {"negative electrode": pybamm.Scalar(1)}
+        c = pybamm.Variable("c")
+        d = pybamm.Variable("d", domain="negative electrode")
+        a = pybamm.InputParameter("a")
+        model.rhs = {c: -a * c, d: 1}
+        model.initial_conditions = {c: 1, d: 2}
+        model.variables = {"c": c, "d": d, "a * c": a * c}
+        disc = get_discretisation_for_testing()
+        disc.process_model(model)
+        solver = pybamm.CasadiSolver()
+        solution = solver.solve(model, np.linspace(0, 1, 5), inputs={"a": 1})
+        other = solver.solve(model, np.linspace(1, 2, 7), inputs={"a": 2})
+
+        store = pybamm.SolutionStore(self.path)
+        with self.assertRaisesRegex(ValueError, "No solution has been written"):
+            store.append(solution)
+        store.write(solution)
+        store.append(other)
+        self.assertEqual(store.metadata["n_t"], 11)
+
+        # The loaded solution is the same as the solutions appended in memory, with
+        # its arrays memory-mapped (read-only) from the store
+        loaded = pybamm.SolutionStore(self.path).load()
+        solution.append(other)
+        np.testing.assert_array_equal(loaded.t, solution.t)
+        np.testing.assert_array_equal(loaded.y, solution.y)
+        np.testing.assert_array_equal(loaded.inputs["a"], solution.inputs["a"])
+        self.assertFalse(loaded.t.flags.writeable)
+        self.assertEqual(loaded.y.shape, solution.y.shape)
+        np.testing.assert_array_equal(loaded.y[:, -1], solution.y[:, -1])
+        np.testing.assert_array_equal(loaded.y[:, 7], solution.y[:, 7])
+        np.testing.assert_array_equal(loaded.y[1:3, 4:8], solution.y[1:3, 4:8])
+        np.testing.assert_array_equal(loaded.y[[0, 2]], solution.y[[0, 2]])
+        with self.assertRaisesRegex(IndexError, "out of bounds"):
+            loaded.y[:, 11]
+        self.assertEqual(loaded.termination, solution.termination)
+        self.assertEqual(loaded.solve_time, solution.solve_time)
+        self.assertEqual(loaded.timescale_eval, solution.timescale_eval)
+        for name in ["c", "d", "a * c"]:
+            np.testing.assert_array_equal(loaded[name].entries, solution[name].entries)
+
+        # The arrays are standard .npy files, with one file of states (stored state
+        # by state) per solution written or appended
+        np.testing.assert_array_equal(
+            np.load(os.path.join(self.path, "y_1.npy")), other.y[:, 1:]
+        )
+
+        # Writing replaces the stored solution, and rows left by an interrupted
+        # append are overwritten
+        store.write(other)
+        with open(os.path.join(self.path, "t.npy"), "ab") as f:
+            f.write(np.ones(3).tobytes())
+        store.append(other)
+        loaded = store.load(model=model)
+        self.assertIs(loaded.model, model)
+        np.testing.assert_array_equal(loaded.t, np.concatenate([other.t, other.t[1:]]))
+
+        # Symbolic inputs can't be stored
+        solution = solver.solve(model, np.linspace(0, 1, 5), inputs={"a": 1})
+        solution.has_symbolic_inputs = True
+        with self.assertRaisesRegex(ValueError, "symbolic inputs"):
+            store.write(solution)
+
+    def test_read_rows(self):
+        model = pybamm.BaseModel()
+        c = pybamm.Variable("c")
+        d = pybamm.Variable("d")
+        e = pybamm.Variable("e")
+        model.rhs = {c: -c, d: -2 * d, e: 1}
+        model.initial_conditions = {c: 1, d: 1, e: 0}
+        model.variables = {"c": c, "c + d": c + d, "all": c + d + e}
+        disc = pybamm.Discretisation()
+        disc.process_model(model)
+        solver = pybamm.CasadiSolver()
+        store = pybamm.SolutionStore(self.path)
+        solution = solver.solve(model, np.linspace(0, 1, 5))
+        other = solver.solve(model, np.linspace(1, 2, 5))
+        store.write(solution)
+        store.append(other)
+        solution.append(other)
+
+        # Record the rows read from each file of states
+        rows_read = []
+
+        class RecordedStates(object):
+            def __init__(self, chunk):
+                self.chunk = chunk
+                self.shape = chunk.shape
+
+            def __getitem__(self, key):
+                rows = key[0] if isinstance(key, tuple) else key
+                rows_read.append(np.arange(self.shape[0])[rows])
+                return self.chunk[key]
+
+        loaded = store.load()
+        y = loaded.y
+        chunk = y._chunk
+        y._chunk = lambda index: RecordedStates(chunk(index))
+        for name, rows in [("c", {0}), ("c + d", {0, 1}), ("all", {0, 1, 2})]:
+            rows_read.clear()
+            np.testing.assert_array_equal(loaded[name].entries, solution[name].entries)
+            # Only the rows that the variable depends on are read from each file
+            # (after the initial state, which gives the shape of the variable)
+            self.assertEqual(len(rows_read), 3)
+            for read in rows_read[1:]:
+                self.assertEqual(set(np.atleast_1d(read)), rows)
+        # The states aren't kept as a CasADi matrix
+        self.assertIsNone(loaded._y_casadi)
+
+    @unittest.skipIf(resource is None, "resource module not available")
+    def test_load_many_files(self):
+        # More files of states than the limit of open files
+        limits = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (64, limits[1]))
+        self.addCleanup(resource.setrlimit, resource.RLIMIT_NOFILE, limits)
+
+        model = pybamm.BaseModel()
+        c = pybamm.Variable("c")
+        model.rhs = {c: -c}
+        model.initial_conditions = {c: 1}
+        model.variables = {"c": c}
+        disc = pybamm.Discretisation()
+        disc.process_model(model)
+        solution = pybamm.CasadiSolver().solve(model, np.linspace(0, 1, 3))
+        store = pybamm.SolutionStore(self.path)
+        store.write(solution)
+        for _ in range(100):
+            store.append(solution)
+        self.assertEqual(len(store.metadata["y_chunk_sizes"]), 101)
+
+        loaded = store.load()
+        self.assertEqual(loaded.y.shape, (1, 203))
+        np.testing.assert_array_equal(
+            loaded["c"].entries, np.r_[solution.y[0], np.tile(solution.y[0, 1:], 100)]
+        )
+
+    def test_step(self):
+        model = pybamm.lithium_ion.SPM()
+        sim = pybamm.Simulation(model)
+        sim.build()
+        solver = pybamm.CasadiSolver()
+        store = pybamm.SolutionStore(self.path)
+
+        solution = None
+        stored_solution = None
+        for _ in range(3):
+            solution = solver.step(solution, sim.built_model, 60, npts=4)
+            stored_solution = solver.step(
+                stored_solution, sim.built_model, 60, npts=4, store=store
+            )
+            # Only the solution of the latest step is kept in memory
+            self.assertEqual(len(stored_solution.t), 4)
+
+        loaded = store.load()
+        np.testing.assert_allclose(loaded.t, solution.t)
+        np.testing.assert_allclose(
+            loaded["Terminal voltage [V]"].entries,
+            solution["Terminal voltage [V]"].entries,
+        )
+
+
+if __name__ == "__main__":
+    print("Add -v for more debug output")
+    import sys
+
+    if "-v" in sys.argv:
+        debug = True
+    pybamm.settings.debug_mode = True
+    unittest.main()